@@ -5,12 +5,39 @@ from flask_cors import CORS
 import pandas as pd
 import os
 from werkzeug.utils import secure_filename
-from models import db, Vehicle, User
-import threading
+from models import db, Vehicle, User, ImportJob
+from cpu_limits import available_cpus
+from ingest import (
+    REQUIRED_COLS, ExcelStream, ParallelExcelReader, VehicleWriter, clean_price_frame,
+    create_staging_table,
+    ensure_vehicle_indexes, ensure_vehicle_key_unique, rollback_vehicle_table,
+    swap_staging_table, vehicle_key_unique,
+)
+from jobs import enqueue_import, queue_stats, start_worker_thread
+from chunked_upload import ChunkedUploads, UploadError, sha256_file
+from parse_cache import ParseCache, already_loaded, mark_loaded
+from generation import bump_generation, get_generation
+from catalog_export import ensure_catalog_snapshot, export_catalog_snapshot, pick_encoding, preferred_encoding
+from pagination import decode_cursor, fetch_page, parse_fields, stream_rows
+from search import VehicleSearch, refill_search_index, sync_search_index
+from catalog_stats import get_catalog_stats, refresh_catalog_stats, stats_missing
+from prices import (
+    batch_vehicle_quotes, prices_missing, rebuild_vehicle_prices, refill_vehicle_prices,
+    register_insurers, vehicles_in_price_range,
+)
+from lookup_cache import CatalogCache
+from quote_engine import QuoteEngine, export_catalog_arrays
+from http_cache import conditional
+from metrics import IngestTimer, TimedQueuePool, metrics
+from db_routing import INGEST_BIND, REPLICA_BIND, bind_engine, pool_stats, read_only
+from profiling import profiler
 import gc
+import json
+import multiprocessing
 from datetime import datetime
 from models import db, Vehicle, User, SiteSettings, BankAccount  # BankAccount ekleyin
-from flask import send_from_directory
+from flask import send_from_directory, send_file, Response, stream_with_context
+from sqlalchemy.orm import Session
 import cloudinary
 import cloudinary.uploader
 
@@ -28,13 +55,107 @@ if database_url and database_url.startswith('postgres://'):
     
 app.config['SQLALCHEMY_DATABASE_URI'] = database_url
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# İşçi başına bağlantı havuzu; gunicorn.conf.py iş parçacığı sayısına göre ayarlar.
+# DB_POOL_PRE_PING her bağlantı alışında bir gidiş-dönüş ekler; DB_POOL_RECYCLE
+# sunucunun boşta bağlantı kapatma süresinden kısaysa kapatılabilir.
+havuz_ayarlari = {
+    # Havuzdan bağlantı bekleme süresi /metrics'te (sigorta_db_pool_wait_seconds)
+    'poolclass': TimedQueuePool,
+    'pool_timeout': float(os.environ.get('DB_POOL_TIMEOUT', 30)),
+    'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 300)),
+    'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', '1').lower() in ('1', 'true', 'yes'),
+}
 app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-    'pool_size': 5,
-    'pool_recycle': 300,
-    'pool_pre_ping': True,
+    **havuz_ayarlari,
+    'pool_logging_name': 'primary',
+    'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+    'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+}
+# Import'lar ayrı küçük bir havuzla yazar (varsayılan ana veritabanı); müşteri
+# isteklerinin bağlantılarını tüketmez. Okuma uçları DATABASE_REPLICA_URL
+# verilirse replikaya gider (db_routing.read_only).
+ingest_url = os.environ.get('INGEST_DATABASE_URL', database_url)
+if ingest_url.startswith('postgres://'):
+    ingest_url = ingest_url.replace('postgres://', 'postgresql://', 1)
+app.config['SQLALCHEMY_BINDS'] = {
+    INGEST_BIND: {
+        **havuz_ayarlari,
+        'url': ingest_url,
+        'pool_logging_name': 'ingest',
+        'pool_size': int(os.environ.get('INGEST_POOL_SIZE', 2)),
+        'max_overflow': int(os.environ.get('INGEST_MAX_OVERFLOW', 1)),
+    },
 }
+replica_url = os.environ.get('DATABASE_REPLICA_URL')
+if replica_url:
+    if replica_url.startswith('postgres://'):
+        replica_url = replica_url.replace('postgres://', 'postgresql://', 1)
+    app.config['SQLALCHEMY_BINDS'][REPLICA_BIND] = {
+        **havuz_ayarlari,
+        'url': replica_url,
+        'pool_logging_name': 'replica',
+        'pool_size': int(os.environ.get('DB_REPLICA_POOL_SIZE', os.environ.get('DB_POOL_SIZE', 5))),
+        'max_overflow': int(os.environ.get('DB_REPLICA_MAX_OVERFLOW', os.environ.get('DB_MAX_OVERFLOW', 10))),
+    }
 app.config['UPLOAD_FOLDER'] = 'uploads'
+# Parçalı yükleme (/upload/chunks): istek başına en fazla parça, toplam dosya
+# sınırı ve yarım kalan yüklemelerin saklanma süresi (saat)
+app.config['UPLOAD_CHUNK_SIZE'] = int(os.environ.get('UPLOAD_CHUNK_SIZE', 5 * 1024 * 1024))
+app.config['UPLOAD_MAX_SIZE'] = int(os.environ.get('UPLOAD_MAX_SIZE', 200 * 1024 * 1024))
+app.config['UPLOAD_EXPIRE_HOURS'] = float(os.environ.get('UPLOAD_EXPIRE_HOURS', 24))
+# Ayrıştırılmış (temizlenmiş) listelerin SHA-256 ile önbelleği: UPLOAD_FOLDER'da
+# tutulacak dosya sayısı (0 = kapalı). Aynı dosya tekrar yüklenince Excel okunmaz.
+app.config['PARSE_CACHE_KEEP'] = int(os.environ.get('PARSE_CACHE_KEEP', 5))
+# Katalog nesil damgaları ve katalog dosyaları
+app.config['CATALOG_FOLDER'] = os.environ.get('CATALOG_FOLDER', 'catalog')
+# Nesil damgası en fazla kaç saniyede bir veritabanından kontrol edilsin
+# (CATALOG_FOLDER'ı paylaşmayan sunucular yeni nesli bu kadar gecikmeyle görür)
+app.config['GENERATION_CHECK_SECONDS'] = float(os.environ.get('GENERATION_CHECK_SECONDS', 5))
+# Dropdown önbelleğinde tutulacak en fazla araç kaydı
+app.config['LOOKUP_CACHE_SIZE'] = int(os.environ.get('LOOKUP_CACHE_SIZE', 10000))
+# Dropdown / araç / teklif okumaları: 'sql' (ağaç + LRU, fiyatlar veritabanından)
+# veya 'columnar' (tüm katalog NumPy dizilerinde, veritabanına gitmez; import
+# sonrası CATALOG_FOLDER/arrays-<nesil>/ altına .npy olarak yazılır)
+app.config['QUOTE_ENGINE'] = os.environ.get('QUOTE_ENGINE', 'sql')
+# Salt okunur API yanıtları için Cache-Control (saniye)
+app.config['API_CACHE_MAX_AGE'] = int(os.environ.get('API_CACHE_MAX_AGE', 60))
+app.config['API_CACHE_STALE_WHILE_REVALIDATE'] = int(os.environ.get('API_CACHE_STALE_WHILE_REVALIDATE', 300))
+# Arama: 'auto' (PostgreSQL pg_trgm / SQLite FTS5, yoksa önek ağacı) veya 'trie'
+app.config['SEARCH_BACKEND'] = os.environ.get('SEARCH_BACKEND', 'auto')
+# /api/vehicles?limit= için varsayılan ve en fazla sayfa boyutu
+app.config['API_PAGE_SIZE'] = int(os.environ.get('API_PAGE_SIZE', 100))
+app.config['API_MAX_PAGE_SIZE'] = int(os.environ.get('API_MAX_PAGE_SIZE', 1000))
+# POST /api/quotes/batch'te tek istekte en fazla araç
+app.config['BATCH_QUOTE_MAX'] = int(os.environ.get('BATCH_QUOTE_MAX', 1000))
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB
+# Excel okuma modu: 'pandas' (tamamını oku), 'stream' (satır satır, sabit bellek)
+# veya 'parallel' (tüm sayfalar / parçalar süreç havuzunda, INGEST_WORKERS işçi)
+app.config['INGEST_READER'] = os.environ.get('INGEST_READER', 'pandas')
+# Varsayılan: konteynerin CPU'su (host'unki değil), en fazla 4 - her işçi ayrı
+# pandas süreci, küçük makinede bellek yetmez
+app.config['INGEST_WORKERS'] = int(os.environ.get('INGEST_WORKERS', min(4, available_cpus())))
+# Toplu yazma: batch boyutu ve PostgreSQL COPY kullanımı ('auto', '1', '0')
+app.config['INGEST_BATCH_SIZE'] = int(os.environ.get('INGEST_BATCH_SIZE', 1000))
+app.config['INGEST_USE_COPY'] = os.environ.get('INGEST_USE_COPY', 'auto').lower()
+# Yükleme modu: 'upsert' (ekle/güncelle), 'sync' (ekle/güncelle + dosyada olmayanları sil)
+# veya 'replace' (vehicles_next'e yaz, bitince tek transaction'da vehicles ile değiştir)
+app.config['IMPORT_MODE'] = os.environ.get('IMPORT_MODE', 'upsert')
+IMPORT_MODES = ('upsert', 'sync', 'replace')
+# Yükleme kuyruğu: 'thread' (her web sürecinde işçi) veya 'off' (ayrı süreç: python jobs.py)
+app.config['JOB_WORKER'] = os.environ.get('JOB_WORKER', 'thread')
+app.config['JOB_POLL_SECONDS'] = float(os.environ.get('JOB_POLL_SECONDS', 2))
+app.config['JOB_HEARTBEAT_SECONDS'] = float(os.environ.get('JOB_HEARTBEAT_SECONDS', 10))
+app.config['JOB_STALE_SECONDS'] = float(os.environ.get('JOB_STALE_SECONDS', 60))
+app.config['JOB_MAX_ATTEMPTS'] = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+# Bu süreyi (ms) aşan istekler en yavaş SQL'leriyle loglanır (0 = kapalı)
+app.config['SLOW_REQUEST_MS'] = float(os.environ.get('SLOW_REQUEST_MS', 0))
+# Profilleme (varsayılan kapalı): import'lar cProfile + tracemalloc ile, istekler
+# PROFILE_HEADER başlığı gönderildiğinde cProfile ile; sonuçlar /admin/profiles
+app.config['PROFILE_IMPORTS'] = os.environ.get('PROFILE_IMPORTS', '0').lower() in ('1', 'true', 'yes')
+app.config['PROFILE_REQUESTS'] = os.environ.get('PROFILE_REQUESTS', '0').lower() in ('1', 'true', 'yes')
+app.config['PROFILE_HEADER'] = os.environ.get('PROFILE_HEADER', 'X-Profile')
+app.config['PROFILE_FOLDER'] = os.environ.get('PROFILE_FOLDER', 'profiles')
+app.config['PROFILE_KEEP'] = int(os.environ.get('PROFILE_KEEP', 50))
 
 # Cloudinary API bilgilerin BURAYA GERÇEK VERİLERİNİ YAZ!
 cloudinary.config(
@@ -44,164 +165,412 @@ cloudinary.config(
 )
 
 db.init_app(app)
+# İstek süresi / SQL sayısı ölçümleri (/metrics)
+metrics.init_app(app)
+metrics.watch_pools(lambda: pool_stats(db.engines))
+profiler.init_app(app)
 
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+os.makedirs(app.config['CATALOG_FOLDER'], exist_ok=True)
+
+# Marka/yıl/model açılır listeleri - yüklemeler arasında veritabanına gitmez
+if app.config['QUOTE_ENGINE'] == 'columnar':
+    # Diziler CATALOG_FOLDER'da mmap ile açılır, işçiler arasında paylaşılır
+    catalog_cache = QuoteEngine(app.config['LOOKUP_CACHE_SIZE'], folder=app.config['CATALOG_FOLDER'])
+else:
+    catalog_cache = CatalogCache(app.config['LOOKUP_CACHE_SIZE'])
+vehicle_search = VehicleSearch(app.config['SEARCH_BACKEND'])
 
 with app.app_context():
     db.create_all()
+    # Tekrarları silen geçiş burada çalışmaz (her işçi aynı anda çalıştırırdı):
+    # flask --app app migrate-vehicle-key ya da /init-db
+    try:
+        if not vehicle_key_unique(db.engine):
+            print("❗ idx_vehicle_lookup tekil değil, upsert / sync import'ları başarısız olur: "
+                  "'flask --app app migrate-vehicle-key' çalıştırın")
+    except Exception as e:
+        print(f"⚠️ idx_vehicle_lookup kontrol edilemedi: {str(e)}")
+    try:
+        for ad in ensure_vehicle_indexes(db.engine):
+            print(f"🔑 Eksik index oluşturuldu: {ad}")
+    except Exception as e:
+        print(f"⚠️ Eksik index'ler oluşturulamadı: {str(e)}")
+    try:
+        sync_search_index(db.engine, only_if_missing=True)
+    except Exception as e:
+        print(f"⚠️ Arama index'i oluşturulamadı: {str(e)}")
+    try:
+        if prices_missing():
+            print(f"💰 Fiyat tablosu oluşturuldu: {rebuild_vehicle_prices(db.engine)} fiyat")
+    except Exception as e:
+        db.session.rollback()
+        print(f"⚠️ Fiyat tablosu oluşturulamadı: {str(e)}")
+    try:
+        if stats_missing():
+            refresh_catalog_stats(db.engine)
+            print("📊 Katalog özeti oluşturuldu")
+    except Exception as e:
+        db.session.rollback()
+        print(f"⚠️ Katalog özeti oluşturulamadı: {str(e)}")
 
 ALLOWED_EXTENSIONS = {'xlsx', 'xls'}
  
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+parse_cache = ParseCache(app.config['UPLOAD_FOLDER'], keep=app.config['PARSE_CACHE_KEEP'])
+
+def source_key(sha256, reader=None):
+    """Önbellek / tekrar anahtarı: 'parallel' tüm sayfaları okur, diğerleri ilk sayfayı"""
+    reader = reader or app.config['INGEST_READER']
+    return f'{sha256}-all' if reader == 'parallel' else sha256
+
+def already_imported(sha256, mode, reader=None):
+    """Dosya bu modla katalogda bir şey değiştirmeyecekse önceki import'un bilgisi"""
+    return already_loaded(app.config['CATALOG_FOLDER'], source_key(sha256, reader), mode,
+                          get_generation('catalog'))
+
+chunked_uploads = ChunkedUploads(
+    app.config['UPLOAD_FOLDER'],
+    chunk_size=app.config['UPLOAD_CHUNK_SIZE'],
+    max_size=app.config['UPLOAD_MAX_SIZE'],
+    expire_hours=app.config['UPLOAD_EXPIRE_HOURS'],
+    allowed_extensions=ALLOWED_EXTENSIONS,
+)
+
 # Global değişken - işlem durumu
 upload_status = {
     'is_processing': False,
     'progress': 0,
     'total': 0,
     'saved': 0,
+    'rows_per_second': 0,
+    'inserted': 0,
+    'updated': 0,
+    'unchanged': 0,
+    'deleted': 0,
     'error': None
 }
 
-def process_excel_sigorta(filepath):
-    """Bellek dostu batch işleme - Excel için optimize"""
-    global upload_status
+def process_excel_sigorta(filepath, reader=None, mode=None, status=None, on_progress=None):
+    """Bellek dostu batch işleme - Excel için optimize
+
+    reader: 'pandas' (ilk sayfanın tamamını okur), 'stream' (openpyxl
+    read_only ile satır satır) veya 'parallel' (tüm sayfaları süreç
+    havuzunda işler). Verilmezse INGEST_READER ayarı kullanılır.
+    mode: 'upsert' (yeni araçları ekle, değişen fiyatları güncelle),
+    'sync' (ayrıca dosyada olmayan araçları sil) veya 'replace' (boş
+    vehicles_next'e yaz ve atomik olarak vehicles ile değiştir).
+    Verilmezse IMPORT_MODE.
+    status: ilerlemenin yazılacağı dict (verilmezse global upload_status).
+    on_progress(status): her batch sonrası çağrılır; istisna fırlatırsa
+    (ör. iş iptali) import durur.
+    PROFILE_IMPORTS açıksa import cProfile + tracemalloc altında çalışır.
+    """
+    if status is None:
+        status = upload_status
+    if not app.config['PROFILE_IMPORTS']:
+        return _process_excel(filepath, reader, mode, status, on_progress)
     
+    # Kuyruk işlerinde profil iş numarasıyla bulunur
+    profil_id = (f"job-{status['job_id']}" if status.get('job_id')
+                 else f"import-{datetime.utcnow():%Y%m%d%H%M%S%f}")
+    with profiler.profile(profil_id, 'import', os.path.basename(filepath), memory=True) as meta:
+        sonuc = _process_excel(filepath, reader, mode, status, on_progress)
+        meta.update(
+            rows=status.get('saved'),
+            error=status.get('error'),
+            stages=status.get('stages'),
+            stages_memory_mb=status.get('stages_memory_mb'),
+        )
+    return sonuc
+
+def _process_excel(filepath, reader, mode, status, on_progress):
+    kaynak = None
+    timer = IngestTimer(metrics)
+    # Import kendi havuzundan yazar; istek havuzundaki bağlantıları tutmaz
+    motor = bind_engine(db, INGEST_BIND)
+    oturum = Session(motor)
+    onbellek_yazici = None
+    # Yazma başlamadan biten import (aynı dosya, eksik sütun) nesli yenilemez
+    katalog_degisti = False
     try:
-        upload_status['is_processing'] = True
-        upload_status['progress'] = 0
-        upload_status['error'] = None
-        
-        print(f"📁 Excel dosyası açılıyor...")
-        
-        # Excel'i bir kerede oku ama optimize et
-        df = pd.read_excel(filepath, engine='openpyxl')
+        status['is_processing'] = True
+        status['progress'] = 0
+        status['error'] = None
+        status['rows_per_second'] = 0
+        status.pop('stages_memory_mb', None)
+        status.pop('duplicate', None)
+        for key in ('inserted', 'updated', 'unchanged', 'deleted'):
+            status[key] = 0
+        
+        reader = reader or app.config['INGEST_READER']
+        mode = mode or app.config['IMPORT_MODE']
+        if mode not in IMPORT_MODES:
+            raise ValueError(f"Geçersiz yükleme modu: {mode}")
+        batch_size = app.config['INGEST_BATCH_SIZE']
+        
+        with timer.stage('hash'):
+            anahtar = source_key(sha256_file(filepath), reader)
+        onceki = already_loaded(app.config['CATALOG_FOLDER'], anahtar, mode, get_generation('catalog'))
+        if onceki:
+            status.update(is_processing=False, progress=onceki['rows'], saved=onceki['rows'],
+                          total=onceki['rows'], unchanged=onceki['rows'], duplicate=True)
+            print(f"♻️ Aynı dosya zaten yüklü ({anahtar[:12]}, nesil {onceki['generation']}), import atlandı")
+            return onceki['rows'], None
+        
+        onbellek = parse_cache.get(anahtar)
+        print(f"📁 Excel dosyası açılıyor ({'önbellek' if onbellek else reader}, {mode})...")
+        
+        if onbellek is not None:
+            # Aynı dosya daha önce ayrıştırıldı - Excel okunmaz, temiz kayıtlar diskten gelir
+            sutunlar = REQUIRED_COLS + onbellek['sigorta_sutunlari']
+            total_rows = onbellek['rows']
+        elif reader == 'parallel':
+            # Sayfalar / parçalar ayrı süreçlerde okunup temizlenir
+            with timer.stage('read'):
+                kaynak = ParallelExcelReader(filepath, app.config['INGEST_WORKERS'], batch_size)
+            sutunlar = kaynak.sutunlar
+            total_rows = kaynak.tahmini_satir
+            print(f"📑 Sayfalar: {kaynak.sayfalar} ({kaynak.workers} işçi)")
+            if kaynak.atlanan_sayfalar:
+                print(f"⚠️ Zorunlu sütunu olmayan sayfalar atlandı: {kaynak.atlanan_sayfalar}")
+        elif reader == 'stream':
+            # Satır satır oku - bellek dosya boyutundan bağımsız
+            with timer.stage('read'):
+                kaynak = ExcelStream(filepath, batch_size)
+            sutunlar = kaynak.sutunlar
+            total_rows = kaynak.tahmini_satir
+            parcalar = iter(kaynak)
+        else:
+            # Excel'i bir kerede oku ama optimize et
+            with timer.stage('read'):
+                df = pd.read_excel(filepath, engine='openpyxl')
+            sutunlar = list(df.columns)
+            total_rows = len(df)
+            parcalar = iter([df])
+            del df
         
-        print(f"📊 Excel okundu: {len(df)} satır, {len(df.columns)} sütun")
-        print(f"Sütunlar: {list(df.columns)}")
+        print(f"📊 Excel açıldı: ~{total_rows} satır, {len(sutunlar)} sütun")
+        print(f"Sütunlar: {sutunlar}")
         
         # Zorunlu sütunları kontrol et
-        required_cols = ['MARKA', 'MODEL', 'YIL']
-        for col in required_cols:
-            if col not in df.columns:
-                upload_status['error'] = f"'{col}' sütunu bulunamadı!"
-                upload_status['is_processing'] = False
-                return 0, upload_status['error']
+        for col in REQUIRED_COLS:
+            if col not in sutunlar:
+                status['error'] = f"'{col}' sütunu bulunamadı!"
+                status['is_processing'] = False
+                return 0, status['error']
         
         # Sigorta sütunlarını bul
-        sigorta_sutunlari = [col for col in df.columns if col not in required_cols]
+        sigorta_sutunlari = [col for col in sutunlar if col not in REQUIRED_COLS]
         
         print(f"🏢 Sigorta şirketleri: {sigorta_sutunlari}")
+        # Buradan sonra veritabanına yazılıyor: hata olsa da önbellekler yenilenmeli
+        katalog_degisti = True
+        # Şirket listesi Excel sütun sırasını korusun
+        register_insurers(motor, sigorta_sutunlari)
+        
+        status['total'] = total_rows
+        
+        print(f"🚀 Toplam ~{total_rows} satır işlenecek...")
+        
+        def ilerleme(saved_count):
+            status['progress'] = saved_count
+            status['saved'] = saved_count
+            status['rows_per_second'] = round(writer.rows_per_second)
+            print(f"✅ {saved_count}/{total_rows} kayıt eklendi...")
+            if on_progress:
+                on_progress(status)
+        
+        # Replace modunda canlı tabloya dokunmadan vehicles_next'e yaz
+        hedef_tablo = create_staging_table(motor) if mode == 'replace' else None
+        
+        use_copy = app.config['INGEST_USE_COPY']
+        writer = VehicleWriter(
+            oturum,
+            table=hedef_tablo,
+            batch_size=batch_size,
+            use_copy=None if use_copy == 'auto' else use_copy in ('1', 'true', 'yes'),
+            on_flush=ilerleme,
+            sync=(mode == 'sync'),
+            # replace'te fiyatlar yayından sonra catalog_changed'de baştan üretilir
+            update_prices=hedef_tablo is None,
+        )
         
-        saved_count = 0
         skipped_count = 0
-        batch_size = 1000  # Her 1000 kayıtta bir veritabanına yaz
         
-        vehicles_batch = []
+        def temizle(parca):
+            with timer.stage('clean'):
+                return clean_price_frame(parca, sigorta_sutunlari)
         
-        total_rows = len(df)
-        upload_status['total'] = total_rows
-        
-        print(f"🚀 Toplam {total_rows} satır işlenecek...")
-        
-        for idx, row in df.iterrows():
-            sigortalar = {}
-            
-            for sigorta_col in sigorta_sutunlari:
-                fiyat = row[sigorta_col]
-                
-                # Fiyatı string olarak temizle ve sayıya çevir
-                fiyat_raw = str(fiyat).replace(" ", "").replace(",", ".").strip()
-                fiyat_num = pd.to_numeric(fiyat_raw, errors="coerce")
-                
-                # Geçersiz veya <=0 ise ekleme
-                if pd.isna(fiyat_num) or fiyat_num <= 0:
-                    continue
-
-                sigortalar[sigorta_col] = int(fiyat_num)
-            
-            # Eğer hiç sigorta fiyatı yoksa bu satırı atla
-            if not sigortalar:
-                skipped_count += 1
-                continue
-            
-            vehicle = Vehicle(
-                marka=str(row['MARKA']).strip(),
-                model=str(row['MODEL']).strip(),
-                yil=str(int(float(row['YIL']))),
-                sigortalar=sigortalar
-            )
-            
-            vehicles_batch.append(vehicle)
-            saved_count += 1
+        if onbellek is not None:
+            temiz_parcalar = timer.timed('read', parse_cache.read(anahtar, onbellek))
+        elif reader == 'parallel':
+            # Okuma ve temizleme işçi süreçlerinde - beklenen süre 'read' aşamasına yazılır
+            temiz_parcalar = timer.timed('read', kaynak)
+        else:
+            # Sütun bazında temizle (satır satır iterrows yerine)
+            temiz_parcalar = (temizle(parca) for parca in timer.timed('read', parcalar))
+        
+        # İlk ayrıştırmada temiz kayıtlar önbelleğe de yazılır (import başarılı olursa yayına alınır)
+        if onbellek is None:
+            onbellek_yazici = parse_cache.writer(anahtar, sigorta_sutunlari)
+        
+        for kayitlar, atlanan in temiz_parcalar:
+            skipped_count += atlanan
+            if onbellek_yazici is not None:
+                with timer.stage('cache'):
+                    onbellek_yazici.add(kayitlar, atlanan)
             
-            # Her 1000 kayıtta bir veritabanına yaz (BULK INSERT)
-            if len(vehicles_batch) >= batch_size:
-                db.session.bulk_save_objects(vehicles_batch)
-                db.session.commit()
-                
-                # İlerleme güncelle
-                upload_status['progress'] = saved_count
-                upload_status['saved'] = saved_count
-                
-                print(f"✅ {saved_count}/{total_rows} kayıt eklendi...")
-                
-                # Belleği temizle
-                vehicles_batch = []
-                gc.collect()
+            # batch_size doldukça veritabanına yaz (yeni: INSERT / COPY, değişen: upsert)
+            with timer.stage('write'):
+                writer.add(kayitlar)
+            del kayitlar
         
         # Kalan kayıtları ekle
-        if vehicles_batch:
-            db.session.bulk_save_objects(vehicles_batch)
-            db.session.commit()
+        with timer.stage('write'):
+            writer.flush()
+        saved_count = writer.rows
+        # Sütunlar doğru ama hiç satır okunamadıysa (yanlış / boş sayfa) başarı sayılmaz
+        if saved_count == 0 and skipped_count == 0:
+            raise ValueError("Dosyada okunacak satır bulunamadı")
+        
+        # Sync modunda dosyada olmayan araçları sil
+        if mode == 'sync':
+            with timer.stage('write'):
+                writer.delete_missing()
+        
+        # Replace modunda yeni tabloyu tek seferde yayına al
+        if mode == 'replace':
+            if saved_count == 0:
+                raise ValueError("Dosyada geçerli kayıt yok, mevcut liste korundu")
+            with timer.stage('publish'):
+                oturum.commit()
+                # Trigram index yeni tabloda takastan önce hazır olsun
+                sync_search_index(motor, hedef_tablo.name)
+                sure = swap_staging_table(motor, after=_tablo_takasi)
+            print(f"🔁 vehicles_next yayına alındı ({sure * 1000:.1f} ms), önceki liste vehicles_prev'de")
         
-        # DataFrame'i belleğe sil
-        del df
         gc.collect()
         
-        upload_status['is_processing'] = False
-        upload_status['progress'] = saved_count
-        upload_status['saved'] = saved_count
-        upload_status['total'] = saved_count
-        
-        print(f"\n🎉 TAMAMLANDI: {saved_count} kayıt eklendi, {skipped_count} atlandı")
+        if onbellek_yazici is not None:
+            try:
+                with timer.stage('cache'):
+                    onbellek_yazici.commit()
+                print(f"💾 Ayrıştırılmış liste önbelleğe yazıldı: {parse_cache.path(anahtar)}")
+            except Exception as e:
+                print(f"⚠️ Ayrıştırma önbelleği yazılamadı: {str(e)}")
+            onbellek_yazici = None
+        
+        status.update(writer.stats())
+        status['is_processing'] = False
+        status['progress'] = saved_count
+        status['saved'] = saved_count
+        status['total'] = saved_count
+        
+        print(f"\n🎉 TAMAMLANDI: {saved_count} kayıt işlendi, {skipped_count} atlandı "
+              f"({writer.rows_per_second:,.0f} kayıt/sn yazma)")
+        print(f"   ➕ {writer.inserted} yeni, ✏️ {writer.updated} güncellendi, "
+              f"= {writer.unchanged} aynı, 🗑️ {writer.deleted} silindi")
         
         return saved_count, None
         
     except Exception as e:
-        db.session.rollback()
-        upload_status['is_processing'] = False
-        upload_status['error'] = str(e)
+        oturum.rollback()
+        status['is_processing'] = False
+        status['error'] = str(e)
         print(f"❌ HATA: {str(e)}")
         import traceback
         traceback.print_exc()
         return 0, str(e)
+    
+    finally:
+        if kaynak is not None:
+            kaynak.close()
+        oturum.close()
+        if onbellek_yazici is not None:
+            onbellek_yazici.discard()
+        # Yarım kalan import da veri değiştirmiş olabilir - önbellekleri geçersiz kıl
+        if katalog_degisti:
+            with timer.stage('catalog'):
+                # Fiyatlar batch'lerle (upsert / sync) ya da takasta (replace) yazıldı
+                nesil = catalog_changed(imported=True, engine=motor, rebuild_prices=False,
+                                        search_index=(mode != 'replace'))
+            if not status.get('error'):
+                try:
+                    mark_loaded(app.config['CATALOG_FOLDER'], anahtar, mode, nesil, status.get('saved') or 0)
+                except Exception as e:
+                    print(f"⚠️ Yüklenen dosya bilgisi yazılamadı: {str(e)}")
+        status['stages'] = timer.finish(rows=status.get('progress') or 0)
+        print(f"⏱️ Aşama süreleri (sn): {status['stages']}")
+        if timer.bellek:
+            status['stages_memory_mb'] = timer.bellek
+            print(f"🧠 Aşama tepe belleği (MB): {timer.bellek}")
+
+def _tablo_takasi(conn):
+    """vehicles takasıyla aynı transaction'da: fiyatlar ve FTS yeni tablonun kimlikleriyle"""
+    print(f"💰 Fiyat tablosu yenilendi: {refill_vehicle_prices(conn)} fiyat")
+    refill_search_index(conn)
+
+
+def catalog_changed(imported=False, engine=None, rebuild_prices=True, search_index=True):
+    """Araç verisi değişti: nesli yenile, arama index'ini ve katalog dosyasını hazırla
+
+    engine: fiyat tablosu / özet / arama index'inin yazılacağı engine
+    (import'ta ingest engine'i; verilmezse ana engine).
+    rebuild_prices / search_index=False: fiyatlar / arama index'i zaten yazıldı
+    (VehicleWriter batch'leri ya da tablo takası, bkz. _tablo_takasi).
+    """
+    engine = engine or db.engine
+    if rebuild_prices:
+        try:
+            fiyat_sayisi = rebuild_vehicle_prices(engine)
+            print(f"💰 Fiyat tablosu yenilendi: {fiyat_sayisi} fiyat")
+        except Exception as e:
+            print(f"⚠️ Fiyat tablosu yenilenemedi: {str(e)}")
+    # Özet nesil yenilenmeden yazılmalı: okuyanlar yeni nesilde yeni sayıları görsün
+    try:
+        refresh_catalog_stats(engine, imported=imported)
+    except Exception as e:
+        print(f"⚠️ Katalog özeti güncellenemedi: {str(e)}")
+    nesil = bump_generation('catalog')
+    if search_index:
+        try:
+            sync_search_index(engine)
+        except Exception as e:
+            print(f"⚠️ Arama index'i güncellenemedi: {str(e)}")
+    # /api/vehicles için katalog dosyasını yeni nesille hazırla
+    try:
+        export_catalog_snapshot(app.config['CATALOG_FOLDER'], nesil)
+        print(f"📦 Katalog dosyası yazıldı: {nesil}")
+    except Exception as e:
+        db.session.rollback()
+        print(f"⚠️ Katalog dosyası yazılamadı (ilk istekte oluşturulacak): {str(e)}")
+    # Sütunlu motorun işçileri yeni nesli veritabanına gitmeden mmap ile açsın
+    if app.config['QUOTE_ENGINE'] == 'columnar':
+        try:
+            export_catalog_arrays(app.config['CATALOG_FOLDER'], nesil)
+            print(f"🧮 Katalog dizileri yazıldı: {nesil}")
+        except Exception as e:
+            db.session.rollback()
+            print(f"⚠️ Katalog dizileri yazılamadı (ilk istekte oluşturulacak): {str(e)}")
+    return nesil
 
 @app.route('/')
 def index():
-    total_records = Vehicle.query.count()
-    
-    unique_brands = db.session.query(Vehicle.marka).distinct().count()
-    
-    first_vehicle = Vehicle.query.first()
-    sigorta_sirketleri = []
-    if first_vehicle and first_vehicle.sigortalar:
-        sigorta_sirketleri = list(first_vehicle.sigortalar.keys())
+    # Sayımlar import sırasında hesaplanır (catalog_stats) - burada tablo taranmaz
+    ozet = get_catalog_stats()
     
     return render_template('index.html', 
-                         total_records=total_records,
-                         unique_brands=unique_brands,
-                         sigorta_sirketleri=sigorta_sirketleri)
+                         total_records=ozet['total_records'],
+                         unique_brands=ozet['unique_brands'],
+                         sigorta_sirketleri=[s['name'] for s in ozet['insurers']],
+                         sigorta_kapsami={s['name']: s['vehicles'] for s in ozet['insurers']},
+                         son_yukleme=ozet['last_import_at'])
 
 @app.route('/upload', methods=['POST'])
 def upload_file():
-    global upload_status
-    
-    if upload_status['is_processing']:
-        flash('⏳ Bir dosya zaten işleniyor, lütfen bekleyin!', 'warning')
-        return redirect(url_for('index'))
-    
     if 'file' not in request.files:
         flash('Dosya seçilmedi!', 'error')
         return redirect(url_for('index'))
@@ -212,55 +581,211 @@ def upload_file():
         flash('Dosya seçilmedi!', 'error')
         return redirect(url_for('index'))
     
+    mode = request.form.get('mode') or app.config['IMPORT_MODE']
+    if mode not in IMPORT_MODES:
+        flash('Geçersiz yükleme modu!', 'error')
+        return redirect(url_for('index'))
+    
     if file and allowed_file(file.filename):
         filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        # Aynı adla art arda yüklenen dosyalar birbirini ezmesin
+        kayit_adi = f"{datetime.utcnow():%Y%m%d%H%M%S%f}_{filename}"
+        filepath = os.path.join(app.config['UPLOAD_FOLDER'], kayit_adi)
         file.save(filepath)
         
         print(f"📁 Dosya kaydedildi: {filepath}")
         
-        # ARKA PLANDA İŞLE - TIMEOUT YOK
-        def process_in_background():
-            with app.app_context():
-                count, error = process_excel_sigorta(filepath)
-                
-                # Dosyayı sil
-                try:
-                    os.remove(filepath)
-                    print(f"🗑️ Geçici dosya silindi: {filepath}")
-                except:
-                    pass
-                
-                if error:
-                    print(f"❌ Hata: {error}")
-                else:
-                    print(f"✅ Başarılı: {count} kayıt")
-        
-        thread = threading.Thread(target=process_in_background, daemon=True)
-        thread.start()
-        
-        flash('📤 Dosya yüklendi! Arka planda işleniyor... (İlerleyi /upload-status adresinden takip edebilirsiniz)', 'info')
+        # Aynı dosya zaten yüklüyse kuyruğa alma
+        if already_imported(sha256_file(filepath), mode):
+            os.remove(filepath)
+            flash('♻️ Bu dosya zaten yüklü, liste değişmedi', 'info')
+            return redirect(url_for('index'))
+        
+        # KUYRUĞA AL - işçi sırayla işler, süreç yeniden başlasa da kaybolmaz
+        job = enqueue_import(filepath, filename, mode, app.config['JOB_MAX_ATTEMPTS'])
+        
+        flash(f'📤 Dosya sıraya alındı (iş #{job.id})! İlerlemeyi /upload-status/{job.id} adresinden takip edebilirsiniz', 'info')
         return redirect(url_for('index'))
     
     flash('Geçersiz dosya türü! Sadece .xlsx veya .xls', 'error')
     return redirect(url_for('index'))
 
+def _yukleme_hatasi(e):
+    cevap = {'error': str(e)}
+    if e.offset is not None:
+        cevap['offset'] = e.offset
+    return jsonify(cevap), e.status
+
+@app.route('/upload/chunks', methods=['POST'])
+def upload_chunks_create():
+    """Parçalı yükleme başlat: {filename, size, sha256, mode}"""
+    veri = request.get_json(silent=True) or {}
+    mode = veri.get('mode') or app.config['IMPORT_MODE']
+    if mode not in IMPORT_MODES:
+        return jsonify({'error': 'Geçersiz yükleme modu!'}), 400
+    try:
+        yukleme = chunked_uploads.create(veri.get('filename'), veri.get('size'), veri.get('sha256'), mode)
+    except UploadError as e:
+        return _yukleme_hatasi(e)
+    print(f"📤 Parçalı yükleme başladı: {yukleme['filename']} ({yukleme['size']} bayt, {yukleme['id']})")
+    return jsonify(yukleme), 201
+
+@app.route('/upload/chunks/<upload_id>', methods=['GET'])
+def upload_chunks_status(upload_id):
+    """Devam etmek için güncel offset"""
+    try:
+        return jsonify(chunked_uploads.status(upload_id))
+    except UploadError as e:
+        return _yukleme_hatasi(e)
+
+@app.route('/upload/chunks/<upload_id>', methods=['PUT'])
+def upload_chunks_append(upload_id):
+    """Ham gövdeyi offset'e ekle (?offset= veya Upload-Offset, isteğe bağlı X-Chunk-Sha256)"""
+    offset = request.args.get('offset', request.headers.get('Upload-Offset'), type=int)
+    if offset is None:
+        return jsonify({'error': 'offset gerekli'}), 400
+    try:
+        # request.stream: gövde form ayrıştırılmadan doğrudan dosyaya yazılır
+        yeni_offset = chunked_uploads.append(
+            upload_id, offset, request.stream, request.content_length,
+            request.headers.get('X-Chunk-Sha256'),
+        )
+    except UploadError as e:
+        return _yukleme_hatasi(e)
+    return jsonify({'id': upload_id, 'offset': yeni_offset})
+
+@app.route('/upload/chunks/<upload_id>', methods=['DELETE'])
+def upload_chunks_abort(upload_id):
+    try:
+        chunked_uploads.abort(upload_id)
+    except UploadError as e:
+        return _yukleme_hatasi(e)
+    return jsonify({'success': True})
+
+@app.route('/upload/chunks/<upload_id>/finalize', methods=['POST'])
+def upload_chunks_finalize(upload_id):
+    """Tüm dosyayı doğrula ve import kuyruğuna al"""
+    try:
+        yukleme = chunked_uploads.finalize(
+            upload_id,
+            lambda yol, ad, mode: enqueue_import(yol, ad, mode, app.config['JOB_MAX_ATTEMPTS']),
+            skip=lambda sha256, mode: already_imported(sha256, mode) is not None,
+        )
+    except UploadError as e:
+        return _yukleme_hatasi(e)
+    if yukleme.get('duplicate'):
+        print(f"♻️ Parçalı yükleme zaten yüklü dosya: {yukleme['filename']}, kuyruğa alınmadı")
+        return jsonify({'id': upload_id, 'duplicate': True, 'job_id': None})
+    print(f"📁 Parçalı yükleme tamamlandı: {yukleme['filepath']} (iş #{yukleme['job_id']})")
+    return jsonify({
+        'id': upload_id,
+        'job_id': yukleme['job_id'],
+        'status_url': url_for('upload_job_status', job_id=yukleme['job_id']),
+    }), 202
+
 @app.route('/upload-status')
 def upload_status_page():
-    """İşlem durumunu göster"""
-    global upload_status
+    """Son (veya çalışan) işin durumunu göster"""
+    job = ImportJob.query.filter_by(status='isleniyor').first() \
+        or ImportJob.query.order_by(ImportJob.id.desc()).first()
+    if job:
+        return jsonify(job.to_dict())
     return jsonify(upload_status)
 
+@app.route('/upload-status/<int:job_id>')
+def upload_job_status(job_id):
+    """Belirli bir yükleme işinin durumu"""
+    job = db.session.get(ImportJob, job_id)
+    if not job:
+        return jsonify({'error': 'İş bulunamadı'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/upload-jobs')
+def upload_jobs():
+    """Son yükleme işleri"""
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    jobs = ImportJob.query.order_by(ImportJob.id.desc()).limit(limit).all()
+    return jsonify([job.to_dict() for job in jobs])
+
+@app.route('/upload-jobs/stats')
+def upload_jobs_stats():
+    """Kuyruk derinliği ve iş hacmi"""
+    return jsonify(queue_stats())
+
+@app.route('/upload-jobs/<int:job_id>/cancel', methods=['POST'])
+def upload_job_cancel(job_id):
+    """Bekleyen işi iptal et, çalışan işe iptal isteği gönder"""
+    try:
+        job = db.session.get(ImportJob, job_id)
+        if not job:
+            return jsonify({'error': 'İş bulunamadı'}), 404
+        
+        if job.status == 'beklemede':
+            job.status = 'iptal'
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+            try:
+                os.remove(job.filepath)
+            except OSError:
+                pass
+            return jsonify({'success': True, 'message': 'İş iptal edildi'})
+        
+        if job.status == 'isleniyor':
+            job.cancel_requested = True
+            db.session.commit()
+            return jsonify({'success': True, 'message': 'İptal isteği gönderildi'})
+        
+        return jsonify({'error': f'İş zaten bitmiş ({job.status})'}), 400
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/upload-jobs/<int:job_id>/retry', methods=['POST'])
+def upload_job_retry(job_id):
+    """Hata almış işi yeniden sıraya al"""
+    try:
+        job = db.session.get(ImportJob, job_id)
+        if not job:
+            return jsonify({'error': 'İş bulunamadı'}), 404
+        
+        if job.status != 'hata':
+            return jsonify({'error': f'Sadece hatalı işler yeniden denenebilir ({job.status})'}), 400
+        
+        if not os.path.exists(job.filepath):
+            return jsonify({'error': 'Yüklenen dosya artık yok, lütfen tekrar yükleyin'}), 400
+        
+        job.status = 'beklemede'
+        job.attempts = 0
+        job.error = None
+        job.cancel_requested = False
+        job.finished_at = None
+        db.session.commit()
+        
+        return jsonify({'success': True, 'message': 'İş yeniden sıraya alındı'})
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/view')
 def view_data():
-    page = request.args.get('page', 1, type=int)
     per_page = 50
     
-    vehicles = Vehicle.query.order_by(Vehicle.created_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    # OFFSET yerine imleç: derin sayfalar da ilk sayfa kadar hızlı
+    try:
+        vehicles = fetch_page(
+            per_page,
+            cursor=request.args.get('cursor'),
+            before=request.args.get('before'),
+        )
+    except ValueError:
+        return redirect(url_for('view_data'))
+    for vehicle in vehicles['items']:
+        if vehicle['created_at']:
+            vehicle['created_at'] = datetime.fromisoformat(vehicle['created_at'])
     
-    return render_template('view_data.html', vehicles=vehicles)
+    return render_template('view_data.html', vehicles=vehicles, total=catalog_cache.count())
 
 @app.route('/admin-panel')
 def admin_panel():
@@ -277,31 +802,87 @@ def bank_management():
 # API ROUTES
 # ==========================================
 
+def _katalog_dosyasi_istendi():
+    """Parametresiz /api/vehicles: sayfa / ndjson değil, hazır katalog dosyası"""
+    args = request.args
+    return not (args.get('format') == 'ndjson' or args.get('cursor')
+                or 'limit' in args or 'fields' in args)
+
+
+def _katalog_encoding():
+    """Katalog dosyasının gönderileceği sıkıştırma (ETag eki)"""
+    if _katalog_dosyasi_istendi():
+        return preferred_encoding(request.accept_encodings)
+    return None
+
+
 @app.route('/api/vehicles')
+@conditional('catalog', encoding=_katalog_encoding)
 def api_vehicles():
-    """Tüm araçları döndür"""
-    vehicles = Vehicle.query.all()
-    return jsonify([v.to_dict() for v in vehicles])
+    """Tüm araçları döndür
+
+    Parametresiz: önceden yazılmış, sıkıştırılmış katalog dosyası
+    ?limit=&cursor=&fields=: imleçli sayfa (created_at, id azalan)
+    ?format=ndjson: satır satır JSON akışı (fields / cursor ile)
+    """
+    cursor = request.args.get('cursor')
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        if cursor:
+            decode_cursor(cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if request.args.get('format') == 'ndjson':
+        def satirlar():
+            for satir in stream_rows(fields, cursor, app.config['INGEST_BATCH_SIZE']):
+                yield json.dumps(satir, separators=(',', ':')) + '\n'
+        return Response(stream_with_context(satirlar()), mimetype='application/x-ndjson')
+
+    if not _katalog_dosyasi_istendi():
+        limit = request.args.get('limit', app.config['API_PAGE_SIZE'], type=int)
+        limit = max(1, min(limit, app.config['API_MAX_PAGE_SIZE']))
+        sayfa = fetch_page(limit, cursor=cursor, fields=fields)
+        return jsonify({
+            'items': sayfa['items'],
+            'limit': limit,
+            'next_cursor': sayfa['next_cursor'],
+        })
+
+    nesil = get_generation('catalog')
+    yol = ensure_catalog_snapshot(app.config['CATALOG_FOLDER'], nesil)
+    dosya, encoding = pick_encoding(yol, request.accept_encodings)
+
+    # conditional=True: Range / If-Range istekleri 206 ile parça parça döner;
+    # her sıkıştırma kendi ETag'iyle, parçalar sürümler arasında karışmaz
+    resp = send_file(
+        os.path.abspath(dosya),
+        mimetype='application/json',
+        conditional=True,
+        etag=f'catalog-{nesil}-{encoding}' if encoding else f'catalog-{nesil}',
+        max_age=app.config['API_CACHE_MAX_AGE'],
+    )
+    if encoding:
+        resp.headers['Content-Encoding'] = encoding
+    return resp
 
 @app.route('/api/vehicles/<int:vehicle_id>')
+@read_only
 def api_vehicle_detail(vehicle_id):
     """Tek bir aracın detayı"""
     vehicle = Vehicle.query.get_or_404(vehicle_id)
     return jsonify(vehicle.to_dict())
 
 @app.route('/api/vehicle/<marka>/<model>/<yil>')
+@conditional('catalog')
 def api_vehicle_search(marka, model, yil):
     """Belirli bir aracı ara"""
-    vehicle = Vehicle.query.filter_by(
-        marka=marka,
-        model=model,
-        yil=yil
-    ).first()
+    vehicle = catalog_cache.vehicle(marka, model, yil)
     
     if vehicle:
         return jsonify({
             'success': True,
-            'data': vehicle.to_dict()
+            'data': vehicle
         })
     else:
         return jsonify({
@@ -310,48 +891,131 @@ def api_vehicle_search(marka, model, yil):
         }), 404
 
 @app.route('/api/brands')
+@conditional('catalog')
 def api_brands():
     """Tüm markaları döndür"""
-    brands = db.session.query(Vehicle.marka).distinct().order_by(Vehicle.marka).all()
-    return jsonify([b[0] for b in brands])
+    return jsonify(catalog_cache.brands())
 
 @app.route('/api/models/<brand>')
+@conditional('catalog')
 def api_models(brand):
     """Belirli bir markaya ait modelleri döndür"""
-    models = db.session.query(Vehicle.model).filter_by(marka=brand).distinct().order_by(Vehicle.model).all()
-    return jsonify([m[0] for m in models])
+    return jsonify(catalog_cache.models(brand))
 
 @app.route('/api/years/<brand>')
+@conditional('catalog')
 def api_years_by_brand(brand):
     """Belirli bir markaya ait tüm yılları döndür"""
-    years = db.session.query(Vehicle.yil).filter_by(marka=brand).distinct().order_by(Vehicle.yil.desc()).all()
-    return jsonify([y[0] for y in years])
+    return jsonify(catalog_cache.years(brand))
 
 @app.route('/api/models/<brand>/<yil>')
+@conditional('catalog')
 def api_models_by_year(brand, yil):
     """Belirli bir marka ve yıla ait modelleri döndür"""
-    models = db.session.query(Vehicle.model).filter_by(
-        marka=brand, 
-        yil=yil
-    ).distinct().order_by(Vehicle.model).all()
-    return jsonify([m[0] for m in models])
+    return jsonify(catalog_cache.models_by_year(brand, yil))
 
 @app.route('/api/years/<brand>/<model>')
+@conditional('catalog')
 def api_years(brand, model):
     """Belirli bir marka ve modele ait yılları döndür"""
-    years = db.session.query(Vehicle.yil).filter_by(
-        marka=brand, 
-        model=model
-    ).distinct().order_by(Vehicle.yil.desc()).all()
-    return jsonify([y[0] for y in years])
+    return jsonify(catalog_cache.years_by_model(brand, model))
 
 @app.route('/api/sigorta-sirketleri')
+@conditional('catalog')
 def api_sigorta_sirketleri():
     """Tüm sigorta şirketlerinin listesi"""
-    vehicle = Vehicle.query.first()
-    if vehicle and vehicle.sigortalar:
-        return jsonify(list(vehicle.sigortalar.keys()))
-    return jsonify([])
+    return jsonify([s['name'] for s in get_catalog_stats()['insurers']])
+
+@app.route('/api/cheapest-quote/<marka>/<model>/<yil>')
+@conditional('catalog')
+def api_cheapest_quote(marka, model, yil):
+    """Araç için şirket teklifleri, en ucuz önce (?limit=)"""
+    vehicle = catalog_cache.vehicle(marka, model, yil)
+    if not vehicle:
+        return jsonify({'error': 'Araç bulunamadı'}), 404
+    
+    teklifler = catalog_cache.quotes(marka, model, yil, request.args.get('limit', type=int))
+    return jsonify({
+        'id': vehicle['id'],
+        'marka': vehicle['marka'],
+        'model': vehicle['model'],
+        'yil': vehicle['yil'],
+        'en_ucuz': teklifler[0] if teklifler else None,
+        'teklifler': teklifler,
+    })
+
+@app.route('/api/price-range')
+@conditional('catalog')
+def api_price_range():
+    """Bir şirkette fiyatı aralıkta olan araçlar (?sigorta=&min=&max=&marka=&limit=)"""
+    sigorta = request.args.get('sigorta')
+    if not sigorta:
+        return jsonify({'error': 'sigorta parametresi gerekli'}), 400
+    
+    limit = max(1, min(request.args.get('limit', 100, type=int), app.config['API_MAX_PAGE_SIZE']))
+    araclar = vehicles_in_price_range(
+        sigorta,
+        min_price=request.args.get('min', type=int),
+        max_price=request.args.get('max', type=int),
+        marka=request.args.get('marka'),
+        limit=limit,
+    )
+    if araclar is None:
+        return jsonify({'error': 'Sigorta şirketi bulunamadı'}), 404
+    return jsonify(araclar)
+
+@app.route('/api/quotes/batch', methods=['POST'])
+@read_only
+def api_quotes_batch():
+    """Birden çok aracın fiyatları tek istekte
+
+    Gövde: {"vehicles": [{"marka", "model", "yil"} veya [marka, model, yil], ...],
+            "sigortalar": ["AXA", ...] (opsiyonel), "cheapest": true (opsiyonel)}
+    Sonuçlar istek sırasıyla döner; bulunamayan araçlar found=false ile.
+    """
+    data = request.get_json(silent=True) or {}
+    araclar = data.get('vehicles')
+    if not isinstance(araclar, list) or not araclar:
+        return jsonify({'error': 'vehicles listesi gerekli'}), 400
+    if len(araclar) > app.config['BATCH_QUOTE_MAX']:
+        return jsonify({'error': f"En fazla {app.config['BATCH_QUOTE_MAX']} araç gönderilebilir"}), 400
+    
+    anahtarlar = []
+    for arac in araclar:
+        if isinstance(arac, dict):
+            arac = (arac.get('marka'), arac.get('model'), arac.get('yil'))
+        if not isinstance(arac, (list, tuple)) or len(arac) != 3 or any(v in (None, '') for v in arac):
+            return jsonify({'error': f'Geçersiz araç: {arac}'}), 400
+        anahtarlar.append(tuple(str(v).strip() for v in arac))
+    
+    sigortalar = data.get('sigortalar')
+    if sigortalar is not None and (
+        not isinstance(sigortalar, list) or not all(isinstance(ad, str) for ad in sigortalar)
+    ):
+        return jsonify({'error': 'sigortalar şirket adlarından oluşan bir liste olmalı'}), 400
+    en_ucuz = bool(data.get('cheapest'))
+    
+    bulunan = batch_vehicle_quotes(anahtarlar, sigortalar)
+    
+    sonuclar = []
+    for marka, model, yil in anahtarlar:
+        kayit = {'marka': marka, 'model': model, 'yil': yil}
+        if (marka, model, yil) not in bulunan:
+            kayit['found'] = False
+        else:
+            vehicle_id, teklifler = bulunan[(marka, model, yil)]
+            kayit.update(found=True, id=vehicle_id, sigortalar=dict(teklifler))
+            if en_ucuz:
+                kayit['en_ucuz'] = (
+                    {'sigorta': teklifler[0][0], 'fiyat': teklifler[0][1]} if teklifler else None
+                )
+        sonuclar.append(kayit)
+    
+    return jsonify({
+        'results': sonuclar,
+        'found': sum(1 for k in sonuclar if k['found']),
+        'missing': sum(1 for k in sonuclar if not k['found']),
+    })
 
 @app.route('/api/siparis-kaydet', methods=['POST'])
 def api_siparis_kaydet():
@@ -392,21 +1056,16 @@ def api_siparis_kaydet():
         }), 400
 
 @app.route('/api/search')
+@read_only
 def api_search():
-    """Marka veya model ile arama"""
-    query = request.args.get('q', '')
+    """Marka veya model ile arama (en iyi eşleşme önce)"""
+    query = request.args.get('q', '').strip()
     
     if len(query) < 2:
         return jsonify([])
     
-    vehicles = Vehicle.query.filter(
-        db.or_(
-            Vehicle.marka.ilike(f'%{query}%'),
-            Vehicle.model.ilike(f'%{query}%')
-        )
-    ).limit(100).all()
-    
-    return jsonify([v.to_dict() for v in vehicles])
+    limit = max(1, min(request.args.get('limit', 100, type=int), 100))
+    return jsonify(vehicle_search.search(query, limit))
 
 # ==========================================
 # ADMIN ROUTES
@@ -495,6 +1154,7 @@ def clear_data():
     try:
         Vehicle.query.delete()
         db.session.commit()
+        catalog_changed()
         flash('✅ Tüm veriler temizlendi!', 'success')
     except Exception as e:
         db.session.rollback()
@@ -502,15 +1162,85 @@ def clear_data():
     
     return redirect(url_for('index'))
 
+@app.route('/admin/rollback-import', methods=['POST'])
+def admin_rollback_import():
+    """Admin - Son tam yenilemeden önceki listeye dön"""
+    try:
+        if rollback_vehicle_table(db.engine, after=_tablo_takasi):
+            catalog_changed(rebuild_prices=False, search_index=False)
+            flash('↩️ Önceki fiyat listesine dönüldü!', 'success')
+        else:
+            flash('⚠️ Dönülecek önceki liste bulunamadı!', 'warning')
+    except Exception as e:
+        flash(f'❌ Hata: {str(e)}', 'error')
+    
+    return redirect(url_for('index'))
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus metrikleri (bu sürecin değerleri)"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/admin/profiles')
+def admin_profiles():
+    """Admin - Kayıtlı profiller (import ve istek), en yeni önce"""
+    return jsonify({
+        'imports_enabled': app.config['PROFILE_IMPORTS'],
+        'requests_enabled': app.config['PROFILE_REQUESTS'],
+        'header': app.config['PROFILE_HEADER'],
+        'profiles': profiler.recent(),
+    })
+
+@app.route('/admin/profiles/<profile_id>')
+def admin_profile(profile_id):
+    """Admin - Profil özeti; ?format=pstats (.prof dosyası) veya ?format=text"""
+    meta = profiler.get(profile_id)
+    if meta is None:
+        return jsonify({'error': 'Profil bulunamadı'}), 404
+    
+    bicim = request.args.get('format', 'json')
+    if bicim == 'pstats':
+        return send_file(os.path.abspath(profiler.path(profile_id, 'prof')),
+                         mimetype='application/octet-stream',
+                         as_attachment=True, download_name=f'{profile_id}.prof')
+    if bicim == 'text':
+        sirala = request.args.get('sort', 'cumulative')
+        if sirala not in ('cumulative', 'tottime', 'calls'):
+            return jsonify({'error': 'Geçersiz sıralama'}), 400
+        return Response(profiler.text_report(profile_id, sirala), mimetype='text/plain; charset=utf-8')
+    return jsonify(meta)
+
+def _migrate_vehicle_key():
+    """idx_vehicle_lookup'ı tekil yap; silinen tekrar satır sayısı (zaten tekilse None)"""
+    silinen = ensure_vehicle_key_unique(db.engine)
+    if silinen is None:
+        print("🔑 idx_vehicle_lookup zaten tekil")
+        return None
+    print(f"🔑 idx_vehicle_lookup tekil index'e çevrildi, {silinen} tekrar satır silindi")
+    if silinen:
+        catalog_changed()
+    return silinen
+
+
+@app.cli.command('migrate-vehicle-key')
+def migrate_vehicle_key_command():
+    """Tekrarlayan (marka, model, yil) satırlarını sil, tekil index'i oluştur"""
+    # Hata yakalanmaz: komut sıfırdan farklı kodla biter
+    _migrate_vehicle_key()
+
+
 @app.route('/init-db')
 def init_db():
     """Create all database tables"""
     try:
         db.create_all()
+        silinen = _migrate_vehicle_key()
+        ensure_vehicle_indexes(db.engine)
         return jsonify({
             'success': True,
             'message': 'Database tables created successfully!',
-            'tables': ['vehicles', 'users']
+            'tables': ['vehicles', 'users'],
+            'duplicates_deleted': silinen or 0,
         })
     except Exception as e:
         return jsonify({
@@ -535,6 +1265,7 @@ os.makedirs(LOGO_FOLDER, exist_ok=True)
 # ==========================================
 
 @app.route('/api/logo')
+@conditional('settings')
 def api_logo():
     try:
         settings = SiteSettings.query.first()
@@ -576,6 +1307,7 @@ def admin_upload_logo():
             settings = SiteSettings(logo_path=url)
             db.session.add(settings)
         db.session.commit()
+        bump_generation('settings')
 
         flash('✅ Logo başarıyla güncellendi!', 'success')
         return redirect(url_for('index'))
@@ -591,6 +1323,7 @@ def admin_delete_logo():
         if settings and settings.logo_path:
             settings.logo_path = None
             db.session.commit()
+            bump_generation('settings')
             flash('✅ Logo başarıyla silindi!', 'success')
         else:
             flash('⚠️ Silinecek logo bulunamadı!', 'warning')
@@ -612,6 +1345,7 @@ from models import db, Vehicle, User, SiteSettings, BankAccount
 # ==========================================
 
 @app.route('/api/bank-accounts')
+@conditional('bank_accounts')
 def api_bank_accounts():
     """Frontend'e aktif banka hesaplarını döndür"""
     try:
@@ -656,6 +1390,7 @@ def admin_add_bank_account():
         
         db.session.add(account)
         db.session.commit()
+        bump_generation('bank_accounts')
         
         return jsonify({
             'success': True,
@@ -682,6 +1417,7 @@ def admin_update_bank_account(account_id):
         account.order = data.get('order', account.order)
         
         db.session.commit()
+        bump_generation('bank_accounts')
         
         return jsonify({
             'success': True,
@@ -700,6 +1436,7 @@ def admin_toggle_bank_account(account_id):
         account = BankAccount.query.get_or_404(account_id)
         account.is_active = not account.is_active
         db.session.commit()
+        bump_generation('bank_accounts')
         
         return jsonify({
             'success': True,
@@ -718,6 +1455,7 @@ def admin_delete_bank_account(account_id):
         account = BankAccount.query.get_or_404(account_id)
         db.session.delete(account)
         db.session.commit()
+        bump_generation('bank_accounts')
         
         return jsonify({
             'success': True,
@@ -849,6 +1587,10 @@ def admin_add_notes(request_id):
 
 
 
+# Yükleme kuyruğu işçisi (süreç başına bir thread)
+# ParallelExcelReader'ın spawn ile açtığı alt süreçlerde başlatılmaz
+if app.config['JOB_WORKER'] == 'thread' and multiprocessing.parent_process() is None:
+    start_worker_thread(app, process_excel_sigorta)
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
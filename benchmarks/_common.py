@@ -0,0 +1,159 @@
+"""Benchmark scriptleri için ortak yardımcılar"""
+import os
+import resource
+import sys
+
+import numpy as np
+import pandas as pd
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+BUNDLED_FILES = ['2015oncesi.xlsx', '2015sonrası.xlsx']
+
+# Paketteki dosyalar tek fiyat sütunu içeriyor, gerçek listeler gibi
+# bir düzine şirkete çoğaltıyoruz
+SIGORTA_SIRKETLERI = [
+    'ALLIANZ', 'AXA', 'ANADOLU', 'SOMPO', 'HDI', 'MAPFRE',
+    'AK', 'QUICK', 'NEOVA', 'TURKIYE', 'RAY', 'DOGA',
+]
+
+
+def bundled_path(name):
+    return os.path.join(REPO_DIR, name)
+
+
+def load_bundled_frame(name, sirketler=SIGORTA_SIRKETLERI, seed=0):
+    """Paketteki xlsx dosyasını uygulamanın beklediği formata çevir
+
+    'Marka Adı | Tip Adı | Yıl | Fiyat' -> 'MARKA | MODEL | YIL | Şirket1...'
+    Şirketlerin yarısı '123 456,7' gibi metin olarak yazılır ki string
+    temizleme yolu da ölçülsün; bir kısım hücre boş bırakılır.
+    """
+    kaynak = pd.read_excel(bundled_path(name), engine='openpyxl')
+    kaynak.columns = [str(c).strip() for c in kaynak.columns]
+
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'MARKA': kaynak['Marka Adı'],
+        'MODEL': kaynak['Tip Adı'],
+        'YIL': kaynak['Yıl'],
+    })
+    return _sirket_sutunlari(df, kaynak['Fiyat'].astype('float64').to_numpy(), sirketler, rng)
+
+
+def _sirket_sutunlari(df, fiyat, sirketler, rng):
+    """Baz fiyattan şirket sütunları üret: yarısı sayı, yarısı '123 456,7' metni, %5 boş"""
+    for i, sirket in enumerate(sirketler):
+        carpan = rng.uniform(0.8, 1.2, size=len(df))
+        degerler = np.round(fiyat * carpan, 1)
+        bos = rng.random(len(df)) < 0.05
+        if i % 2:
+            metin = pd.Series(degerler).map(lambda v: f"{v:,.1f}".replace(',', ' ').replace('.', ','))
+            metin[bos] = ''
+            df[sirket] = metin.to_numpy()
+        else:
+            degerler[bos] = np.nan
+            df[sirket] = degerler
+    return df
+
+
+_tohum = None
+
+
+def _tohum_anahtarlar():
+    """Paketteki iki listenin tekil (MARKA, MODEL, YIL, Fiyat) satırları"""
+    global _tohum
+    if _tohum is None:
+        parcalar = []
+        for name in BUNDLED_FILES:
+            kaynak = pd.read_excel(bundled_path(name), engine='openpyxl')
+            kaynak.columns = [str(c).strip() for c in kaynak.columns]
+            parcalar.append(pd.DataFrame({
+                'MARKA': kaynak['Marka Adı'].astype(str).str.strip(),
+                'MODEL': kaynak['Tip Adı'].astype(str).str.strip(),
+                'YIL': kaynak['Yıl'].astype(str).str.strip(),
+                'Fiyat': kaynak['Fiyat'].astype('float64'),
+            }))
+        _tohum = (
+            pd.concat(parcalar, ignore_index=True)
+            .drop_duplicates(['MARKA', 'MODEL', 'YIL'])
+            .reset_index(drop=True)
+        )
+    return _tohum
+
+
+def synthetic_frame(rows, sirketler=SIGORTA_SIRKETLERI, seed=0):
+    """Paketteki listelere benzeyen rows satırlık sentetik fiyat listesi
+
+    Marka / model / yıl dağılımı paketteki iki dosyadan gelir. Satırlar
+    karıştırılmış sırayla alınır; tohum satırlar bitince model adına
+    ' V2', ' V3' ... eklenerek yeni tekil araçlar üretilir. Aynı rows ve
+    seed her zaman aynı listeyi verir.
+    """
+    tohum = _tohum_anahtarlar()
+    rng = np.random.default_rng(seed)
+    sira = rng.permutation(len(tohum))
+    konum = np.arange(rows)
+    secilen = tohum.iloc[sira[konum % len(tohum)]].reset_index(drop=True)
+    varyant = konum // len(tohum)
+
+    model = secilen['MODEL'].to_numpy(dtype=object)
+    ekli = varyant > 0
+    model[ekli] = [f"{m} V{v + 1}" for m, v in zip(model[ekli], varyant[ekli])]
+    df = pd.DataFrame({'MARKA': secilen['MARKA'], 'MODEL': model, 'YIL': secilen['YIL']})
+
+    fiyat = secilen['Fiyat'].to_numpy() * np.where(ekli, rng.uniform(0.9, 1.1, size=rows), 1.0)
+    return _sirket_sutunlari(df, fiyat, sirketler, rng)
+
+
+def write_workbook(df, hedef):
+    """DataFrame'i openpyxl write_only ile yaz (1M satırda to_excel'den hızlı, sabit bellek)"""
+    from openpyxl import Workbook
+
+    kitap = Workbook(write_only=True)
+    sayfa = kitap.create_sheet()
+    sayfa.append(list(df.columns))
+    for satir in df.itertuples(index=False, name=None):
+        sayfa.append([None if (v == '' or (isinstance(v, float) and v != v)) else v for v in satir])
+    kitap.save(hedef)
+    return hedef
+
+
+def write_synthetic_workbook(rows, hedef, seed=0, **kwargs):
+    """synthetic_frame çıktısını xlsx olarak yaz; dosya zaten varsa yeniden üretme"""
+    if not os.path.exists(hedef):
+        gecici = hedef + '.tmp.xlsx'
+        write_workbook(synthetic_frame(rows, seed=seed, **kwargs), gecici)
+        os.replace(gecici, hedef)
+    return hedef
+
+
+def write_bundled_workbook(name, hedef, **kwargs):
+    """load_bundled_frame çıktısını xlsx olarak yaz, yolu döndür"""
+    df = load_bundled_frame(name, **kwargs)
+    df.to_excel(hedef, index=False, engine='openpyxl')
+    return hedef
+
+
+def peak_rss_mb():
+    """Sürecin tepe RSS'i (MB)"""
+    # Linux'ta ru_maxrss üst süreçten miras kalabiliyor, VmHWM süreç başına
+    if os.path.exists('/proc/self/status'):
+        with open('/proc/self/status') as f:
+            for satir in f:
+                if satir.startswith('VmHWM:'):
+                    return int(satir.split()[1]) / 1024
+    # macOS'ta ru_maxrss byte, diğerlerinde KB cinsinden
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def make_app(db_path):
+    """Geçici SQLite veritabanına bağlı uygulamayı içe aktar"""
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(db_path)}'
+    # Benchmark'lar process_excel_sigorta'yı doğrudan çağırır, kuyruk işçisi gerekmez
+    os.environ.setdefault('JOB_WORKER', 'off')
+    import app as app_module
+    return app_module
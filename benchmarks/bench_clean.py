@@ -0,0 +1,70 @@
+"""process_excel_sigorta temizleme aşaması: iterrows vs sütun bazlı
+
+Kullanım: python benchmarks/bench_clean.py [--repeat 3]
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from _common import BUNDLED_FILES, load_bundled_frame
+from ingest import REQUIRED_COLS, clean_price_frame
+
+
+def clean_iterrows(df, sigorta_sutunlari):
+    """Eski satır satır temizleme (karşılaştırma için birebir kopya)"""
+    kayitlar = []
+    atlanan = 0
+    for idx, row in df.iterrows():
+        sigortalar = {}
+        for sigorta_col in sigorta_sutunlari:
+            fiyat = row[sigorta_col]
+            fiyat_raw = str(fiyat).replace(" ", "").replace(",", ".").strip()
+            fiyat_num = pd.to_numeric(fiyat_raw, errors="coerce")
+            if pd.isna(fiyat_num) or fiyat_num <= 0:
+                continue
+            sigortalar[sigorta_col] = int(fiyat_num)
+        if not sigortalar:
+            atlanan += 1
+            continue
+        kayitlar.append({
+            'marka': str(row['MARKA']).strip(),
+            'model': str(row['MODEL']).strip(),
+            'yil': str(int(float(row['YIL']))),
+            'sigortalar': sigortalar,
+        })
+    return kayitlar, atlanan
+
+
+def olc(fonksiyon, df, sigorta_sutunlari, repeat):
+    en_iyi = None
+    for _ in range(repeat):
+        baslangic = time.perf_counter()
+        sonuc = fonksiyon(df, sigorta_sutunlari)
+        sure = time.perf_counter() - baslangic
+        en_iyi = sure if en_iyi is None else min(en_iyi, sure)
+    return sonuc, en_iyi
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'dosya':<20} {'satır':>8} {'iterrows r/s':>14} {'vektörel r/s':>14} {'hızlanma':>9}")
+    for name in BUNDLED_FILES:
+        df = load_bundled_frame(name)
+        sigorta_sutunlari = [c for c in df.columns if c not in REQUIRED_COLS]
+
+        eski, eski_sure = olc(clean_iterrows, df, sigorta_sutunlari, args.repeat)
+        yeni, yeni_sure = olc(clean_price_frame, df, sigorta_sutunlari, args.repeat)
+
+        # İki yol birebir aynı kayıtları üretmeli
+        assert eski == yeni, f"{name}: sonuçlar farklı!"
+
+        print(f"{name:<20} {len(df):>8} {len(df) / eski_sure:>14,.0f} "
+              f"{len(df) / yeni_sure:>14,.0f} {eski_sure / yeni_sure:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Excel okuma modlarının tepe bellek (RSS) karşılaştırması
+
+Her mod ayrı bir alt süreçte çalışır ki ölçümler birbirini etkilemesin.
+
+Kullanım: python benchmarks/bench_ingest_memory.py [dosya.xlsx ...]
+Dosya verilmezse paketteki iki xlsx uygulama formatına çevrilip kullanılır.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from _common import BUNDLED_FILES, make_app, peak_rss_mb, write_bundled_workbook
+
+MODES = ['pandas', 'stream']
+
+
+def calistir(workbook, mode):
+    """Alt süreç: tek bir modu çalıştır, sonucu JSON yaz"""
+    tmp = tempfile.mkdtemp()
+    app_module = make_app(os.path.join(tmp, 'bench.db'))
+    baslangic_rss = peak_rss_mb()
+    with app_module.app.app_context():
+        baslangic = time.perf_counter()
+        count, error = app_module.process_excel_sigorta(workbook, reader=mode)
+        sure = time.perf_counter() - baslangic
+    print(json.dumps({
+        'rows': count,
+        'error': error,
+        'seconds': sure,
+        'base_rss_mb': baslangic_rss,
+        'peak_rss_mb': peak_rss_mb(),
+    }))
+
+
+def main(dosyalar):
+    tmp = tempfile.mkdtemp()
+    if not dosyalar:
+        dosyalar = [
+            write_bundled_workbook(name, os.path.join(tmp, name))
+            for name in BUNDLED_FILES
+        ]
+
+    print(f"{'dosya':<22} {'mod':<7} {'satır':>8} {'süre s':>8} {'taban MB':>9} {'tepe MB':>8} {'artış MB':>9}")
+    for dosya in dosyalar:
+        for mode in MODES:
+            cikti = subprocess.run(
+                [sys.executable, __file__, '--child', dosya, mode],
+                capture_output=True, text=True, check=True,
+            ).stdout.strip().splitlines()[-1]
+            sonuc = json.loads(cikti)
+            if sonuc['error']:
+                print(f"{os.path.basename(dosya):<22} {mode:<7} HATA: {sonuc['error']}")
+                continue
+            print(f"{os.path.basename(dosya):<22} {mode:<7} {sonuc['rows']:>8} {sonuc['seconds']:>8.2f} "
+                  f"{sonuc['base_rss_mb']:>9.0f} {sonuc['peak_rss_mb']:>8.0f} "
+                  f"{sonuc['peak_rss_mb'] - sonuc['base_rss_mb']:>9.0f}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--child':
+        # Uygulamanın print çıktıları JSON satırından önce gelir
+        calistir(sys.argv[2], sys.argv[3])
+    else:
+        main(sys.argv[1:])
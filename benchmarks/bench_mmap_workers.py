@@ -0,0 +1,94 @@
+"""Sütunlu katalog: işçi başına bellek, veritabanından yükleme vs mmap
+
+gunicorn işçilerini taklit eden N süreç aynı katalogu açar, tüm dizilere
+dokunan sorgular çalıştırır ve açılış süresi ile anonim (paylaşılamayan)
+bellek artışını yazar. mmap modunda diziler dosya sayfalarıdır; sayfa
+önbelleğinden tüm süreçlerce paylaşılır, anonim bellek işçi sayısıyla
+büyümez.
+
+Kullanım: python benchmarks/bench_mmap_workers.py [--workers 4] [--file 2015sonrası.xlsx]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from _common import BUNDLED_FILES, make_app, write_bundled_workbook
+
+
+def _bellek():
+    """(anonim, RSS) MB - /proc/self/smaps_rollup"""
+    degerler = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for satir in f:
+            parca = satir.split()
+            if len(parca) == 3 and parca[2] == 'kB':
+                degerler[parca[0].rstrip(':')] = int(parca[1]) / 1024
+    return degerler['Anonymous'], degerler['Rss']
+
+
+def isci(mod, db_path, folder):
+    """Alt süreç: motoru aç, dizilerin hepsine dokun, ölçümü JSON yaz"""
+    import time
+    app_module = make_app(db_path)
+    from quote_engine import QuoteEngine
+
+    anonim_once, rss_once = _bellek()
+    with app_module.app.app_context():
+        motor = QuoteEngine(folder=folder if mod == 'mmap' else None)
+        baslangic = time.perf_counter()
+        for marka in motor.brands():
+            for model in motor.models(marka)[:3]:
+                for yil in motor.years_by_model(marka, model)[:2]:
+                    motor.quotes(marka, model, yil)
+        veri = motor._veri()
+        # Tüm sayfalar okunsun
+        toplam = int(veri.fiyatlar.sum()) + int(veri.ids.sum()) + int(veri.created_at[-1])
+        sure = time.perf_counter() - baslangic
+        anonim, rss = _bellek()
+    print(json.dumps({
+        'sure': sure, 'anonim': anonim - anonim_once, 'rss': rss - rss_once,
+        'dizi_mb': veri.nbytes / 1024 / 1024, 'toplam': toplam,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--file', default=BUNDLED_FILES[1])
+    parser.add_argument('--isci', nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.isci:
+        return isci(*args.isci)
+
+    gecici = tempfile.mkdtemp()
+    folder = os.path.join(gecici, 'catalog')
+    os.environ['CATALOG_FOLDER'] = folder
+    os.environ['QUOTE_ENGINE'] = 'columnar'
+    db_path = os.path.join(gecici, 'bench.db')
+    app_module = make_app(db_path)
+    dosya = write_bundled_workbook(args.file, os.path.join(gecici, 'liste.xlsx'))
+    with app_module.app.app_context():
+        app_module.process_excel_sigorta(dosya, mode='replace', status={})
+
+    print(f"\n{args.workers} işçi, {args.file}")
+    print(f"{'mod':<6} {'açılış sn':>10} {'RSS artışı':>11} {'anonim artış':>13} {'toplam anonim':>14} {'dizi MB':>8}")
+    for mod in ('db', 'mmap'):
+        surecler = [
+            subprocess.Popen(
+                [sys.executable, __file__, '--isci', mod, db_path, folder],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+            )
+            for _ in range(args.workers)
+        ]
+        sonuclar = [json.loads(p.communicate()[0].strip().splitlines()[-1]) for p in surecler]
+        ort = {k: sum(s[k] for s in sonuclar) / len(sonuclar) for k in ('sure', 'rss', 'anonim')}
+        print(f"{mod:<6} {ort['sure']:>10.2f} {ort['rss']:>11.1f} {ort['anonim']:>13.1f} "
+              f"{ort['anonim'] * len(sonuclar):>14.1f} {sonuclar[0]['dizi_mb']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""ParallelExcelReader işçi sayısı ölçeklenmesi (okuma + temizleme, DB yok)
+
+Üç çalışma kitabı ölçülür:
+  - paketteki her dosya tek sayfa olarak (parça paralelliği)
+  - iki dosya aynı kitapta iki sayfa olarak (2015oncesi / 2015sonrası)
+  - 2015sonrası markalara göre --sheets sayfaya bölünmüş (sayfa paralelliği)
+
+Kullanım: python benchmarks/bench_parallel.py [--workers 1 2 4] [--sheets 8]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from _common import BUNDLED_FILES, load_bundled_frame
+from ingest import ParallelExcelReader
+
+
+def kitaplari_hazirla(hedef_klasor, sayfa_sayisi):
+    frames = {name: load_bundled_frame(name) for name in BUNDLED_FILES}
+    kitaplar = []
+
+    for name, df in frames.items():
+        yol = os.path.join(hedef_klasor, name)
+        df.to_excel(yol, index=False, engine='openpyxl')
+        kitaplar.append((name, yol))
+
+    yol = os.path.join(hedef_klasor, 'iki_sayfa.xlsx')
+    with pd.ExcelWriter(yol, engine='openpyxl') as writer:
+        for name, df in frames.items():
+            df.to_excel(writer, sheet_name=os.path.splitext(name)[0], index=False)
+    kitaplar.append(('iki_sayfa.xlsx', yol))
+
+    buyuk = frames[BUNDLED_FILES[1]]
+    markalar = sorted(buyuk['MARKA'].astype(str).unique())
+    yol = os.path.join(hedef_klasor, 'marka_sayfalari.xlsx')
+    with pd.ExcelWriter(yol, engine='openpyxl') as writer:
+        for i in range(sayfa_sayisi):
+            grup = markalar[i::sayfa_sayisi]
+            buyuk[buyuk['MARKA'].isin(grup)].to_excel(writer, sheet_name=f'grup{i + 1}', index=False)
+    kitaplar.append((f'marka_sayfalari.xlsx ({sayfa_sayisi})', yol))
+
+    return kitaplar
+
+
+def olc(yol, workers, batch_size):
+    baslangic = time.perf_counter()
+    reader = ParallelExcelReader(yol, workers, batch_size)
+    satir = sum(len(kayitlar) + atlanan for kayitlar, atlanan in reader)
+    return satir, time.perf_counter() - baslangic
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument('--sheets', type=int, default=8)
+    parser.add_argument('--batch', type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"CPU: {os.cpu_count()}")
+    kitaplar = kitaplari_hazirla(tempfile.mkdtemp(), args.sheets)
+
+    print(f"{'kitap':<28} {'işçi':>5} {'satır':>8} {'süre s':>8} {'satır/sn':>10} {'hızlanma':>9}")
+    for ad, yol in kitaplar:
+        tek = None
+        for workers in args.workers:
+            satir, sure = olc(yol, workers, args.batch)
+            tek = tek or sure
+            print(f"{ad:<28} {workers:>5} {satir:>8} {sure:>8.2f} {satir / sure:>10,.0f} {tek / sure:>8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
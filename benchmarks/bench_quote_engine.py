@@ -0,0 +1,108 @@
+"""Teklif okumaları: doğrudan SQL vs CatalogCache vs sütunlu QuoteEngine (bellek / mmap)
+
+Paketteki liste geçici bir SQLite veritabanına yüklenir, ardından rastgele
+seçilen araçlar için aynı sorgular her yoldan çalıştırılır ve p50 / p99
+gecikme (mikrosaniye) yazılır. Sonuçların tüm yollarda aynı olduğu da kontrol
+edilir.
+
+Kullanım: python benchmarks/bench_quote_engine.py [--n 5000] [--file 2015sonrası.xlsx]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from _common import BUNDLED_FILES, make_app, write_bundled_workbook
+
+GECICI = tempfile.mkdtemp()
+os.environ.setdefault('CATALOG_FOLDER', os.path.join(GECICI, 'catalog'))
+app_module = make_app(os.path.join(GECICI, 'bench.db'))
+
+from lookup_cache import CatalogCache  # noqa: E402
+from models import Vehicle, db  # noqa: E402
+from prices import vehicle_quotes  # noqa: E402
+from quote_engine import QuoteEngine  # noqa: E402
+
+
+class SqlYolu:
+    """Önbelleksiz yol: her çağrı veritabanına gider"""
+
+    def vehicle(self, marka, model, yil):
+        vehicle = Vehicle.query.filter_by(marka=marka, model=model, yil=yil).first()
+        return vehicle.to_dict() if vehicle else None
+
+    def models(self, brand):
+        return [m for (m,) in db.session.query(Vehicle.model).filter_by(marka=brand)
+                .distinct().order_by(Vehicle.model)]
+
+    def years(self, brand):
+        return sorted({y for (y,) in db.session.query(Vehicle.yil).filter_by(marka=brand).distinct()},
+                      reverse=True)
+
+    def quotes(self, marka, model, yil, limit=None):
+        vehicle = self.vehicle(marka, model, yil)
+        return vehicle_quotes(vehicle['id'], limit) if vehicle else None
+
+
+def olc(fonksiyon, argumanlar):
+    sureler = np.empty(len(argumanlar))
+    for i, arg in enumerate(argumanlar):
+        baslangic = time.perf_counter()
+        fonksiyon(*arg)
+        sureler[i] = time.perf_counter() - baslangic
+    return np.percentile(sureler, 50) * 1e6, np.percentile(sureler, 99) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--n', type=int, default=5000, help='sorgu sayısı (her işlem için)')
+    parser.add_argument('--file', default=BUNDLED_FILES[1])
+    args = parser.parse_args()
+
+    dosya = write_bundled_workbook(args.file, os.path.join(GECICI, 'liste.xlsx'))
+    with app_module.app.app_context():
+        app_module.process_excel_sigorta(dosya, mode='replace', status={})
+
+        anahtarlar = [tuple(r) for r in db.session.query(Vehicle.marka, Vehicle.model, Vehicle.yil)]
+        rnd = random.Random(0)
+        araclar = [rnd.choice(anahtarlar) for _ in range(args.n)]
+        markalar = [(a[0],) for a in araclar]
+
+        yollar = [
+            ('sql', SqlYolu()),
+            ('cache', CatalogCache()),
+            ('columnar', QuoteEngine()),
+            ('mmap', QuoteEngine(folder=os.environ['CATALOG_FOLDER'])),
+        ]
+
+        # Isınma: ağaç / diziler yüklensin, sonuçlar aynı mı
+        for ad, yol in yollar[1:]:
+            baslangic = time.perf_counter()
+            yol.brands()
+            print(f"{ad}: ilk yükleme {time.perf_counter() - baslangic:.2f} sn")
+        for arac in araclar[:200]:
+            beklenen = yollar[0][1]
+            for ad, yol in yollar[1:]:
+                assert yol.vehicle(*arac) == beklenen.vehicle(*arac), (ad, arac)
+                assert yol.quotes(*arac) == beklenen.quotes(*arac), (ad, arac)
+                assert yol.models(arac[0]) == beklenen.models(arac[0]), (ad, arac)
+                assert yol.years(arac[0]) == beklenen.years(arac[0]), (ad, arac)
+        print("✅ Tüm yolların sonuçları aynı")
+
+        print(f"\n{len(anahtarlar)} araç, {args.n} sorgu - gecikme (µs)")
+        print(f"{'işlem':<10} {'yol':<9} {'p50':>10} {'p99':>10}")
+        for islem, argumanlar in (('vehicle', araclar), ('quotes', araclar),
+                                  ('models', markalar), ('years', markalar)):
+            for ad, yol in yollar:
+                p50, p99 = olc(getattr(yol, islem), argumanlar)
+                print(f"{islem:<10} {ad:<9} {p50:>10.1f} {p99:>10.1f}")
+
+        for ad, yol in yollar[2:]:
+            print(f"\n{ad}: {yol.stats()}")
+
+
+if __name__ == '__main__':
+    main()
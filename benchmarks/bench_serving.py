@@ -0,0 +1,140 @@
+"""gunicorn sync vs gthread: eşzamanlı müşteri altında teklif akışı
+
+Paketteki liste geçici bir SQLite veritabanına yüklenir, ardından aynı
+işçi sayısıyla önce sync, sonra gthread işçileriyle gunicorn (gunicorn.conf.py)
+başlatılır ve her birine load_quote_flow.py ile aynı yük verilir. Akış/sn,
+uç başına p95 ve havuz beklemesi yan yana yazılır.
+
+--slow-clients N: yük boyunca N yavaş istemci (mobil ağ gibi) isteğini
+saniyede bir başlık satırıyla gönderir. sync işçisi istek tamamlanana kadar
+başka isteğe bakamaz; gthread'de yalnız bir iş parçacığı bekler.
+
+Kullanım: python benchmarks/bench_serving.py [--workers 2] [--threads 8]
+                                             [--concurrency 32] [--duration 20]
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+from _common import BUNDLED_FILES, REPO_DIR, make_app, write_bundled_workbook
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _bos_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _hazir_bekle(port, zaman_asimi=60):
+    bitis = time.monotonic() + zaman_asimi
+    while time.monotonic() < bitis:
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/api/brands', timeout=2) as cevap:
+                if cevap.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.3)
+    raise SystemExit('❌ gunicorn ayağa kalkmadı')
+
+
+def yavas_istemci(port, bitis):
+    """İsteği parça parça gönderen istemci; süre bitene kadar tekrarlar"""
+    while time.monotonic() < bitis:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=30) as s:
+                s.sendall(b'GET /api/brands HTTP/1.1\r\nHost: localhost\r\n')
+                for i in range(5):
+                    if time.monotonic() >= bitis:
+                        break
+                    time.sleep(1)
+                    s.sendall(f'X-Yavas-{i}: 1\r\n'.encode())
+                s.sendall(b'Connection: close\r\n\r\n')
+                while s.recv(65536):
+                    pass
+        except OSError:
+            time.sleep(0.1)
+
+
+def olc(ad, ortam, args):
+    """gunicorn'u verilen ayarlarla başlat, yük testini çalıştır, JSON sonucu döndür"""
+    port = _bos_port()
+    sunucu = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'app:app', '-c', 'gunicorn.conf.py'],
+        cwd=REPO_DIR, env={**os.environ, **ortam, 'PORT': str(port)},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _hazir_bekle(port)
+        cikti = os.path.join(tempfile.mkdtemp(), f'{ad}.json')
+        bitis = time.monotonic() + args.duration + 5
+        for _ in range(args.slow_clients):
+            threading.Thread(target=yavas_istemci, args=(port, bitis), daemon=True).start()
+        subprocess.run(
+            [sys.executable, os.path.join(BENCH_DIR, 'load_quote_flow.py'),
+             '--url', f'http://127.0.0.1:{port}', '--concurrency', str(args.concurrency),
+             '--duration', str(args.duration), '--output', cikti],
+            check=False, stdout=subprocess.DEVNULL,
+        )
+        with open(cikti, encoding='utf-8') as f:
+            return json.load(f)
+    finally:
+        sunucu.terminate()
+        sunucu.wait(30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--slow-clients', type=int, default=0)
+    parser.add_argument('--file', default=BUNDLED_FILES[0])
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    ortak = {
+        'CATALOG_FOLDER': os.path.join(tmp, 'catalog'),
+        'JOB_WORKER': 'off',
+    }
+    os.environ.update(ortak)
+    app_module = make_app(os.path.join(tmp, 'serving.db'))
+    ortak['DATABASE_URL'] = os.environ['DATABASE_URL']
+    with app_module.app.app_context():
+        app_module.process_excel_sigorta(
+            write_bundled_workbook(args.file, os.path.join(tmp, 'liste.xlsx')), mode='replace', status={},
+        )
+
+    ayarlar = [
+        ('sync', {'GUNICORN_WORKER_CLASS': 'sync'}),
+        ('gthread', {'GUNICORN_WORKER_CLASS': 'gthread', 'GUNICORN_THREADS': str(args.threads)}),
+    ]
+    sonuclar = {}
+    for ad, ortam in ayarlar:
+        print(f"⏳ {ad}: {args.workers} işçi, {args.concurrency} eşzamanlı müşteri, {args.duration:.0f} sn")
+        sonuclar[ad] = olc(ad, {**ortak, **ortam, 'WEB_CONCURRENCY': str(args.workers)}, args)
+
+    print(f"\n{os.cpu_count()} CPU, {args.workers} işçi, gthread {args.threads} iş parçacığı, "
+          f"{args.concurrency} müşteri, {args.slow_clients} yavaş istemci")
+    print(f"{'mod':<8} {'akış/sn':>8} {'istek/sn':>9} {'vehicle p95':>12} {'sipariş p95':>12} "
+          f"{'brands p99':>11} {'hata':>5} {'havuz ort ms':>13}")
+    for ad, s in sonuclar.items():
+        uclar = s['endpoints']
+        hatalar = sum(u['errors'] for u in uclar.values())
+        havuz = (s.get('pool_wait') or {}).get('mean_ms')
+        print(f"{ad:<8} {s['flows_per_second']:>8.1f} {s['requests_per_second']:>9.0f} "
+              f"{uclar['vehicle'].get('p95_ms', 0):>12.1f} {uclar['siparis_kaydet'].get('p95_ms', 0):>12.1f} "
+              f"{uclar['brands'].get('p99_ms', 0):>11.1f} {hatalar:>5} {havuz if havuz is not None else '-':>13}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+"""Import ve okuma yolları için tekrarlanabilir benchmark takımı
+
+Her boyut için (varsayılan 10k ve 100k satır; 1M için --rows 1000000)
+paketteki listelere benzeyen sentetik bir Excel üretilir (--cache klasöründe
+saklanır, sonraki çalıştırmalarda yeniden kullanılır). Ardından ayrı bir alt
+süreçte:
+
+  1. process_excel_sigorta ile geçici SQLite veritabanına yüklenir; süre,
+     satır/sn, aşama süreleri ve tepe bellek (VmHWM) ölçülür,
+  2. /api/* uçları Flask test istemcisiyle rastgele ama sabit tohumlu
+     araçlarla çağrılır; uç başına p50 / p95 / p99 (ms) ve istek/sn yazılır.
+
+Sonuçlar JSON dosyasına yazılır; --compare ile önceki bir çalıştırmayla
+karşılaştırılır.
+
+Kullanım: python benchmarks/bench_suite.py [--rows 10000 100000] [--output sonuc.json]
+                                           [--compare onceki.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from urllib.parse import quote
+
+import numpy as np
+
+from _common import REPO_DIR, peak_rss_mb, write_synthetic_workbook
+
+VARSAYILAN_CACHE = os.path.join(tempfile.gettempdir(), 'sigorta-bench')
+
+
+def _yuzdelikler(sureler):
+    sureler = np.asarray(sureler) * 1000
+    return {
+        'n': len(sureler),
+        'p50_ms': round(float(np.percentile(sureler, 50)), 3),
+        'p95_ms': round(float(np.percentile(sureler, 95)), 3),
+        'p99_ms': round(float(np.percentile(sureler, 99)), 3),
+        'mean_ms': round(float(sureler.mean()), 3),
+        'rps': round(len(sureler) / (sureler.sum() / 1000), 1) if sureler.sum() else None,
+    }
+
+
+def _istekler(anahtarlar, markalar, n, rnd):
+    """Uç adı -> [(method, url, json gövdesi)] - her uç için n istek"""
+    def yol(*parcalar):
+        return '/'.join(quote(str(p), safe='') for p in parcalar)
+
+    araclar = [rnd.choice(anahtarlar) for _ in range(n)]
+    marka_sec = [rnd.choice(markalar) for _ in range(n)]
+    kelimeler = [a[1].split()[0] for a in araclar]
+    return {
+        'brands': [('GET', '/api/brands', None)] * n,
+        'models': [('GET', f'/api/models/{yol(m)}', None) for m in marka_sec],
+        'years': [('GET', f'/api/years/{yol(m)}', None) for m in marka_sec],
+        'years_by_model': [('GET', f'/api/years/{yol(a[0], a[1])}', None) for a in araclar],
+        'vehicle': [('GET', f'/api/vehicle/{yol(*a)}', None) for a in araclar],
+        'cheapest_quote': [('GET', f'/api/cheapest-quote/{yol(*a)}', None) for a in araclar],
+        'search': [('GET', f'/api/search?q={quote(k)}&limit=20', None) for k in kelimeler],
+        'vehicles_page': [('GET', '/api/vehicles?limit=100', None)] * n,
+        'quotes_batch_20': [
+            ('POST', '/api/quotes/batch', {'vehicles': [list(rnd.choice(anahtarlar)) for _ in range(20)]})
+            for _ in range(max(1, n // 10))
+        ],
+        'vehicles_snapshot': [('GET', '/api/vehicles', None)] * max(1, n // 50),
+    }
+
+
+def calistir(workbook, reader, mode, n, seed):
+    """Alt süreç: import + API ölçümü, sonucu son satırda JSON olarak yaz"""
+    tmp = tempfile.mkdtemp()
+    os.environ['CATALOG_FOLDER'] = os.path.join(tmp, 'catalog')
+    from _common import make_app
+    app_module = make_app(os.path.join(tmp, 'bench.db'))
+    from models import Vehicle, db
+
+    sonuc = {'base_rss_mb': round(peak_rss_mb(), 1)}
+    with app_module.app.app_context():
+        durum = {}
+        baslangic = time.perf_counter()
+        satir, hata = app_module.process_excel_sigorta(workbook, reader=reader, mode=mode, status=durum)
+        sure = time.perf_counter() - baslangic
+        sonuc['ingest'] = {
+            'rows': satir,
+            'error': hata,
+            'seconds': round(sure, 3),
+            'rows_per_second': round(satir / sure) if sure else None,
+            'stages': durum.get('stages'),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+        }
+        # URL'de '/' geçen modeller rota ile çakışır, örneğe alınmaz
+        anahtarlar = [
+            tuple(a) for a in db.session.query(Vehicle.marka, Vehicle.model, Vehicle.yil)
+            if '/' not in ''.join(a)
+        ]
+        markalar = sorted({a[0] for a in anahtarlar})
+
+    istemci = app_module.app.test_client()
+    api = {}
+    for ad, istekler in _istekler(anahtarlar, markalar, n, random.Random(seed)).items():
+        # Isınma: önbellekler / katalog dosyası ilk istekte hazırlanır
+        for method, url, govde in istekler[:5]:
+            istemci.open(url, method=method, json=govde)
+        sureler = []
+        hatalar = 0
+        for method, url, govde in istekler:
+            baslangic = time.perf_counter()
+            cevap = istemci.open(url, method=method, json=govde)
+            cevap.get_data()
+            sureler.append(time.perf_counter() - baslangic)
+            hatalar += cevap.status_code >= 400
+        api[ad] = {**_yuzdelikler(sureler), 'errors': hatalar}
+    sonuc['api'] = api
+    sonuc['peak_rss_mb'] = round(peak_rss_mb(), 1)
+    print(json.dumps(sonuc))
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _yazdir(sonuc):
+    ingest = sonuc['ingest']
+    print(f"\n📦 {sonuc['rows']:,} satır ({sonuc['workbook_mb']} MB xlsx)")
+    if ingest['error']:
+        print(f"   ❌ Import hatası: {ingest['error']}")
+        return
+    print(f"   import: {ingest['seconds']:.2f} sn, {ingest['rows_per_second']:,} satır/sn, "
+          f"tepe RSS {ingest['peak_rss_mb']:.0f} MB (taban {sonuc['base_rss_mb']:.0f})")
+    print(f"   aşamalar: {ingest['stages']}")
+    print(f"   {'uç':<18} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'istek/sn':>10} {'hata':>5}")
+    for ad, olcum in sonuc['api'].items():
+        print(f"   {ad:<18} {olcum['p50_ms']:>9.2f} {olcum['p95_ms']:>9.2f} {olcum['p99_ms']:>9.2f} "
+              f"{olcum['rps'] or 0:>10.0f} {olcum['errors']:>5}")
+
+
+def _fark(yeni, eski):
+    if not eski:
+        return '-'
+    return f"{(yeni - eski) / eski * 100:+.0f}%"
+
+
+def karsilastir(sonuclar, onceki_dosya):
+    """Aynı satır sayılı önceki sonuçlarla import süresi ve p50 / p99 farkları"""
+    with open(onceki_dosya, encoding='utf-8') as f:
+        onceki = {s['rows']: s for s in json.load(f)['results']}
+    print(f"\n🔍 Karşılaştırma: {onceki_dosya} (pozitif = daha yavaş / daha fazla)")
+    for sonuc in sonuclar:
+        eski = onceki.get(sonuc['rows'])
+        if eski is None or sonuc['ingest']['error'] or eski['ingest']['error']:
+            print(f"   {sonuc['rows']:,} satır: karşılaştırılacak sonuç yok")
+            continue
+        print(f"   {sonuc['rows']:,} satır - import süresi "
+              f"{_fark(sonuc['ingest']['seconds'], eski['ingest']['seconds'])}, "
+              f"tepe RSS {_fark(sonuc['ingest']['peak_rss_mb'], eski['ingest']['peak_rss_mb'])}")
+        for ad, olcum in sonuc['api'].items():
+            if ad in eski['api']:
+                print(f"     {ad:<18} p50 {_fark(olcum['p50_ms'], eski['api'][ad]['p50_ms']):>6}  "
+                      f"p99 {_fark(olcum['p99_ms'], eski['api'][ad]['p99_ms']):>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--reader', default='stream', choices=['pandas', 'stream', 'parallel'])
+    parser.add_argument('--mode', default='replace', choices=['upsert', 'sync', 'replace'])
+    parser.add_argument('--n', type=int, default=500, help='uç başına istek sayısı')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cache', default=VARSAYILAN_CACHE, help='sentetik xlsx klasörü')
+    parser.add_argument('--output', default=None, help='sonuç JSON dosyası')
+    parser.add_argument('--compare', default=None, help='karşılaştırılacak önceki sonuç JSON')
+    parser.add_argument('--child', nargs=5, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        workbook, reader, mode, n, seed = args.child
+        return calistir(workbook, reader, mode, int(n), int(seed))
+
+    os.makedirs(args.cache, exist_ok=True)
+    sonuclar = []
+    for rows in args.rows:
+        dosya = os.path.join(args.cache, f'synthetic-{rows}-{args.seed}.xlsx')
+        if not os.path.exists(dosya):
+            print(f"🧪 {rows:,} satırlık sentetik liste üretiliyor: {dosya}")
+        write_synthetic_workbook(rows, dosya, seed=args.seed)
+
+        cikti = subprocess.run(
+            [sys.executable, __file__, '--child', dosya, args.reader, args.mode, str(args.n), str(args.seed)],
+            capture_output=True, text=True,
+        )
+        if cikti.returncode != 0:
+            print(cikti.stderr[-2000:])
+            raise SystemExit(f"❌ {rows} satırlık ölçüm başarısız")
+        # Uygulamanın print çıktıları JSON satırından önce gelir
+        sonuc = {'rows': rows, 'workbook_mb': round(os.path.getsize(dosya) / 1024 / 1024, 1),
+                 **json.loads(cikti.stdout.strip().splitlines()[-1])}
+        _yazdir(sonuc)
+        sonuclar.append(sonuc)
+
+    rapor = {
+        'created_at': datetime.utcnow().isoformat(),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'config': {'reader': args.reader, 'mode': args.mode, 'n': args.n, 'seed': args.seed,
+                   'database': 'sqlite'},
+        'results': sonuclar,
+    }
+    cikis = args.output or os.path.join(
+        REPO_DIR, 'benchmarks', f"results-{datetime.utcnow():%Y%m%d-%H%M%S}.json")
+    with open(cikis, 'w', encoding='utf-8') as f:
+        json.dump(rapor, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Sonuçlar yazıldı: {cikis}")
+
+    if args.compare:
+        karsilastir(sonuclar, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Toplu yazıcı karşılaştırması: ORM bulk_save_objects vs Core INSERT / COPY
+
+Farklı batch boyutlarında kayıt/sn ölçer. DATABASE_URL verilirse o
+veritabanı kullanılır (ör. yerel PostgreSQL); tablo her turda boşaltılır!
+Verilmezse geçici bir SQLite dosyası kullanılır.
+
+Kullanım: python benchmarks/bench_writer.py [--batch 500 1000 5000] [--copy]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from _common import BUNDLED_FILES, load_bundled_frame
+
+if 'DATABASE_URL' not in os.environ:
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+os.environ.setdefault('JOB_WORKER', 'off')
+
+import app as app_module  # noqa: E402
+from ingest import REQUIRED_COLS, VehicleWriter, clean_price_frame  # noqa: E402
+from models import Vehicle, db  # noqa: E402
+
+
+def orm_yaz(kayitlar, batch_size):
+    """Eski yol: her satır için Vehicle nesnesi + bulk_save_objects"""
+    baslangic = time.perf_counter()
+    for i in range(0, len(kayitlar), batch_size):
+        db.session.bulk_save_objects([Vehicle(**k) for k in kayitlar[i:i + batch_size]])
+        db.session.commit()
+    return len(kayitlar) / (time.perf_counter() - baslangic)
+
+
+def writer_yaz(kayitlar, batch_size, use_copy):
+    writer = VehicleWriter(db.session, batch_size=batch_size, use_copy=use_copy)
+    writer.add(kayitlar)
+    writer.flush()
+    return writer.rows_per_second
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--batch', type=int, nargs='+', default=[500, 1000, 5000, 20000])
+    parser.add_argument('--copy', action='store_true', help='PostgreSQL COPY yolunu da ölç')
+    args = parser.parse_args()
+
+    df = load_bundled_frame(BUNDLED_FILES[1])
+    kayitlar, _ = clean_price_frame(df, [c for c in df.columns if c not in REQUIRED_COLS])
+    del df
+
+    yollar = [('orm', None), ('core', False)]
+    if args.copy:
+        yollar.append(('copy', True))
+
+    with app_module.app.app_context():
+        print(f"{db.engine.url.render_as_string(hide_password=True)} - {len(kayitlar)} kayıt")
+        print(f"{'yol':<6} {'batch':>7} {'kayıt/sn':>12}")
+        for ad, use_copy in yollar:
+            for batch_size in args.batch:
+                Vehicle.query.delete()
+                db.session.commit()
+                if ad == 'orm':
+                    hiz = orm_yaz(kayitlar, batch_size)
+                else:
+                    hiz = writer_yaz(kayitlar, batch_size, use_copy)
+                print(f"{ad:<6} {batch_size:>7} {hiz:>12,.0f}")
+        Vehicle.query.delete()
+        db.session.commit()
+
+
+if __name__ == '__main__':
+    main()
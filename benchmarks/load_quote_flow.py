@@ -0,0 +1,321 @@
+"""Müşteri teklif akışı için yük testi (gecikme SLO raporu)
+
+index.html'deki akışı tekrar oynatır: markalar -> yıllar -> modeller -> araç
+(fiyatlar) -> /api/siparis-kaydet. --concurrency kadar sanal müşteri
+(iş parçacığı, her biri kalıcı HTTP bağlantısıyla) --duration saniye boyunca
+akışı baştan sona tekrarlar.
+
+Hedef:
+  --url http://127.0.0.1:8000  çalışan bir sunucu (gunicorn vb.; veritabanı dolu olmalı)
+  (verilmezse)                 uygulama bu süreçte çok iş parçacıklı werkzeug
+                               sunucusuyla açılır; --database-url yoksa geçici
+                               SQLite'a paketteki liste yüklenir
+
+Rapor: akış/sn, istek/sn, uç başına p50 / p95 / p99 (ms), hata sayısı ve
+/metrics'ten okunan veritabanı havuzu bekleme süresi (test öncesi ve sonrası
+farkı). --slo-p95-ms / --slo-p99-ms verilirse aşan uçlar işaretlenir ve çıkış
+kodu 1 olur. --output ile sonuçlar JSON olarak yazılır.
+
+Not: gunicorn'da /metrics yalnız isteği karşılayan işçinin değerlerini verir;
+havuz beklemesi tek işçiyle ya da işçi başına okunmalıdır.
+
+Kullanım: python benchmarks/load_quote_flow.py [--concurrency 8] [--duration 30]
+                                               [--url URL] [--slo-p95-ms 200]
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.parse import quote, urlsplit
+
+import numpy as np
+
+from _common import BUNDLED_FILES, make_app, write_bundled_workbook
+
+UCLAR = ('brands', 'years', 'models', 'vehicle', 'siparis_kaydet')
+
+
+class Istemci:
+    """Tek sanal müşteri: kalıcı bağlantı, uç başına süre listesi"""
+
+    def __init__(self, host, port, rnd):
+        self.host = host
+        self.port = port
+        self.rnd = rnd
+        self.baglanti = None
+        self.sureler = {uc: [] for uc in UCLAR}
+        self.hatalar = {uc: 0 for uc in UCLAR}
+        self.akislar = 0
+
+    def _istek(self, uc, method, yol, govde=None):
+        basliklar = {'Accept': 'application/json'}
+        veri = None
+        if govde is not None:
+            veri = json.dumps(govde).encode()
+            basliklar['Content-Type'] = 'application/json'
+        baslangic = time.perf_counter()
+        for deneme in (1, 2):
+            if self.baglanti is None:
+                self.baglanti = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            try:
+                self.baglanti.request(method, yol, body=veri, headers=basliklar)
+                cevap = self.baglanti.getresponse()
+                icerik = cevap.read()
+                break
+            except (http.client.HTTPException, OSError):
+                # Sunucu keep-alive bağlantısını kapatmış olabilir - bir kez yeniden bağlan
+                self.baglanti.close()
+                self.baglanti = None
+                if deneme == 2:
+                    self.hatalar[uc] += 1
+                    return None
+        self.sureler[uc].append(time.perf_counter() - baslangic)
+        if cevap.status >= 400:
+            self.hatalar[uc] += 1
+            return None
+        return json.loads(icerik) if icerik else None
+
+    def akis(self):
+        """Bir müşterinin baştan sona teklif akışı; tamamlandıysa True"""
+        # URL'de '/' geçen adlar rota ile çakışır (tarayıcıda da aynı), akışa alınmaz
+        markalar = [m for m in self._istek('brands', 'GET', '/api/brands') or [] if '/' not in m]
+        if not markalar:
+            return False
+        marka = self.rnd.choice(markalar)
+        yillar = self._istek('years', 'GET', f"/api/years/{quote(marka, safe='')}")
+        if not yillar:
+            return False
+        yil = self.rnd.choice(yillar)
+        modeller = self._istek('models', 'GET', f"/api/models/{quote(marka, safe='')}/{quote(str(yil), safe='')}")
+        modeller = [m for m in modeller or [] if '/' not in m]
+        if not modeller:
+            return False
+        model = self.rnd.choice(modeller)
+        arac = self._istek('vehicle', 'GET', '/api/vehicle/' + '/'.join(
+            quote(str(p), safe='') for p in (marka, model, yil)))
+        if not arac or not arac.get('data'):
+            return False
+        fiyatlar = {k: v for k, v in arac['data']['sigortalar'].items() if isinstance(v, (int, float))}
+        if not fiyatlar:
+            return False
+        sirket = min(fiyatlar, key=fiyatlar.get)
+        self._istek('siparis_kaydet', 'POST', '/api/siparis-kaydet', {
+            'tcKimlik': f"{self.rnd.randrange(10**10, 10**11)}",
+            'tcFull': f"A{self.rnd.randrange(10**7, 10**8)}",
+            'ad': 'Yük', 'soyad': 'Testi',
+            'telefon': f"05{self.rnd.randrange(10**8, 10**9)}",
+            'ruhsatSeri': 'AB', 'ruhsatNo': f"{self.rnd.randrange(10**5, 10**6)}",
+            'plakaIl': '34', 'plakaSeri': 'YT', 'plakaNo': f"{self.rnd.randrange(100, 9999)}",
+            'marka': marka[:50], 'model': model[:100], 'yil': str(yil)[:4],
+            'secilenSigorta': sirket, 'fiyat': round(fiyatlar[sirket]),
+        })
+        self.akislar += 1
+        return True
+
+    def calis(self, bitis, dusunme):
+        while time.perf_counter() < bitis:
+            self.akis()
+            if dusunme:
+                time.sleep(dusunme)
+        if self.baglanti is not None:
+            self.baglanti.close()
+
+
+def _metrikler(host, port):
+    """/metrics'ten havuz bekleme histogramı: {'sum', 'count', 'buckets': {le: adet}}"""
+    baglanti = http.client.HTTPConnection(host, port, timeout=30)
+    try:
+        baglanti.request('GET', '/metrics')
+        cevap = baglanti.getresponse()
+        metin = cevap.read().decode()
+        if cevap.status != 200:
+            return None
+    except (http.client.HTTPException, OSError):
+        return None
+    finally:
+        baglanti.close()
+    sonuc = {'sum': 0.0, 'count': 0, 'buckets': {}}
+    # Müşteri isteklerinin havuzları (primary, varsa replica) toplanır; import havuzu hariç
+    for satir in metin.splitlines():
+        if not satir.startswith('sigorta_db_pool_wait_seconds') or 'pool="ingest"' in satir:
+            continue
+        ad, deger = satir.rsplit(' ', 1)
+        if ad.startswith('sigorta_db_pool_wait_seconds_bucket'):
+            le = re.search(r'le="([^"]+)"', ad).group(1)
+            sonuc['buckets'][le] = sonuc['buckets'].get(le, 0.0) + float(deger)
+        elif ad.startswith('sigorta_db_pool_wait_seconds_sum'):
+            sonuc['sum'] += float(deger)
+        elif ad.startswith('sigorta_db_pool_wait_seconds_count'):
+            sonuc['count'] += float(deger)
+    return sonuc
+
+
+def _havuz_farki(once, sonra):
+    """İki /metrics okuması arasındaki havuz beklemesi: adet, ortalama, ~p95 / p99 (kova sınırı)"""
+    if once is None or sonra is None:
+        return None
+    adet = sonra['count'] - once['count']
+    if adet <= 0:
+        return {'checkouts': 0}
+    kovalar = sorted(
+        ((float('inf') if le == '+Inf' else float(le), sonra['buckets'][le] - once['buckets'].get(le, 0))
+         for le in sonra['buckets']),
+    )
+
+    def yuzdelik(p):
+        for sinir, birikimli in kovalar:
+            if birikimli >= adet * p:
+                return None if sinir == float('inf') else round(sinir * 1000, 3)
+        return None
+
+    return {
+        'checkouts': int(adet),
+        'mean_ms': round((sonra['sum'] - once['sum']) / adet * 1000, 3),
+        'p95_le_ms': yuzdelik(0.95),
+        'p99_le_ms': yuzdelik(0.99),
+    }
+
+
+def _yerel_sunucu(database_url, dosya):
+    """Uygulamayı bu süreçte çok iş parçacıklı werkzeug sunucusuyla başlat -> (host, port)"""
+    from werkzeug.serving import make_server
+
+    tmp = tempfile.mkdtemp()
+    os.environ.setdefault('CATALOG_FOLDER', os.path.join(tmp, 'catalog'))
+    if database_url:
+        os.environ['DATABASE_URL'] = database_url
+        os.environ.setdefault('JOB_WORKER', 'off')
+        import app as app_module
+    else:
+        app_module = make_app(os.path.join(tmp, 'load.db'))
+        print(f"📥 {dosya} geçici SQLite'a yükleniyor...")
+        with app_module.app.app_context():
+            app_module.process_excel_sigorta(
+                write_bundled_workbook(dosya, os.path.join(tmp, 'liste.xlsx')),
+                mode='replace', status={},
+            )
+
+    # İstek başına erişim logu ölçümü bozmasın
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    sunucu = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    threading.Thread(target=sunucu.serve_forever, daemon=True, name='load-server').start()
+    havuz = app_module.app.config['SQLALCHEMY_ENGINE_OPTIONS']
+    print(f"🌐 Yerel sunucu: http://127.0.0.1:{sunucu.server_port} "
+          f"(pool_size={havuz.get('pool_size')}, max_overflow={havuz.get('max_overflow', 10)})")
+    return '127.0.0.1', sunucu.server_port
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='çalışan sunucu (verilmezse yerel sunucu açılır)')
+    parser.add_argument('--database-url', help='yerel sunucu için veritabanı (ör. yerel PostgreSQL)')
+    parser.add_argument('--file', default=BUNDLED_FILES[0], help='yerel SQLite için yüklenecek liste')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30, help='saniye')
+    parser.add_argument('--warmup', type=float, default=3, help='ölçülmeyen ısınma (saniye)')
+    parser.add_argument('--think-ms', type=float, default=0, help='akışlar arası bekleme')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--slo-p95-ms', type=float)
+    parser.add_argument('--slo-p99-ms', type=float)
+    parser.add_argument('--output', help='sonuç JSON dosyası')
+    args = parser.parse_args()
+
+    if args.url:
+        hedef = urlsplit(args.url)
+        host, port = hedef.hostname, hedef.port or 80
+    else:
+        host, port = _yerel_sunucu(args.database_url, args.file)
+
+    if args.warmup:
+        Istemci(host, port, random.Random(-1)).calis(time.perf_counter() + args.warmup, 0)
+
+    once = _metrikler(host, port)
+    istemciler = [Istemci(host, port, random.Random(args.seed + i)) for i in range(args.concurrency)]
+    baslangic = time.perf_counter()
+    bitis = baslangic + args.duration
+    isler = [
+        threading.Thread(target=i.calis, args=(bitis, args.think_ms / 1000), name=f'load-{n}')
+        for n, i in enumerate(istemciler)
+    ]
+    print(f"🚦 {args.concurrency} eşzamanlı müşteri, {args.duration:.0f} sn...")
+    for t in isler:
+        t.start()
+    for t in isler:
+        t.join()
+    sure = time.perf_counter() - baslangic
+    sonra = _metrikler(host, port)
+
+    uclar = {}
+    for uc in UCLAR:
+        sureler = np.array([s for i in istemciler for s in i.sureler[uc]]) * 1000
+        hatalar = sum(i.hatalar[uc] for i in istemciler)
+        if not len(sureler):
+            uclar[uc] = {'n': 0, 'errors': hatalar}
+            continue
+        uclar[uc] = {
+            'n': len(sureler),
+            'rps': round(len(sureler) / sure, 1),
+            'p50_ms': round(float(np.percentile(sureler, 50)), 2),
+            'p95_ms': round(float(np.percentile(sureler, 95)), 2),
+            'p99_ms': round(float(np.percentile(sureler, 99)), 2),
+            'max_ms': round(float(sureler.max()), 2),
+            'errors': hatalar,
+        }
+
+    akislar = sum(i.akislar for i in istemciler)
+    toplam_istek = sum(u['n'] for u in uclar.values())
+    havuz = _havuz_farki(once, sonra)
+
+    print(f"\n✅ {akislar} akış ({akislar / sure:.1f}/sn), {toplam_istek} istek ({toplam_istek / sure:.0f}/sn)")
+    print(f"{'uç':<16} {'n':>7} {'istek/sn':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'hata':>5}  SLO")
+    ihlal = []
+    for uc, olcum in uclar.items():
+        if not olcum['n']:
+            print(f"{uc:<16} {0:>7} {'-':>9} {'-':>9} {'-':>9} {'-':>9} {'-':>9} {olcum['errors']:>5}")
+            continue
+        asan = [
+            ad for ad, sinir in (('p95', args.slo_p95_ms), ('p99', args.slo_p99_ms))
+            if sinir is not None and olcum[f'{ad}_ms'] > sinir
+        ]
+        if asan:
+            ihlal.append(uc)
+        slo = ('❌ ' + ','.join(asan)) if asan else ('✅' if args.slo_p95_ms or args.slo_p99_ms else '')
+        olcum['slo_violations'] = asan
+        print(f"{uc:<16} {olcum['n']:>7} {olcum['rps']:>9.1f} {olcum['p50_ms']:>9.2f} {olcum['p95_ms']:>9.2f} "
+              f"{olcum['p99_ms']:>9.2f} {olcum['max_ms']:>9.2f} {olcum['errors']:>5}  {slo}")
+    if havuz is None:
+        print("\n⚠️ /metrics okunamadı - havuz beklemesi ölçülmedi")
+    elif havuz['checkouts']:
+        print(f"\n🏊 Havuz: {havuz['checkouts']} bağlantı alma, ortalama bekleme {havuz['mean_ms']} ms, "
+              f"p95 ≤ {havuz['p95_le_ms']} ms, p99 ≤ {havuz['p99_le_ms']} ms")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created_at': datetime.utcnow().isoformat(),
+                'target': args.url or 'local',
+                'concurrency': args.concurrency,
+                'duration': round(sure, 2),
+                'flows': akislar,
+                'flows_per_second': round(akislar / sure, 2),
+                'requests_per_second': round(toplam_istek / sure, 1),
+                'endpoints': uclar,
+                'pool_wait': havuz,
+                'slo': {'p95_ms': args.slo_p95_ms, 'p99_ms': args.slo_p99_ms, 'violations': ihlal},
+            }, f, ensure_ascii=False, indent=2)
+        print(f"💾 Sonuçlar yazıldı: {args.output}")
+
+    if ihlal:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
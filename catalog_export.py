@@ -0,0 +1,139 @@
+"""Tüm araç kataloğunun önceden hazırlanmış JSON dosyası
+
+/api/vehicles her istekte tabloyu ORM nesnelerine çevirip dev bir JSON
+üretmek yerine, her katalog nesli için bir kez diske yazılmış dosyayı
+gönderir. Dosya düz, gzip ve (brotli kuruluysa) brotli olarak yazılır;
+satırlar yield_per ile akış halinde okunur, bellek sabit kalır.
+"""
+import glob
+import gzip
+import json
+import os
+import threading
+
+from sqlalchemy import select
+
+from models import db, Vehicle
+
+try:
+    import brotli
+except ImportError:  # opsiyonel - yoksa sadece gzip
+    brotli = None
+
+SNAPSHOT_PREFIX = 'vehicles-'
+
+# Dosya uzantısı -> Content-Encoding
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+_lock = threading.Lock()
+
+
+def snapshot_path(folder, generation):
+    return os.path.join(folder, f'{SNAPSHOT_PREFIX}{generation}.json')
+
+
+def _satirlar(batch_size):
+    """Katalog satırlarını to_dict() ile aynı biçimde akış halinde ver"""
+    sorgu = (
+        select(Vehicle.id, Vehicle.marka, Vehicle.model, Vehicle.yil,
+               Vehicle.sigortalar, Vehicle.created_at)
+        .order_by(Vehicle.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for vehicle_id, marka, model, yil, sigortalar, created_at in db.session.execute(sorgu):
+        yield {
+            'id': vehicle_id,
+            'marka': marka,
+            'model': model,
+            'yil': yil,
+            'sigortalar': sigortalar,
+            'created_at': created_at.isoformat() if created_at else None,
+        }
+
+
+def export_catalog_snapshot(folder, generation, batch_size=2000):
+    """Katalogu folder altına nesle özel dosyalar olarak yaz, yolu döndür"""
+    os.makedirs(folder, exist_ok=True)
+    hedef = snapshot_path(folder, generation)
+    # Aynı süreçte catalog_changed ile bir istek aynı nesli aynı anda yazabilir
+    gecici = f'{hedef}.{os.getpid()}.{threading.get_ident()}.tmp'
+
+    # jsonify ile aynı biçim: sıralı anahtarlar, boşluksuz
+    encoder = json.JSONEncoder(sort_keys=True, separators=(',', ':'))
+    sikistirici = brotli.Compressor(quality=9) if brotli else None
+
+    with open(gecici, 'wb') as duz, \
+            gzip.open(f'{gecici}.gz', 'wb', compresslevel=9) as gz, \
+            open(f'{gecici}.br', 'wb') as br:
+
+        def yaz(metin):
+            veri = metin.encode('utf-8')
+            duz.write(veri)
+            gz.write(veri)
+            if sikistirici:
+                br.write(sikistirici.process(veri))
+
+        yaz('[')
+        for i, satir in enumerate(_satirlar(batch_size)):
+            yaz((',' if i else '') + encoder.encode(satir))
+        yaz(']\n')
+
+        if sikistirici:
+            br.write(sikistirici.finish())
+
+    # Sıkıştırılmış sürümler önce, düz dosya en son yerine konur;
+    # düz dosya varsa diğerleri de hazırdır
+    os.replace(f'{gecici}.gz', f'{hedef}.gz')
+    if sikistirici:
+        os.replace(f'{gecici}.br', f'{hedef}.br')
+    else:
+        os.remove(f'{gecici}.br')
+    os.replace(gecici, hedef)
+
+    _eskileri_sil(folder, generation)
+    return hedef
+
+
+def _eskileri_sil(folder, generation):
+    """Başka nesillere ait dosyaları sil (gönderilmekte olanlar etkilenmez)
+
+    Başka süreçlerin yazmakta olduğu geçici dosyalara (.tmp, .tmp.gz,
+    .tmp.br) dokunulmaz; silinirse onların os.replace'i başarısız olur.
+    """
+    guncel = snapshot_path(folder, generation)
+    for yol in glob.glob(os.path.join(folder, f'{SNAPSHOT_PREFIX}*.json*')):
+        if yol.endswith(('.tmp', '.tmp.gz', '.tmp.br')) or yol.startswith(guncel):
+            continue
+        try:
+            os.remove(yol)
+        except OSError:
+            pass
+
+
+def ensure_catalog_snapshot(folder, generation):
+    """Bu neslin dosyası yoksa oluştur (ör. /clear veya geri dönüş sonrası)"""
+    hedef = snapshot_path(folder, generation)
+    if os.path.exists(hedef):
+        return hedef
+    with _lock:
+        if not os.path.exists(hedef):
+            export_catalog_snapshot(folder, generation)
+    return hedef
+
+
+def preferred_encoding(accept_encodings):
+    """Dosyaya bakmadan istemciye gidecek sıkıştırma (ETag eki için), yoksa None"""
+    for encoding, _ in ENCODINGS:
+        if encoding == 'br' and brotli is None:
+            continue
+        if encoding in accept_encodings:
+            return encoding
+    return None
+
+
+def pick_encoding(path, accept_encodings):
+    """İstemcinin kabul ettiği en iyi sıkıştırılmış sürümü seç"""
+    for encoding, uzanti in ENCODINGS:
+        if encoding in accept_encodings and os.path.exists(path + uzanti):
+            return path + uzanti, encoding
+    return path, None
@@ -0,0 +1,77 @@
+"""Katalog özeti (catalog_stats): kayıt sayısı, marka sayısı, şirket kapsamı
+
+Ana sayfa ve /api/sigorta-sirketleri her açılışta COUNT(*) / DISTINCT
+çalıştırmak yerine bu tek satırı okur. Satır catalog_changed() içinde,
+fiyat tablosu yenilendikten sonra bir kez hesaplanır. Okunan değer süreç
+içinde katalog nesliyle birlikte tutulur; nesil değişmedikçe veritabanına
+hiç gidilmez.
+"""
+import threading
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from db_routing import primary
+from generation import get_generation
+from models import db, CatalogStats, Insurer, Vehicle, VehiclePrice
+
+_lock = threading.Lock()
+# (nesil, özet sözlüğü)
+_okunan = (None, None)
+
+
+def refresh_catalog_stats(engine, imported=False):
+    """Özeti vehicles / vehicle_prices'tan yeniden hesapla ve yaz
+
+    imported=True ise son yükleme zamanı da güncellenir.
+    """
+    t = CatalogStats.__table__
+    with engine.begin() as conn:
+        toplam, marka_sayisi = conn.execute(
+            select(func.count(Vehicle.id), func.count(Vehicle.marka.distinct()))
+        ).one()
+        # vehicle_prices'ta her (araç, şirket) tek satır: idx_price_insurer_price üzerinden sayılır
+        sirketler = [
+            {'name': ad, 'vehicles': sayi}
+            for ad, sayi in conn.execute(
+                select(Insurer.name, func.count(VehiclePrice.vehicle_id))
+                .join(VehiclePrice, VehiclePrice.insurer_id == Insurer.id)
+                .group_by(Insurer.id, Insurer.name)
+                .order_by(Insurer.id)
+            )
+        ]
+        degerler = {
+            'total_records': toplam,
+            'unique_brands': marka_sayisi,
+            'insurers': sirketler,
+            'updated_at': datetime.utcnow(),
+        }
+        if imported:
+            degerler['last_import_at'] = datetime.utcnow()
+        if conn.execute(t.update().where(t.c.id == 1).values(**degerler)).rowcount == 0:
+            conn.execute(t.insert().values(id=1, **degerler))
+    return degerler
+
+
+def stats_missing():
+    """Özet satırı yok mu (ilk kurulum / eski veritabanı)"""
+    return db.session.get(CatalogStats, 1) is None
+
+
+def get_catalog_stats():
+    """Güncel özet sözlüğü - nesil değişmediyse süreç içi kopyadan"""
+    global _okunan
+    nesil = get_generation('catalog')
+    okunan_nesil, ozet = _okunan
+    if ozet is not None and okunan_nesil == nesil:
+        return ozet
+
+    with _lock, primary():
+        kayit = db.session.get(CatalogStats, 1)
+        if kayit is None:
+            ozet = {'total_records': 0, 'unique_brands': 0, 'insurers': [],
+                    'last_import_at': None, 'updated_at': None}
+        else:
+            ozet = kayit.to_dict()
+        _okunan = (nesil, ozet)
+    return ozet
@@ -0,0 +1,231 @@
+"""Parçalı / devam ettirilebilir Excel yükleme
+
+Büyük dosya tek istekte gönderilmez: istemci önce yüklemeyi başlatır (dosya
+adı, boyut, SHA-256), sonra dosyayı sırayla parçalar halinde PUT eder ve en
+son finalize ile kuyruğa verir. Parçalar istek gövdesinden doğrudan
+UPLOAD_FOLDER'daki <id>.part dosyasına yazılır (form ayrıştırma / geçici
+dosya yok); her istek en fazla bir parça sürer.
+
+Bağlantı koparsa istemci GET ile son geçerli konumu (offset) öğrenip oradan
+devam eder. Yarım gelen ya da sağlaması tutmayan parça dosyadan geri
+kesilir. Durum diskte (<id>.upload.json) tutulur; aynı klasörü gören her
+işçi süreci aynı yüklemeye devam edebilir.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import re
+import secrets
+import time
+from datetime import datetime
+
+from werkzeug.utils import secure_filename
+
+# Diskten okuma / yazma blok boyutu
+BLOK = 1024 * 1024
+
+_GECERLI_ID = re.compile(r'^[0-9a-f]{32}$')
+_SHA256 = re.compile(r'^[0-9a-f]{64}$')
+
+
+class UploadError(ValueError):
+    """İstemciye dönecek hata; status HTTP kodu, offset varsa güncel konum"""
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for blok in iter(lambda: f.read(BLOK), b''):
+            h.update(blok)
+    return h.hexdigest()
+
+
+class ChunkedUploads:
+    def __init__(self, folder, chunk_size, max_size, expire_hours=24, allowed_extensions=()):
+        self.folder = folder
+        self.chunk_size = chunk_size
+        self.max_size = max_size
+        self.expire_seconds = expire_hours * 3600
+        self.allowed_extensions = {e.lower() for e in allowed_extensions}
+
+    def _yol(self, upload_id, ext):
+        if not _GECERLI_ID.match(upload_id or ''):
+            raise UploadError('Yükleme bulunamadı', 404)
+        return os.path.join(self.folder, f'{upload_id}.{ext}')
+
+    def _meta_yaz(self, meta):
+        yol = self._yol(meta['id'], 'upload.json')
+        with open(yol + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(yol + '.tmp', yol)
+
+    def _meta(self, upload_id):
+        try:
+            with open(self._yol(upload_id, 'upload.json'), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise UploadError('Yükleme bulunamadı', 404)
+
+    def _offset(self, upload_id):
+        try:
+            return os.path.getsize(self._yol(upload_id, 'part'))
+        except FileNotFoundError:
+            return 0
+
+    def create(self, filename, size, sha256, mode):
+        """Yeni yükleme başlat; yükleme bilgisi (id, offset, chunk_size) döner"""
+        self.cleanup()
+        ad = secure_filename(filename or '')
+        if not ad or '.' not in ad or ad.rsplit('.', 1)[1].lower() not in self.allowed_extensions:
+            raise UploadError('Geçersiz dosya türü! Sadece .xlsx veya .xls')
+        if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+            raise UploadError("'size' pozitif bir tam sayı olmalı")
+        if size > self.max_size:
+            raise UploadError(f'Dosya çok büyük (en fazla {self.max_size // 1024 // 1024} MB)', 413)
+        sha256 = (sha256 or '').lower()
+        if not _SHA256.match(sha256):
+            raise UploadError("'sha256' 64 karakterlik onaltılık SHA-256 olmalı")
+
+        meta = {
+            'id': secrets.token_hex(16),
+            'filepath': None,
+            'filename': ad,
+            'size': size,
+            'sha256': sha256,
+            'mode': mode,
+            'created_at': datetime.utcnow().isoformat(),
+            'job_id': None,
+        }
+        open(self._yol(meta['id'], 'part'), 'wb').close()
+        self._meta_yaz(meta)
+        return self.status(meta['id'])
+
+    def status(self, upload_id):
+        meta = self._meta(upload_id)
+        tamamlandi = meta.get('filepath') or meta.get('duplicate')
+        offset = meta['size'] if tamamlandi else self._offset(upload_id)
+        return {**meta, 'offset': offset, 'chunk_size': self.chunk_size, 'complete': offset == meta['size']}
+
+    def append(self, upload_id, offset, stream, length, checksum=None):
+        """Parçayı offset'e yaz; yeni offset döner
+
+        Yalnız dosyanın sonuna eklenebilir: offset diskteki boyuttan farklıysa
+        409 ve güncel konum döner. Parça eksik gelir ya da checksum tutmazsa
+        dosya parçadan önceki boyutuna geri kesilir.
+        """
+        meta = self._meta(upload_id)
+        if meta.get('filepath') or meta.get('duplicate'):
+            raise UploadError('Yükleme zaten tamamlandı', 409, offset=meta['size'])
+        if length is None:
+            raise UploadError('Content-Length gerekli', 411)
+        if length <= 0:
+            raise UploadError('Boş parça')
+        if length > self.chunk_size:
+            raise UploadError(f'Parça çok büyük (en fazla {self.chunk_size} bayt)', 413)
+        checksum = (checksum or '').lower() or None
+        if checksum is not None and not _SHA256.match(checksum):
+            raise UploadError('Parça sağlaması 64 karakterlik onaltılık SHA-256 olmalı')
+
+        with open(self._yol(upload_id, 'part'), 'r+b') as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadError('Bu yüklemeye şu an başka bir parça yazılıyor', 409)
+            mevcut = f.seek(0, os.SEEK_END)
+            if offset != mevcut:
+                raise UploadError('Parça konumu uyuşmuyor', 409, offset=mevcut)
+            if mevcut + length > meta['size']:
+                raise UploadError('Parça bildirilen dosya boyutunu aşıyor', 400, offset=mevcut)
+
+            h = hashlib.sha256()
+            kalan = length
+            try:
+                while kalan:
+                    blok = stream.read(min(BLOK, kalan))
+                    if not blok:
+                        break
+                    f.write(blok)
+                    h.update(blok)
+                    kalan -= len(blok)
+                if kalan:
+                    raise UploadError('Parça eksik geldi', 400, offset=mevcut)
+                if checksum is not None and h.hexdigest() != checksum:
+                    raise UploadError('Parça sağlaması uyuşmuyor', 400, offset=mevcut)
+                f.flush()
+            except BaseException:
+                # Bağlantı kopması dahil: yarım parça diskte kalmasın
+                f.truncate(mevcut)
+                raise
+        return mevcut + length
+
+    def finalize(self, upload_id, enqueue, skip=None):
+        """Boyut ve SHA-256'yı doğrula, dosyayı yerine taşı, enqueue(yol, ad, mod) ile kuyruğa ver
+
+        skip(sha256, mod) True dönerse (aynı dosya zaten yüklü) dosya silinir,
+        iş oluşturulmaz ve meta['duplicate'] True olur. Tekrar çağrılırsa
+        (istemci yanıtı kaçırdıysa) aynı sonuç döner.
+        """
+        meta = self._meta(upload_id)
+        if meta['job_id'] or meta.get('duplicate'):
+            return meta
+        if not meta.get('filepath'):
+            part = self._yol(upload_id, 'part')
+            with open(part, 'rb') as f:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    raise UploadError('Bu yüklemeye şu an başka bir parça yazılıyor', 409)
+                boyut = os.path.getsize(part)
+                if boyut != meta['size']:
+                    raise UploadError(f"Dosya eksik: {boyut}/{meta['size']} bayt", 409, offset=boyut)
+                if sha256_file(part) != meta['sha256']:
+                    raise UploadError('Dosya sağlaması uyuşmuyor, yükleme baştan yapılmalı', 422)
+                if skip is not None and skip(meta['sha256'], meta['mode']):
+                    os.remove(part)
+                    meta['duplicate'] = True
+                    self._meta_yaz(meta)
+                    return meta
+
+                kayit_adi = f"{datetime.utcnow():%Y%m%d%H%M%S%f}_{meta['filename']}"
+                meta['filepath'] = os.path.join(self.folder, kayit_adi)
+                os.replace(part, meta['filepath'])
+            # Kuyruğa alma başarısız olursa finalize tekrarı taşınmış dosyayı kullanır
+            self._meta_yaz(meta)
+        job = enqueue(meta['filepath'], meta['filename'], meta['mode'])
+        meta['job_id'] = job.id
+        self._meta_yaz(meta)
+        return meta
+
+    def abort(self, upload_id):
+        meta = self._meta(upload_id)
+        for ext in ('part', 'upload.json'):
+            try:
+                os.remove(self._yol(meta['id'], ext))
+            except FileNotFoundError:
+                pass
+
+    def cleanup(self):
+        """Süresi geçmiş (yarım kalmış ya da tamamlanmış) yükleme kayıtlarını sil"""
+        sinir = time.time() - self.expire_seconds
+        for e in os.scandir(self.folder):
+            if not e.name.endswith('.upload.json'):
+                continue
+            upload_id = e.name[:-len('.upload.json')]
+            if not _GECERLI_ID.match(upload_id):
+                continue
+            try:
+                son = e.stat().st_mtime
+                if os.path.exists(self._yol(upload_id, 'part')):
+                    son = max(son, os.path.getmtime(self._yol(upload_id, 'part')))
+                if son < sinir:
+                    self.abort(upload_id)
+                    print(f"🧹 Süresi geçen parçalı yükleme silindi: {upload_id}")
+            except (OSError, UploadError):
+                # Başka bir işçi aynı anda silmiş olabilir
+                continue
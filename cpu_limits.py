@@ -0,0 +1,35 @@
+"""Konteynerin gerçekten kullanabildiği CPU sayısı
+
+os.cpu_count() / multiprocessing.cpu_count() konteynerde host'un çekirdek
+sayısını verir. Burada sürecin atanmış çekirdekleri (sched_getaffinity)
+cgroup CPU kotasıyla (v2 cpu.max, v1 cfs_quota_us) sınırlanır. gunicorn
+işçi sayısı ve parallel okuyucunun süreç havuzu bundan türetilir.
+"""
+import math
+import os
+
+
+def available_cpus():
+    """Sürecin kullanabileceği CPU: atanmış çekirdekler ve cgroup kotası"""
+    try:
+        cpu = len(os.sched_getaffinity(0))
+    except AttributeError:  # Linux dışı
+        cpu = os.cpu_count() or 1
+    # cgroup v2: "kota periyot" ya da "max periyot"; v1: ayrı dosyalar
+    for kota_yolu, periyot_yolu in (
+        ('/sys/fs/cgroup/cpu.max', None),
+        ('/sys/fs/cgroup/cpu/cpu.cfs_quota_us', '/sys/fs/cgroup/cpu/cpu.cfs_period_us'),
+    ):
+        try:
+            with open(kota_yolu) as f:
+                degerler = f.read().split()
+            if periyot_yolu:
+                with open(periyot_yolu) as f:
+                    degerler.append(f.read().strip())
+            kota, periyot = degerler[0], int(degerler[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        if kota not in ('max', '-1') and periyot > 0:
+            cpu = min(cpu, max(1, math.ceil(int(kota) / periyot)))
+        break
+    return cpu
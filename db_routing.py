@@ -0,0 +1,75 @@
+"""Okuma replikası ve import için ayrı bağlantı havuzu
+
+DATABASE_REPLICA_URL verilirse SQLALCHEMY_BINDS['replica'] olarak açılır;
+@read_only ile işaretlenen uçların sorguları (flush dışında) replikaya
+gider. Replika yoksa her şey ana veritabanında kalır.
+
+Import'lar SQLALCHEMY_BINDS['ingest'] engine'iyle yazar (varsayılan: ana
+veritabanı, küçük ayrı havuz). Uzun toplu yazmalar müşteri isteklerinin
+havuzundan bağlantı almaz; istekler import sırasında havuz beklemez.
+
+Replika gecikmesi: nesil damgasıyla tutulan her şey (ağaç, diziler, özet,
+arama ağacı, katalog dosyası, ETag'li yanıtlar) ana veritabanından
+yüklenmelidir; geride kalan replikadan okunursa eski liste yeni nesille
+önbelleğe girer ve sonraki import'a kadar verilir. Bu yüzden önbellek
+yükleyicileri primary() içinde çalışır ve @read_only yalnız nesil
+önbelleği olmayan (conditional kullanmayan) uçlarda kullanılır.
+"""
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND = 'replica'
+INGEST_BIND = 'ingest'
+
+
+class RoutingSession(Session):
+    """@read_only uçlarda okumaları replika engine'ine yönlendiren oturum"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context() and g.get('_replika'):
+            motor = self._db.engines.get(REPLICA_BIND)
+            if motor is not None:
+                return motor
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_only(view):
+    """Uç yalnız okur: sorguları varsa replikaya gitsin"""
+    @wraps(view)
+    def sarmalayici(*args, **kwargs):
+        g._replika = True
+        return view(*args, **kwargs)
+    return sarmalayici
+
+
+@contextmanager
+def primary():
+    """Blok içindeki sorgular @read_only uçta da ana veritabanına gider"""
+    replika = has_app_context() and g.get('_replika')
+    if replika:
+        g._replika = False
+    try:
+        yield
+    finally:
+        if replika:
+            g._replika = True
+
+
+def bind_engine(db, key):
+    """Ayrı bind tanımlıysa onun engine'i, yoksa ana engine"""
+    return db.engines.get(key, db.engine)
+
+
+def pool_stats(engines):
+    """Havuz adı -> (boyut, kullanımda, taşma) - /metrics göstergeleri için"""
+    sonuc = {}
+    for key, motor in engines.items():
+        havuz = motor.pool
+        if not hasattr(havuz, 'checkedout'):
+            continue
+        ad = havuz.logging_name or key or 'primary'
+        sonuc[ad] = (havuz.size(), havuz.checkedout(), max(0, havuz.overflow()))
+    return sonuc
@@ -0,0 +1,133 @@
+"""Veri nesli (generation) damgaları
+
+Veri değiştiğinde (yükleme, temizleme, geri dönüş) ilgili damga yenilenir.
+Damganın asıl kaynağı veritabanındaki data_generations tablosudur; böylece
+CATALOG_FOLDER'ı paylaşmayan sunucular / konteynerler de yeni nesli görür.
+Okuma ucuz kalsın diye her süreç damgayı bellekte tutar ve veritabanına en
+fazla GENERATION_CHECK_SECONDS'da bir gider. CATALOG_FOLDER altındaki
+küçük dosya aynı makinedeki süreçler için hızlı yoldur: dosya değişince
+(os.stat) süre beklenmeden veritabanından tekrar okunur. Damga sayaç
+değil rastgele bir değerdir, böylece tablo / dosya silinse bile eski bir
+nesille karışmaz.
+"""
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from flask import current_app
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from models import db, DataGeneration
+
+_lock = threading.Lock()
+# name -> (stat anahtarı, damga, zaman, son veritabanı kontrolü)
+_okunan = {}
+
+
+def _damga_yolu(name):
+    return os.path.join(current_app.config['CATALOG_FOLDER'], f'{name}.generation')
+
+
+def _dosya_anahtari(yol):
+    try:
+        st = os.stat(yol)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _dosyaya_yaz(name, damga):
+    yol = _damga_yolu(name)
+    os.makedirs(os.path.dirname(yol), exist_ok=True)
+    gecici = f'{yol}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(gecici, 'w') as f:
+        f.write(damga)
+    # Atomik değiştir - okuyanlar yarım dosya görmez
+    os.replace(gecici, yol)
+
+
+def _kaydet(name, damga, yeni=False):
+    """Damgayı veritabanına yaz; yeni=True ise satır zaten varsa dokunma"""
+    t = DataGeneration.__table__
+    simdi = datetime.utcnow()
+    # İstek oturumundan bağımsız, ana veritabanına (replika değil)
+    if not yeni:
+        with db.engine.begin() as conn:
+            if conn.execute(
+                update(t).where(t.c.name == name).values(value=damga, updated_at=simdi)
+            ).rowcount:
+                return
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(insert(t).values(name=name, value=damga, updated_at=simdi))
+    except IntegrityError:
+        # Başka bir süreç aynı anda ilk satırı ekledi
+        if not yeni:
+            _kaydet(name, damga)
+
+
+def bump_generation(name='catalog'):
+    """Yeni nesil damgası yaz ve döndür"""
+    damga = uuid.uuid4().hex[:16]
+    _kaydet(name, damga)
+    _dosyaya_yaz(name, damga)
+    return damga
+
+
+def _oku(name):
+    """(damga, zaman) - veritabanından
+
+    Satır yoksa (ilk açılış / dosya damgalı eski kurulum) dosyadaki damga,
+    o da yoksa yeni bir damga eklenir; aynı anda açılan işçiler art arda
+    nesil yenilemez.
+    """
+    t = DataGeneration.__table__
+    sorgu = select(t.c.value, t.c.updated_at).where(t.c.name == name)
+    with db.engine.connect() as conn:
+        satir = conn.execute(sorgu).first()
+    if satir is None:
+        try:
+            with open(_damga_yolu(name)) as f:
+                damga = f.read().strip() or uuid.uuid4().hex[:16]
+        except FileNotFoundError:
+            damga = uuid.uuid4().hex[:16]
+        _kaydet(name, damga, yeni=True)
+        with db.engine.connect() as conn:
+            satir = conn.execute(sorgu).one()
+    return satir.value, satir.updated_at.replace(tzinfo=timezone.utc)
+
+
+def _guncel(name):
+    anahtar = _dosya_anahtari(_damga_yolu(name))
+    onceki = _okunan.get(name)
+    aralik = current_app.config.get('GENERATION_CHECK_SECONDS', 5)
+    if onceki and onceki[0] == anahtar and time.monotonic() - onceki[3] < aralik:
+        return onceki
+
+    with _lock:
+        onceki = _okunan.get(name)
+        if onceki and onceki[0] == anahtar and time.monotonic() - onceki[3] < aralik:
+            return onceki
+        try:
+            damga, zaman = _oku(name)
+        except Exception as e:
+            if onceki is None:
+                raise
+            # Veritabanı geçici olarak yoksa bilinen nesille devam
+            print(f"⚠️ Nesil damgası okunamadı ({name}): {str(e)}")
+            damga, zaman = onceki[1], onceki[2]
+        onceki = _okunan[name] = (anahtar, damga, zaman, time.monotonic())
+    return onceki
+
+
+def get_generation(name='catalog'):
+    """Geçerli nesil damgası (yakın zamanda okunduysa ve dosya değişmediyse bellekten)"""
+    return _guncel(name)[1]
+
+
+def get_generation_time(name='catalog'):
+    """Geçerli neslin oluşturulma zamanı (Last-Modified için)"""
+    return _guncel(name)[2]
@@ -0,0 +1,66 @@
+"""gunicorn ayarları - Procfile: gunicorn app:app -c gunicorn.conf.py
+
+Varsayılan gthread işçileri: her işçi süreci GUNICORN_THREADS iş parçacığıyla
+istek karşılar; yavaş bir istemci ya da sorgu tüm işçiyi değil tek bir iş
+parçacığını bekletir. İşçi ve iş parçacığı sayısı CPU sayısından türetilir,
+ortam değişkenleriyle ezilebilir. CPU sayısı konteynerin gördüğü kadardır:
+cgroup CPU kotası ve süreç CPU ataması (sched_getaffinity); host'un
+çekirdek sayısı kullanılmaz.
+
+  WEB_CONCURRENCY          işçi süreci (varsayılan: 2 x CPU, en az 2, en fazla 8)
+  GUNICORN_THREADS         işçi başına iş parçacığı (varsayılan: 4)
+  GUNICORN_WORKER_CLASS    gthread (varsayılan) veya sync
+  GUNICORN_TIMEOUT         sn (varsayılan: 120)
+
+Her işçinin veritabanı havuzu iş parçacığı sayısına göre ayarlanır
+(DB_POOL_SIZE = iş parçacığı + 2: kuyruk işçisi ve kalp atışı için), ayrıca
+verilmemişse. Toplam bağlantı ~ işçi x (DB_POOL_SIZE + DB_MAX_OVERFLOW +
+INGEST_POOL_SIZE + INGEST_MAX_OVERFLOW); açılışta loglanır, PostgreSQL
+max_connections buna göre seçilmelidir.
+
+preload_app kapalı: import kuyruğu işçisi (JOB_WORKER=thread) uygulama
+yüklenirken başlar ve fork'tan sonra her işçide ayrı çalışmalıdır.
+"""
+import os
+import sys
+
+# cpu_limits uygulama klasöründe; gunicorn config'i sys.path'e eklemeden yükler
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from cpu_limits import available_cpus  # noqa: E402
+
+# Varsayılan işçi sayısı üst sınırı (WEB_CONCURRENCY ile aşılabilir)
+EN_FAZLA_ISCI = 8
+
+cpu = available_cpus()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('WEB_CONCURRENCY', min(EN_FAZLA_ISCI, max(2, cpu * 2))))
+threads = int(os.environ.get('GUNICORN_THREADS', 4)) if worker_class == 'gthread' else 1
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+# İşçileri N istekte bir yenile (0 = kapalı). Yenilenen işçideki import işi
+# kalp atışı kesilince kuyrukta yeniden denenir; büyük import'larda kapalı tutun.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+preload_app = False
+accesslog = '-' if os.environ.get('GUNICORN_ACCESS_LOG', '0') == '1' else None
+
+# İşçiler fork sonrası app.py'yi yüklerken bu değerleri okur
+os.environ.setdefault('DB_POOL_SIZE', str(threads + 2))
+os.environ.setdefault('DB_MAX_OVERFLOW', str(max(2, threads // 2)))
+
+
+def when_ready(server):
+    havuz = int(os.environ['DB_POOL_SIZE']) + int(os.environ['DB_MAX_OVERFLOW'])
+    import_havuzu = int(os.environ.get('INGEST_POOL_SIZE', 2)) + int(os.environ.get('INGEST_MAX_OVERFLOW', 1))
+    server.log.info(
+        f"🚀 {workers} {worker_class} işçi x {threads} iş parçacığı, "
+        f"havuz {os.environ['DB_POOL_SIZE']}+{os.environ['DB_MAX_OVERFLOW']} ({cpu} CPU)"
+    )
+    server.log.info(
+        f"🔌 Veritabanı bağlantısı en fazla {workers * (havuz + import_havuzu)} "
+        f"({workers} işçi x ({havuz} istek + {import_havuzu} import))"
+    )
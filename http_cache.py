@@ -0,0 +1,65 @@
+"""Salt okunur API'ler için ETag / Last-Modified koşullu yanıtlar
+
+ETag, ilgili verinin nesil damgasından türetilir (bkz. generation.py).
+İstemci aynı ETag'i If-None-Match ile gönderirse görünüm fonksiyonu hiç
+çalışmadan 304 döner - ne sorgu ne JSON serileştirme yapılır.
+
+Aynı neslin sıkıştırılmış sürümleri (düz / gzip / br) farklı baytlardır;
+her biri kendi ETag'ini alır (catalog-<nesil>-gzip). Aksi halde bir
+Range / If-Range isteği bir sürümün başını başka bir sürümün baytlarıyla
+birleştirebilir.
+"""
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+from generation import get_generation, get_generation_time
+
+
+def _cache_control(resp):
+    resp.cache_control.public = True
+    resp.cache_control.max_age = current_app.config['API_CACHE_MAX_AGE']
+    swr = current_app.config['API_CACHE_STALE_WHILE_REVALIDATE']
+    if swr:
+        resp.cache_control.stale_while_revalidate = swr
+
+
+def conditional(name, encoding=None):
+    """Yanıtı 'name' nesline bağla; değişmediyse 304 döndür
+
+    encoding: istemciye gidecek Content-Encoding'i (ya da None) döndüren
+    fonksiyon; ETag'e eklenir ve yanıt Accept-Encoding'e göre değişir.
+    Görünüm kendi ETag'ini koyduysa (send_file) o korunur.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = f'{name}-{get_generation(name)}'
+            if encoding is not None:
+                secilen = encoding()
+                if secilen:
+                    etag = f'{etag}-{secilen}'
+            degisme = get_generation_time(name).replace(microsecond=0)
+
+            if request.if_none_match:
+                eslesti = request.if_none_match.star_tag or request.if_none_match.contains(etag)
+            else:
+                eslesti = bool(request.if_modified_since) and degisme <= request.if_modified_since
+
+            if eslesti:
+                resp = current_app.response_class(status=304)
+            else:
+                resp = make_response(view(*args, **kwargs))
+                # Hata / bulunamadı yanıtları önbelleğe alınmaz (206 = Range yanıtı)
+                if resp.status_code not in (200, 206):
+                    return resp
+
+            if resp.get_etag()[0] is None:
+                resp.set_etag(etag)
+            if encoding is not None:
+                resp.vary.add('Accept-Encoding')
+            resp.last_modified = degisme
+            _cache_control(resp)
+            return resp
+        return wrapper
+    return decorator
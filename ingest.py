@@ -0,0 +1,617 @@
+import csv
+import io
+import json
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from sqlalchemy import (
+    Column, Index, MetaData, Table, bindparam, delete, insert, inspect, select, text,
+    tuple_, update,
+)
+
+from models import Vehicle
+from prices import update_vehicle_prices
+
+# Zorunlu sütunlar - geri kalan her sütun bir sigorta şirketi
+REQUIRED_COLS = ['MARKA', 'MODEL', 'YIL']
+
+# Tam liste yenilemede (replace) kullanılan tablo nesilleri
+VEHICLE_TABLE = 'vehicles'
+STAGING_TABLE = 'vehicles_next'
+PREVIOUS_TABLE = 'vehicles_prev'
+
+
+def _fiyat_sutunu_temizle(seri):
+    """Bir sigorta sütununu tek seferde sayıya çevir"""
+    # Zaten sayısal sütunlarda string işlemine gerek yok
+    if pd.api.types.is_numeric_dtype(seri) and not pd.api.types.is_bool_dtype(seri):
+        return pd.to_numeric(seri, errors='coerce').astype('float64')
+
+    temiz = (
+        seri.astype(str)
+        .str.replace(' ', '', regex=False)
+        .str.replace(',', '.', regex=False)
+        .str.strip()
+    )
+    return pd.to_numeric(temiz, errors='coerce').astype('float64')
+
+
+def _yil_sutunu_temizle(seri):
+    """YIL sütununu '2015' gibi stringe çevir"""
+    if pd.api.types.is_numeric_dtype(seri) and not pd.api.types.is_bool_dtype(seri):
+        sayisal = seri.astype('float64')
+    else:
+        sayisal = pd.to_numeric(seri.astype(str).str.strip(), errors='coerce')
+
+    hatali = sayisal.isna()
+    if hatali.any():
+        raise ValueError(f"Geçersiz YIL değeri: {seri[hatali].iloc[0]!r}")
+
+    return sayisal.astype('int64').astype(str)
+
+
+def clean_price_frame(df, sigorta_sutunlari):
+    """DataFrame'i sütun bazında temizle, (kayıtlar, atlanan) döndür
+
+    Her kayıt Vehicle tablosuna yazılmaya hazır düz bir dict'tir:
+    {'marka', 'model', 'yil', 'sigortalar'}
+    """
+    if len(df) == 0:
+        return [], 0
+
+    if sigorta_sutunlari:
+        fiyatlar = np.column_stack([
+            _fiyat_sutunu_temizle(df[col]).to_numpy() for col in sigorta_sutunlari
+        ])
+    else:
+        fiyatlar = np.empty((len(df), 0), dtype='float64')
+
+    # Geçersiz, sonsuz veya <=0 fiyatlar eklenmez
+    with np.errstate(invalid='ignore'):
+        gecerli = np.isfinite(fiyatlar) & (fiyatlar > 0)
+    satir_gecerli = gecerli.any(axis=1)
+
+    atlanan = int((~satir_gecerli).sum())
+    if not satir_gecerli.any():
+        return [], atlanan
+
+    fiyatlar = fiyatlar[satir_gecerli]
+    gecerli = gecerli[satir_gecerli]
+    tam_fiyatlar = np.where(gecerli, fiyatlar, 0).astype('int64')
+
+    secili = df.loc[satir_gecerli]
+    markalar = secili['MARKA'].astype(str).str.strip().tolist()
+    modeller = secili['MODEL'].astype(str).str.strip().tolist()
+    yillar = _yil_sutunu_temizle(secili['YIL']).tolist()
+
+    kayitlar = []
+    for marka, model, yil, fiyat_satiri, gecerli_satiri in zip(
+        markalar, modeller, yillar, tam_fiyatlar.tolist(), gecerli.tolist()
+    ):
+        kayitlar.append({
+            'marka': marka,
+            'model': model,
+            'yil': yil,
+            'sigortalar': {
+                sirket: fiyat
+                for sirket, fiyat, ok in zip(sigorta_sutunlari, fiyat_satiri, gecerli_satiri)
+                if ok
+            },
+        })
+
+    return kayitlar, atlanan
+
+
+def _basliklari_duzenle(baslik):
+    """Başlıkları pandas.read_excel ile aynı şekilde adlandır
+
+    Sondaki boş başlık hücreleri (biçimlendirilmiş ama boş sütunlar) atılır;
+    pandas da atar, yoksa 'Unnamed: N' sigorta şirketi olarak kaydedilirdi.
+    Satırlar ExcelStream'de başlık genişliğine kırpılır.
+    """
+    baslik = list(baslik)
+    while baslik and baslik[-1] is None:
+        baslik.pop()
+    sutunlar = []
+    gorulen = {}
+    for i, ad in enumerate(baslik):
+        if ad is None:
+            ad = f'Unnamed: {i}'
+        if ad in gorulen:
+            gorulen[ad] += 1
+            ad = f'{ad}.{gorulen[ad]}'
+        else:
+            gorulen[ad] = 0
+        sutunlar.append(ad)
+    return sutunlar
+
+
+class ExcelStream:
+    """Excel'i openpyxl read_only modunda satır satır okuyan akış
+
+    Üzerinde dönüldüğünde en fazla batch_size satırlık DataFrame'ler verir;
+    dosyanın tamamı hiçbir zaman belleğe alınmaz.
+    """
+
+    def __init__(self, filepath, batch_size, sheet=None):
+        self.batch_size = batch_size
+        self._wb = load_workbook(filepath, read_only=True, data_only=True)
+        # sheet: sayfa adı (verilmezse ilk sayfa)
+        ws = self._wb[sheet] if sheet is not None else self._wb.worksheets[0]
+        self._satirlar = ws.iter_rows(values_only=True)
+
+        baslik = next(self._satirlar, None)
+        self.sutunlar = _basliklari_duzenle(baslik) if baslik else []
+        # read_only modda boyut bilgisi dosyadan gelir, eksik olabilir
+        self.tahmini_satir = (ws.max_row - 1) if ws.max_row else 0
+
+    def __iter__(self):
+        genislik = len(self.sutunlar)
+        try:
+            tampon = []
+            for satir in self._satirlar:
+                # Tamamen boş satırları atla
+                if all(hucre is None for hucre in satir):
+                    continue
+                if len(satir) != genislik:
+                    satir = (tuple(satir) + (None,) * genislik)[:genislik]
+                tampon.append(satir)
+                if len(tampon) >= self.batch_size:
+                    yield pd.DataFrame(tampon, columns=self.sutunlar)
+                    tampon = []
+            if tampon:
+                yield pd.DataFrame(tampon, columns=self.sutunlar)
+        finally:
+            self.close()
+
+    def close(self):
+        self._wb.close()
+
+
+def _sayfa_oku(filepath, sayfa):
+    """İşçi süreç: tek bir sayfayı oku ve temizle"""
+    df = pd.read_excel(filepath, sheet_name=sayfa, engine='openpyxl')
+    sigorta_sutunlari = [col for col in df.columns if col not in REQUIRED_COLS]
+    return clean_price_frame(df, sigorta_sutunlari)
+
+
+class ParallelExcelReader:
+    """Çok sayfalı / büyük çalışma kitaplarını süreç havuzunda işle
+
+    Birden fazla sayfa varsa her sayfa ayrı bir işçi süreçte okunup
+    temizlenir; zorunlu sütunları olmayan sayfalar atlanır. Tek sayfa varsa
+    satırlar ana süreçte akış halinde okunur, parçaların temizlenmesi
+    işçilere dağıtılır. Üzerinde dönüldüğünde dosya sırasıyla
+    (kayıtlar, atlanan) çiftleri verir.
+    """
+
+    def __init__(self, filepath, workers, batch_size):
+        self.filepath = filepath
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+
+        # Sadece başlık satırlarını oku - hızlı
+        wb = load_workbook(filepath, read_only=True, data_only=True)
+        try:
+            basliklar = {}
+            satirlar = {}
+            for ws in wb.worksheets:
+                baslik = next(ws.iter_rows(max_row=1, values_only=True), None)
+                basliklar[ws.title] = _basliklari_duzenle(baslik) if baslik else []
+                satirlar[ws.title] = (ws.max_row - 1) if ws.max_row else 0
+        finally:
+            wb.close()
+
+        self.sayfalar = [
+            ad for ad, sutunlar in basliklar.items()
+            if all(col in sutunlar for col in REQUIRED_COLS)
+        ]
+        self.atlanan_sayfalar = [ad for ad in basliklar if ad not in self.sayfalar]
+
+        # Hiç geçerli sayfa yoksa ilk sayfanın başlığı eksik sütunu gösterir
+        ilk = self.sayfalar[0] if self.sayfalar else next(iter(basliklar), None)
+        self.sutunlar = list(basliklar.get(ilk, []))
+        for ad in self.sayfalar[1:]:
+            self.sutunlar += [col for col in basliklar[ad] if col not in self.sutunlar]
+        self.tahmini_satir = sum(satirlar[ad] for ad in self.sayfalar)
+
+        self._havuz = None
+        self._stream = None
+
+    def __iter__(self):
+        # spawn: arka plan thread'i olan süreçte fork güvenli değil
+        self._havuz = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+        try:
+            if len(self.sayfalar) > 1:
+                yield from self._sayfalar_paralel()
+            elif self.sayfalar:
+                yield from self._parcalar_paralel()
+        finally:
+            self.close()
+
+    def _sayfalar_paralel(self):
+        isler = [self._havuz.submit(_sayfa_oku, self.filepath, ad) for ad in self.sayfalar]
+        for is_ in isler:
+            yield is_.result()
+
+    def _parcalar_paralel(self):
+        # Tek geçerli sayfa ilk sayfa olmayabilir (ör. önde kapak sayfası)
+        self._stream = ExcelStream(self.filepath, self.batch_size, sheet=self.sayfalar[0])
+        sigorta_sutunlari = [col for col in self._stream.sutunlar if col not in REQUIRED_COLS]
+
+        # Bellek sınırlı kalsın diye işçi başına en fazla iki parça bekler
+        bekleyen = deque()
+        for parca in self._stream:
+            bekleyen.append(self._havuz.submit(clean_price_frame, parca, sigorta_sutunlari))
+            if len(bekleyen) >= self.workers * 2:
+                yield bekleyen.popleft().result()
+        while bekleyen:
+            yield bekleyen.popleft().result()
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+        if self._havuz is not None:
+            self._havuz.shutdown(wait=True, cancel_futures=True)
+            self._havuz = None
+
+
+def _anahtar(kayit):
+    return (kayit['marka'], kayit['model'], kayit['yil'])
+
+
+def _ayni_fiyatlar(eski, yeni):
+    """JSON'dan gelen dict ile yeni dict'i karşılaştır (anahtarlar str olur)"""
+    return eski == {str(sirket): fiyat for sirket, fiyat in yeni.items()}
+
+
+class VehicleWriter:
+    """Kayıtları ORM nesnesi oluşturmadan toplu yazan yazıcı
+
+    Her batch (marka, model, yil) anahtarıyla mevcut satırlarla
+    karşılaştırılır: yeni araçlar eklenir, fiyatı değişenler güncellenir,
+    aynı kalanlara dokunulmaz. Yeni satırlar insert(Vehicle.__table__) ile
+    executemany olarak, PostgreSQL'de COPY ... FROM STDIN ile yazılır;
+    güncellemeler INSERT ... ON CONFLICT DO UPDATE ile yapılır.
+    Her batch ayrı commit edilir, on_flush(işlenen_toplam) çağrılır.
+
+    sync=True ise görülen anahtarlar tutulur ve delete_missing() dosyada
+    olmayan araçları siler.
+
+    update_prices=True ise (canlı vehicles tablosuna yazarken) eklenen,
+    güncellenen ve silinen araçların vehicle_prices satırları aynı
+    transaction'da yenilenir; import sonrası tam yeniden üretim gerekmez.
+    """
+
+    COPY_COLUMNS = ('marka', 'model', 'yil', 'sigortalar', 'created_at')
+
+    def __init__(self, session, table=None, batch_size=1000, use_copy=None,
+                 on_flush=None, sync=False, update_prices=False):
+        self.session = session
+        self.table = table if table is not None else Vehicle.__table__
+        self.batch_size = batch_size
+        self.on_flush = on_flush
+        self.update_prices = update_prices
+
+        # use_copy=None: sadece PostgreSQL'de COPY kullan
+        self.dialect = session.get_bind().dialect.name
+        self.use_copy = (self.dialect == 'postgresql') if use_copy is None else use_copy
+
+        self.rows = 0
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.seconds = 0.0
+        self._tampon = []
+        self._gorulen = set() if sync else None
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def stats(self):
+        return {
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'deleted': self.deleted,
+        }
+
+    def add(self, kayitlar):
+        """Kayıtları tampona ekle, batch_size doldukça yaz"""
+        self._tampon.extend(kayitlar)
+        while len(self._tampon) >= self.batch_size:
+            batch = self._tampon[:self.batch_size]
+            del self._tampon[:self.batch_size]
+            self._yaz(batch)
+
+    def flush(self):
+        """Tamponda kalanları yaz"""
+        if self._tampon:
+            batch, self._tampon = self._tampon, []
+            self._yaz(batch)
+
+    def _yaz(self, batch):
+        baslangic = time.perf_counter()
+
+        # Aynı dosyada tekrar eden araçlarda son satır geçerli
+        son = {}
+        for kayit in batch:
+            son[_anahtar(kayit)] = kayit
+        if self._gorulen is not None:
+            self._gorulen.update(son)
+
+        t = self.table
+        mevcut = dict(
+            ((marka, model, yil), sigortalar)
+            for marka, model, yil, sigortalar in self.session.execute(
+                select(t.c.marka, t.c.model, t.c.yil, t.c.sigortalar).where(
+                    tuple_(t.c.marka, t.c.model, t.c.yil).in_(list(son))
+                )
+            )
+        )
+
+        yeni = []
+        degisen = []
+        for anahtar, kayit in son.items():
+            if anahtar not in mevcut:
+                yeni.append(kayit)
+            elif not _ayni_fiyatlar(mevcut[anahtar], kayit['sigortalar']):
+                degisen.append(kayit)
+
+        if yeni:
+            if self.use_copy:
+                self._copy(yeni)
+            else:
+                self.session.execute(insert(t), yeni)
+        if degisen:
+            self._upsert(degisen)
+        if self.update_prices and (yeni or degisen):
+            anahtarlar = [_anahtar(kayit) for kayit in yeni + degisen]
+            update_vehicle_prices(self.session, self.session.execute(
+                select(t.c.id).where(tuple_(t.c.marka, t.c.model, t.c.yil).in_(anahtarlar))
+            ).scalars())
+        self.session.commit()
+
+        self.seconds += time.perf_counter() - baslangic
+        self.rows += len(batch)
+        self.inserted += len(yeni)
+        self.updated += len(degisen)
+        self.unchanged += len(son) - len(yeni) - len(degisen)
+
+        if self.on_flush:
+            self.on_flush(self.rows)
+
+    def _upsert(self, kayitlar):
+        """Fiyatı değişen araçları güncelle"""
+        t = self.table
+        if self.dialect in ('postgresql', 'sqlite'):
+            if self.dialect == 'postgresql':
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            stmt = dialect_insert(t)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[t.c.marka, t.c.model, t.c.yil],
+                set_={'sigortalar': stmt.excluded.sigortalar},
+            )
+            self.session.execute(stmt, kayitlar)
+        else:
+            stmt = (
+                update(t)
+                .where(t.c.marka == bindparam('b_marka'))
+                .where(t.c.model == bindparam('b_model'))
+                .where(t.c.yil == bindparam('b_yil'))
+                .values(sigortalar=bindparam('b_sigortalar'))
+            )
+            self.session.execute(stmt, [
+                {'b_' + k: v for k, v in kayit.items()} for kayit in kayitlar
+            ])
+
+    def delete_missing(self):
+        """sync modunda dosyada görülmeyen araçları sil"""
+        if self._gorulen is None:
+            raise RuntimeError("delete_missing() sadece sync=True ile kullanılabilir")
+        # Hiç satır gelmediyse (yanlış dosya vb.) tabloyu boşaltma
+        if not self._gorulen:
+            return 0
+
+        t = self.table
+        silinecek = [
+            vehicle_id
+            for vehicle_id, marka, model, yil in self.session.execute(
+                select(t.c.id, t.c.marka, t.c.model, t.c.yil)
+            )
+            if (marka, model, yil) not in self._gorulen
+        ]
+        for i in range(0, len(silinecek), self.batch_size):
+            parca = silinecek[i:i + self.batch_size]
+            self.session.execute(delete(t).where(t.c.id.in_(parca)))
+            if self.update_prices:
+                update_vehicle_prices(self.session, parca)
+        self.session.commit()
+
+        self.deleted += len(silinecek)
+        return len(silinecek)
+
+    def _copy(self, batch):
+        """PostgreSQL COPY ile yaz (oturumun bağlantısı ve transaction'ı)"""
+        simdi = datetime.utcnow().isoformat()
+        buf = io.StringIO()
+        # QUOTE_ALL: boş string NULL yerine '' olarak gitsin
+        yazici = csv.writer(buf, quoting=csv.QUOTE_ALL)
+        for kayit in batch:
+            yazici.writerow([
+                kayit['marka'],
+                kayit['model'],
+                kayit['yil'],
+                json.dumps(kayit['sigortalar'], ensure_ascii=False),
+                simdi,
+            ])
+        buf.seek(0)
+
+        conn = self.session.connection()
+        tablo = conn.dialect.identifier_preparer.format_table(self.table)
+        sutunlar = ', '.join(self.COPY_COLUMNS)
+        with conn.connection.dbapi_connection.cursor() as cur:
+            cur.copy_expert(f"COPY {tablo} ({sutunlar}) FROM STDIN WITH (FORMAT csv)", buf)
+
+
+def vehicle_key_unique(engine):
+    """(marka, model, yil) üzerinde tekil index var mı (upsert için gerekli)"""
+    # Tablo değiştirme (replace) sonrası SQLite'ta index adı farklı olabilir
+    return any(
+        ix['unique'] and ix['column_names'] == ['marka', 'model', 'yil']
+        for ix in inspect(engine).get_indexes(VEHICLE_TABLE)
+    )
+
+
+def ensure_vehicle_key_unique(engine):
+    """Eski veritabanlarında idx_vehicle_lookup'ı tekil hale getir
+
+    Upsert için (marka, model, yil) tekil olmalı. Tekrarlayan satırlardan
+    en son ekleneni (en büyük id) tutulur; silinen satır sayısı döner,
+    index zaten tekilse None. Satır sildiği için uygulama açılışında değil
+    yalnız 'flask --app app migrate-vehicle-key' ve /init-db ile çalışır.
+    """
+    if vehicle_key_unique(engine):
+        return None
+
+    with engine.begin() as conn:
+        silinen = conn.execute(text(
+            "DELETE FROM vehicles WHERE id NOT IN "
+            "(SELECT MAX(id) FROM vehicles GROUP BY marka, model, yil)"
+        )).rowcount
+        conn.execute(text("DROP INDEX IF EXISTS idx_vehicle_lookup"))
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_vehicle_lookup "
+            "ON vehicles (marka, model, yil)"
+        ))
+    return silinen
+
+
+def ensure_vehicle_indexes(engine):
+    """Modelde olup eski veritabanında eksik kalan index'leri oluştur
+
+    create_all var olan tabloya index eklemez. Index'ler kolonlarına göre
+    eşleştirilir (SQLite'ta tablo değiştirme sonrası adlar farklı olabilir).
+    Oluşturulan index adlarını döndürür.
+    """
+    mevcut = {tuple(ix['column_names']) for ix in inspect(engine).get_indexes(VEHICLE_TABLE)}
+    olusan = []
+    for ix in Vehicle.__table__.indexes:
+        # Tekil anahtar ensure_vehicle_key_unique'in işi
+        if ix.unique or tuple(c.name for c in ix.columns) in mevcut:
+            continue
+        ix.create(engine, checkfirst=True)
+        olusan.append(ix.name)
+    return olusan
+
+
+# ==========================================
+# TABLO NESİLLERİ - ATOMİK LİSTE YENİLEME
+# ==========================================
+
+def _index_adi(ana_ad, tablo_adi):
+    """vehicles'ta asıl ad, diğer nesillerde tablo adıyla ekli ad"""
+    if tablo_adi == VEHICLE_TABLE:
+        return ana_ad
+    return f"{ana_ad}__{tablo_adi}"
+
+
+def create_staging_table(engine):
+    """Boş vehicles_next tablosunu vehicles ile aynı kolon ve index'lerle oluştur"""
+    kaynak = Vehicle.__table__
+    tablo = Table(STAGING_TABLE, MetaData(), *[
+        Column(
+            c.name, c.type,
+            primary_key=c.primary_key,
+            nullable=c.nullable,
+            default=c.default.arg if c.default is not None else None,
+        )
+        for c in kaynak.columns
+    ])
+
+    # SQLite index adını değiştiremiyor; önceki yenilemeden kalan adlarla
+    # çakışmasın diye zaman damgası ekle
+    damga = format(time.time_ns() // 1000, 'x')
+    for ix in kaynak.indexes:
+        Index(
+            f"{_index_adi(ix.name, STAGING_TABLE)}_{damga}",
+            *[tablo.c[c.name] for c in ix.columns],
+            unique=ix.unique,
+        )
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {STAGING_TABLE}"))
+        tablo.create(conn)
+    return tablo
+
+
+def _tabloyu_tasi(conn, eski, yeni):
+    """Tabloyu yeniden adlandır; PostgreSQL'de index'lerini de"""
+    indeksler = inspect(conn).get_indexes(eski)
+    conn.execute(text(f"ALTER TABLE {eski} RENAME TO {yeni}"))
+
+    if conn.dialect.name != 'postgresql':
+        return
+
+    # Index'i kolonlarına göre asıl Vehicle index'iyle eşleştir
+    asil = {
+        tuple(c.name for c in ix.columns): ix.name
+        for ix in Vehicle.__table__.indexes
+    }
+    for ix in indeksler:
+        ana_ad = asil.get(tuple(ix['column_names']))
+        if ana_ad:
+            conn.execute(text(
+                f'ALTER INDEX "{ix["name"]}" RENAME TO "{_index_adi(ana_ad, yeni)}"'
+            ))
+
+
+def swap_staging_table(engine, after=None):
+    """vehicles_next'i tek transaction'da vehicles yap
+
+    Mevcut vehicles, geri dönüş için vehicles_prev olarak saklanır.
+    Okuyanlar hiçbir zaman boş ya da yarım tablo görmez. after(conn)
+    verilirse takastan sonra aynı transaction'da çalışır: vehicles
+    kimliklerine bağlı tablolar (fiyatlar, FTS) yeni tabloyla birlikte
+    yayına girer.
+    """
+    baslangic = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {PREVIOUS_TABLE}"))
+        _tabloyu_tasi(conn, VEHICLE_TABLE, PREVIOUS_TABLE)
+        _tabloyu_tasi(conn, STAGING_TABLE, VEHICLE_TABLE)
+        if after is not None:
+            after(conn)
+    return time.perf_counter() - baslangic
+
+
+def rollback_vehicle_table(engine, after=None):
+    """vehicles ile vehicles_prev'i yer değiştir (bir önceki listeye dön)
+
+    after(conn): swap_staging_table'daki gibi, aynı transaction'da.
+    """
+    if not inspect(engine).has_table(PREVIOUS_TABLE):
+        return False
+
+    gecici = 'vehicles_rollback'
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {gecici}"))
+        _tabloyu_tasi(conn, VEHICLE_TABLE, gecici)
+        _tabloyu_tasi(conn, PREVIOUS_TABLE, VEHICLE_TABLE)
+        _tabloyu_tasi(conn, gecici, PREVIOUS_TABLE)
+        if after is not None:
+            after(conn)
+    return True
@@ -0,0 +1,277 @@
+"""Excel yükleme işleri için veritabanı tabanlı kuyruk
+
+İşler import_jobs tablosunda tutulur; böylece ilerleme ve durum hangi
+gunicorn işçisine sorulursa sorulsun aynıdır. Her web sürecinde bir işçi
+thread'i çalışabilir (JOB_WORKER=thread) ya da ayrı bir süreç başlatılır:
+
+    JOB_WORKER=off python jobs.py
+
+Aynı anda yalnızca bir iş işlenir. Çalışan iş düzenli kalp atışı yazar;
+kalp atışı JOB_STALE_SECONDS'tan eski kalırsa (süreç öldü / yeniden
+başladı) iş deneme hakkı varsa tekrar sıraya alınır.
+"""
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, text, update
+
+from models import db, ImportJob
+
+# PostgreSQL'de iş alma işlemlerini sıraya sokan advisory lock anahtarı
+JOB_LOCK_KEY = 7204001
+
+ACTIVE_STATUSES = ('beklemede', 'isleniyor')
+FINISHED_STATUSES = ('tamamlandi', 'hata', 'iptal')
+
+# İş kaydına kopyalanan ilerleme alanları
+PROGRESS_FIELDS = (
+    'progress', 'total', 'saved', 'inserted', 'updated', 'unchanged',
+    'deleted', 'rows_per_second',
+)
+
+
+class ImportCancelled(Exception):
+    """Çalışan iş iptal edildiğinde ilerleme callback'inden fırlatılır"""
+
+
+def enqueue_import(filepath, filename, mode, max_attempts=3):
+    """Yeni bir yükleme işini sıraya al"""
+    job = ImportJob(
+        filepath=filepath,
+        filename=filename,
+        mode=mode,
+        status='beklemede',
+        max_attempts=max_attempts,
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def requeue_stale_jobs(stale_seconds):
+    """Kalp atışı kesilmiş işleri tekrar sıraya al veya hataya düşür"""
+    sinir = datetime.utcnow() - timedelta(seconds=stale_seconds)
+    eski_isler = ImportJob.query.filter(
+        ImportJob.status == 'isleniyor',
+        ImportJob.heartbeat_at < sinir,
+    ).all()
+
+    for job in eski_isler:
+        if job.attempts < job.max_attempts:
+            job.status = 'beklemede'
+            job.error = f'İşçi yanıt vermedi ({job.worker_id}), yeniden denenecek'
+        else:
+            job.status = 'hata'
+            job.error = f'İşçi yanıt vermedi ({job.worker_id}), deneme hakkı bitti'
+            job.finished_at = datetime.utcnow()
+        print(f"♻️ İş #{job.id}: {job.error}")
+
+    if eski_isler:
+        db.session.commit()
+    return len(eski_isler)
+
+
+def claim_next_job(worker_id):
+    """Sıradaki işi al; başka bir iş işleniyorsa None döndür"""
+    t = ImportJob.__table__
+    calisan = t.alias('calisan')
+
+    with db.engine.begin() as conn:
+        # PostgreSQL'de iki işçinin aynı anda iş alması advisory lock ile engellenir,
+        # SQLite'ta yazma kilidi zaten tek
+        if conn.dialect.name == 'postgresql':
+            kilit = conn.execute(
+                text("SELECT pg_try_advisory_xact_lock(:key)"), {'key': JOB_LOCK_KEY}
+            ).scalar()
+            if not kilit:
+                return None
+
+        aday = conn.execute(
+            select(t.c.id).where(t.c.status == 'beklemede').order_by(t.c.id).limit(1)
+        ).scalar()
+        if aday is None:
+            return None
+
+        simdi = datetime.utcnow()
+        sonuc = conn.execute(
+            update(t)
+            .where(t.c.id == aday)
+            .where(t.c.status == 'beklemede')
+            .where(~select(calisan.c.id).where(calisan.c.status == 'isleniyor').exists())
+            .values(
+                status='isleniyor',
+                worker_id=worker_id,
+                started_at=simdi,
+                heartbeat_at=simdi,
+                attempts=t.c.attempts + 1,
+                cancel_requested=False,
+            )
+        )
+        if sonuc.rowcount != 1:
+            return None
+
+    return db.session.get(ImportJob, aday)
+
+
+def _is_guncelle(job_id, **values):
+    """İş satırını ORM oturumundan bağımsız güncelle (import sürerken)"""
+    t = ImportJob.__table__
+    with db.engine.begin() as conn:
+        conn.execute(update(t).where(t.c.id == job_id).values(**values))
+
+
+def run_job(app, job, process_func):
+    """Tek bir işi çalıştır, sonucunu iş kaydına yaz"""
+    job_id = job.id
+    filepath = job.filepath
+    iptal = threading.Event()
+    bitti = threading.Event()
+    # job_id: profil dosyası iş numarasıyla kaydedilsin
+    durum = {'job_id': job_id}
+
+    def kalp_atisi():
+        with app.app_context():
+            t = ImportJob.__table__
+            while not bitti.wait(app.config['JOB_HEARTBEAT_SECONDS']):
+                try:
+                    with db.engine.begin() as conn:
+                        conn.execute(
+                            update(t).where(t.c.id == job_id).values(heartbeat_at=datetime.utcnow())
+                        )
+                        if conn.execute(select(t.c.cancel_requested).where(t.c.id == job_id)).scalar():
+                            iptal.set()
+                except Exception as e:
+                    print(f"⚠️ İş #{job_id} kalp atışı yazılamadı: {str(e)}")
+
+    son_yazma = [0.0]
+
+    def ilerleme(status):
+        if iptal.is_set():
+            raise ImportCancelled('İş iptal edildi')
+        # Her batch'te değil, en fazla saniyede bir yaz
+        if time.monotonic() - son_yazma[0] < 1:
+            return
+        son_yazma[0] = time.monotonic()
+        _is_guncelle(
+            job_id,
+            heartbeat_at=datetime.utcnow(),
+            **{key: status.get(key, 0) for key in PROGRESS_FIELDS},
+        )
+
+    print(f"🛠️ İş #{job_id} başladı: {job.filename} ({job.mode}, deneme {job.attempts})")
+    threading.Thread(target=kalp_atisi, daemon=True, name=f'import-heartbeat-{job_id}').start()
+    try:
+        count, error = process_func(filepath, mode=job.mode, status=durum, on_progress=ilerleme)
+    finally:
+        bitti.set()
+
+    if iptal.is_set() and error:
+        sonuc_durumu = 'iptal'
+    elif error:
+        sonuc_durumu = 'hata'
+    else:
+        sonuc_durumu = 'tamamlandi'
+
+    _is_guncelle(
+        job_id,
+        status=sonuc_durumu,
+        error=error,
+        finished_at=datetime.utcnow(),
+        **{key: durum.get(key, 0) for key in PROGRESS_FIELDS},
+    )
+
+    # Hatalı işlerin dosyası elle yeniden deneme için saklanır
+    if sonuc_durumu != 'hata':
+        try:
+            os.remove(filepath)
+            print(f"🗑️ Geçici dosya silindi: {filepath}")
+        except OSError:
+            pass
+
+    print(f"🏁 İş #{job_id}: {sonuc_durumu} ({count} kayıt)")
+    return sonuc_durumu
+
+
+def run_worker(app, process_func, stop_event=None):
+    """Kuyruğu dinleyen işçi döngüsü"""
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    print(f"👷 Yükleme işçisi başladı: {worker_id}")
+
+    while not (stop_event and stop_event.is_set()):
+        try:
+            with app.app_context():
+                requeue_stale_jobs(app.config['JOB_STALE_SECONDS'])
+                job = claim_next_job(worker_id)
+                if job:
+                    run_job(app, job, process_func)
+                    continue
+        except Exception as e:
+            print(f"❌ İş kuyruğu hatası: {str(e)}")
+
+        if stop_event:
+            stop_event.wait(app.config['JOB_POLL_SECONDS'])
+        else:
+            time.sleep(app.config['JOB_POLL_SECONDS'])
+
+
+def start_worker_thread(app, process_func):
+    """Web sürecinin içinde arka plan işçi thread'i başlat"""
+    thread = threading.Thread(
+        target=run_worker, args=(app, process_func), daemon=True, name='import-worker'
+    )
+    thread.start()
+    return thread
+
+
+def queue_stats(recent=20):
+    """Kuyruk derinliği ve iş hacmi özetleri"""
+    sayilar = dict(
+        db.session.query(ImportJob.status, func.count(ImportJob.id))
+        .group_by(ImportJob.status)
+        .all()
+    )
+
+    simdi = datetime.utcnow()
+    en_eski = db.session.query(func.min(ImportJob.created_at)).filter(
+        ImportJob.status == 'beklemede'
+    ).scalar()
+
+    son_saat = ImportJob.query.filter(
+        ImportJob.status == 'tamamlandi',
+        ImportJob.finished_at >= simdi - timedelta(hours=1),
+    )
+    biten_son_saat = son_saat.count()
+    satir_son_saat = son_saat.with_entities(func.coalesce(func.sum(ImportJob.saved), 0)).scalar()
+
+    son_isler = ImportJob.query.filter(
+        ImportJob.status == 'tamamlandi',
+        ImportJob.started_at.isnot(None),
+        ImportJob.finished_at.isnot(None),
+    ).order_by(ImportJob.finished_at.desc()).limit(recent).all()
+    sureler = [(j.finished_at - j.started_at).total_seconds() for j in son_isler]
+    bekleme = [(j.started_at - j.created_at).total_seconds() for j in son_isler if j.created_at]
+
+    return {
+        'statuses': sayilar,
+        'queue_depth': sayilar.get('beklemede', 0),
+        'processing': sayilar.get('isleniyor', 0),
+        'oldest_waiting_seconds': (simdi - en_eski).total_seconds() if en_eski else 0,
+        'completed_last_hour': biten_son_saat,
+        'rows_last_hour': int(satir_son_saat or 0),
+        'recent_jobs': len(son_isler),
+        'avg_duration_seconds': sum(sureler) / len(sureler) if sureler else 0,
+        'avg_wait_seconds': sum(bekleme) / len(bekleme) if bekleme else 0,
+        'avg_rows_per_second': (
+            sum(j.rows_per_second or 0 for j in son_isler) / len(son_isler) if son_isler else 0
+        ),
+    }
+
+
+if __name__ == '__main__':
+    # Ayrı işçi süreci: web süreçlerinde JOB_WORKER=off olmalı
+    os.environ.setdefault('JOB_WORKER', 'off')
+    from app import app as flask_app, process_excel_sigorta
+    run_worker(flask_app, process_excel_sigorta)
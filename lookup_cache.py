@@ -0,0 +1,165 @@
+"""Marka -> yıl -> model açılır listeleri için süreç içi önbellek
+
+Veri sadece yüklemede değiştiği için marka/yıl/model ağacı her katalog
+neslinde bir kez, tek sorguyla kurulur. Fiyat içeren araç kayıtları
+boyutu sınırlı bir LRU'da tutulur. Nesil damgası değişince (yükleme,
+/clear, geri dönüş) ağaç ve LRU yeniden kurulur.
+"""
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import select
+
+from db_routing import primary
+from generation import get_generation
+from models import db, Vehicle
+from prices import vehicle_quotes
+
+
+class LRUCache:
+    """Thread-safe, boyutu sınırlı LRU"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._veri = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._veri:
+                return default
+            self._veri.move_to_end(key)
+            return self._veri[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._veri[key] = value
+            self._veri.move_to_end(key)
+            while len(self._veri) > self.maxsize:
+                self._veri.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._veri.clear()
+
+    def __len__(self):
+        return len(self._veri)
+
+
+class _CatalogTree:
+    """Tek nesillik marka/yıl/model ağacı"""
+
+    def __init__(self, satirlar):
+        # (marka, model, yil) tekil olduğundan satır sayısı = kayıt sayısı
+        self.rows = len(satirlar)
+        self.brands = []
+        self.years = {}
+        self.models = {}
+        self.models_by_year = {}
+        self.years_by_model = {}
+
+        # Satırlar veritabanı sıralamasıyla (marka, model) gelir;
+        # listeler ilk görülme sırasıyla kurulur ki collation korunsun
+        yillar = {}
+        model_yillari = {}
+        for marka, model, yil in satirlar:
+            if marka not in self.models:
+                self.brands.append(marka)
+                self.models[marka] = []
+                yillar[marka] = set()
+            if not self.models[marka] or self.models[marka][-1] != model:
+                self.models[marka].append(model)
+            yillar[marka].add(yil)
+            self.models_by_year.setdefault((marka, yil), []).append(model)
+            model_yillari.setdefault((marka, model), set()).add(yil)
+
+        self.years = {marka: sorted(y, reverse=True) for marka, y in yillar.items()}
+        self.years_by_model = {key: sorted(y, reverse=True) for key, y in model_yillari.items()}
+
+
+class CatalogCache:
+    """Dropdown API'leri için nesil bazlı önbellek"""
+
+    def __init__(self, vehicle_cache_size=10000):
+        self._nesil = None
+        self._agac = None
+        self._lock = threading.Lock()
+        self.vehicles = LRUCache(vehicle_cache_size)
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+
+    def _guncel_agac(self):
+        nesil = get_generation('catalog')
+        if nesil == self._nesil:
+            return self._agac
+
+        with self._lock, primary():
+            if nesil != self._nesil:
+                satirlar = db.session.execute(
+                    select(Vehicle.marka, Vehicle.model, Vehicle.yil)
+                    .distinct()
+                    .order_by(Vehicle.marka, Vehicle.model, Vehicle.yil)
+                ).all()
+                self._agac = _CatalogTree(satirlar)
+                self.vehicles.clear()
+                self._nesil = nesil
+                self.rebuilds += 1
+        return self._agac
+
+    def brands(self):
+        return self._guncel_agac().brands
+
+    def years(self, brand):
+        return self._guncel_agac().years.get(brand, [])
+
+    def models(self, brand):
+        return self._guncel_agac().models.get(brand, [])
+
+    def models_by_year(self, brand, yil):
+        return self._guncel_agac().models_by_year.get((brand, yil), [])
+
+    def years_by_model(self, brand, model):
+        return self._guncel_agac().years_by_model.get((brand, model), [])
+
+    def count(self):
+        """Katalogdaki kayıt sayısı (COUNT(*) yapmadan)"""
+        return self._guncel_agac().rows
+
+    def vehicle(self, marka, model, yil):
+        """Araç kaydı (to_dict) veya yoksa None"""
+        agac = self._guncel_agac()
+        key = (marka, model, yil)
+        bos = object()
+        sonuc = self.vehicles.get(key, bos)
+        if sonuc is not bos:
+            self.hits += 1
+            return sonuc
+
+        self.misses += 1
+        # Ağaçta olmayan araç için veritabanına gitme
+        if model not in agac.models_by_year.get((marka, yil), ()):
+            sonuc = None
+        else:
+            with primary():
+                vehicle = Vehicle.query.filter_by(marka=marka, model=model, yil=yil).first()
+            sonuc = vehicle.to_dict() if vehicle else None
+        self.vehicles.put(key, sonuc)
+        return sonuc
+
+    def quotes(self, marka, model, yil, limit=None):
+        """Aracın şirket fiyatları, en ucuz önce; araç yoksa None"""
+        vehicle = self.vehicle(marka, model, yil)
+        if vehicle is None:
+            return None
+        return vehicle_quotes(vehicle['id'], limit)
+
+    def stats(self):
+        return {
+            'engine': 'sql',
+            'generation': self._nesil,
+            'rebuilds': self.rebuilds,
+            'vehicle_entries': len(self.vehicles),
+            'vehicle_hits': self.hits,
+            'vehicle_misses': self.misses,
+        }
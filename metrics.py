@@ -0,0 +1,338 @@
+"""İstek, SQL ve import ölçümleri - /metrics (Prometheus metin formatı)
+
+Her istek için uç nokta bazında süre, yanıt boyutu, SQL sorgu sayısı ve
+SQL süresi histogramlara yazılır. SQL, SQLAlchemy before/after_cursor_execute
+olaylarıyla tüm engine'lerde ölçülür; istek dışındaki sorgular (import,
+kuyruk işçisi) yalnız toplam sayaçlara girer. Import aşamaları (okuma,
+temizleme, yazma, yayına alma) IngestTimer ile ölçülür.
+
+Değerler süreç içindedir: gunicorn'da her işçi kendi sayaçlarını verir,
+Prometheus tarafında instance etiketiyle toplanmalıdır.
+
+SLOW_REQUEST_MS > 0 ise bu süreyi aşan istekler en yavaş SQL'leriyle
+birlikte loglanır (ölçüm için sorgu metinleri yalnız bu durumda tutulur).
+"""
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+SURE_SINIRLARI = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BOYUT_SINIRLARI = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+SORGU_SINIRLARI = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+ASAMA_SINIRLARI = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+HAVUZ_SINIRLARI = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+
+# Yavaş istek logunda gösterilecek en fazla sorgu ve sorgu metni uzunluğu
+YAVAS_SORGU_SAYISI = 5
+SORGU_METNI_UZUNLUGU = 300
+
+
+def _etiket(deger):
+    return str(deger).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _etiketler(adlar, degerler, ek=None):
+    parcalar = [f'{ad}="{_etiket(deger)}"' for ad, deger in zip(adlar, degerler)]
+    if ek:
+        parcalar.append(ek)
+    return '{' + ','.join(parcalar) + '}' if parcalar else ''
+
+
+def _sayi(deger):
+    if deger == float('inf'):
+        return '+Inf'
+    return repr(float(deger)) if isinstance(deger, float) else str(deger)
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._degerler = {}
+        self._lock = threading.Lock()
+
+    def inc(self, value=1, *label_values):
+        with self._lock:
+            self._degerler[label_values] = self._degerler.get(label_values, 0) + value
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} counter'
+        with self._lock:
+            degerler = sorted(self._degerler.items())
+        for etiket, deger in degerler:
+            yield f'{self.name}{_etiketler(self.labels, etiket)} {_sayi(deger)}'
+
+
+class Histogram:
+    def __init__(self, name, help, buckets, labels=()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self.labels = tuple(labels)
+        # etiketler -> [kova sayaçları..., toplam, adet]
+        self._degerler = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            satir = self._degerler.get(label_values)
+            if satir is None:
+                satir = self._degerler[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for i, sinir in enumerate(self.buckets):
+                if value <= sinir:
+                    satir[i] += 1
+                    break
+            satir[-2] += value
+            satir[-1] += 1
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} histogram'
+        with self._lock:
+            degerler = sorted((k, list(v)) for k, v in self._degerler.items())
+        for etiket, satir in degerler:
+            birikimli = 0
+            for sinir, adet in zip(self.buckets, satir):
+                birikimli += adet
+                le = 'le="%s"' % _sayi(sinir)
+                yield f'{self.name}_bucket{_etiketler(self.labels, etiket, le)} {birikimli}'
+            yield f'{self.name}_sum{_etiketler(self.labels, etiket)} {_sayi(float(satir[-2]))}'
+            yield f'{self.name}_count{_etiketler(self.labels, etiket)} {satir[-1]}'
+
+
+class Gauge:
+    """Değeri ölçüm anında collect() ile okunan gösterge: etiketler -> değer"""
+
+    def __init__(self, name, help, labels=(), collect=None):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.collect = collect
+
+    def render(self):
+        yield f'# HELP {self.name} {self.help}'
+        yield f'# TYPE {self.name} gauge'
+        if self.collect is None:
+            return
+        for etiket, deger in sorted(self.collect().items()):
+            yield f'{self.name}{_etiketler(self.labels, etiket)} {_sayi(deger)}'
+
+
+class Metrics:
+    """Uygulamanın ölçüm kayıtları; init_app ile Flask'a, SQL olaylarına bağlanır"""
+
+    def __init__(self):
+        self.request_seconds = Histogram(
+            'sigorta_http_request_duration_seconds', 'İstek süresi',
+            SURE_SINIRLARI, ('endpoint', 'method', 'status'))
+        self.response_bytes = Histogram(
+            'sigorta_http_response_size_bytes', 'Yanıt gövdesi boyutu (bilinen uzunluklar)',
+            BOYUT_SINIRLARI, ('endpoint',))
+        self.request_queries = Histogram(
+            'sigorta_http_request_sql_queries', 'İstek başına SQL sorgu sayısı',
+            SORGU_SINIRLARI, ('endpoint',))
+        self.request_sql_seconds = Histogram(
+            'sigorta_http_request_sql_seconds', 'İstek başına toplam SQL süresi',
+            SURE_SINIRLARI, ('endpoint',))
+        self.slow_requests = Counter(
+            'sigorta_http_slow_requests_total', 'SLOW_REQUEST_MS eşiğini aşan istekler', ('endpoint',))
+        self.sql_queries = Counter('sigorta_sql_queries_total', 'Tüm SQL sorguları (istek dışı dahil)')
+        self.sql_seconds = Counter('sigorta_sql_seconds_total', 'Tüm SQL sorgularının toplam süresi')
+        self.ingest_stage_seconds = Histogram(
+            'sigorta_ingest_stage_seconds', 'Excel import aşama süreleri (import başına)',
+            ASAMA_SINIRLARI, ('stage',))
+        self.ingest_rows = Counter('sigorta_ingest_rows_total', 'Import ile yazılan satırlar')
+        self.pool_wait = Histogram(
+            'sigorta_db_pool_wait_seconds', 'Havuzdan bağlantı alırken beklenen süre',
+            HAVUZ_SINIRLARI, ('pool',))
+        self.pool_size = Gauge('sigorta_db_pool_size', 'Havuzun kalıcı bağlantı sayısı (pool_size)', ('pool',))
+        self.pool_checked_out = Gauge(
+            'sigorta_db_pool_checked_out', 'Şu an kullanımda olan bağlantılar', ('pool',))
+        self.pool_overflow = Gauge(
+            'sigorta_db_pool_overflow', 'pool_size üstünde açılmış bağlantılar (max_overflow)', ('pool',))
+        self.kayitlar = (
+            self.request_seconds, self.response_bytes, self.request_queries,
+            self.request_sql_seconds, self.slow_requests, self.sql_queries,
+            self.sql_seconds, self.ingest_stage_seconds, self.ingest_rows,
+            self.pool_wait, self.pool_size, self.pool_checked_out, self.pool_overflow,
+        )
+        self.slow_request_ms = 0
+        # İstek sırasında çalışan iş parçacığının SQL sayaçları
+        self._istek = threading.local()
+        self._sql_bagli = False
+
+    def init_app(self, app):
+        self.slow_request_ms = float(app.config.get('SLOW_REQUEST_MS') or 0)
+        app.before_request(self._istek_basladi)
+        app.after_request(self._istek_bitti)
+        app.teardown_request(self._istek_temizle)
+        if not self._sql_bagli:
+            # Engine sınıfına bağlanır: ingest / arama / replika engine'leri de ölçülür
+            event.listen(Engine, 'before_cursor_execute', self._sorgu_basladi)
+            event.listen(Engine, 'after_cursor_execute', self._sorgu_bitti)
+            self._sql_bagli = True
+
+    def watch_pools(self, stats):
+        """stats() -> {havuz adı: (boyut, kullanımda, taşma)}; /metrics okunurken çağrılır"""
+        def gosterge(i):
+            return lambda: {(ad,): degerler[i] for ad, degerler in stats().items()}
+        self.pool_size.collect = gosterge(0)
+        self.pool_checked_out.collect = gosterge(1)
+        self.pool_overflow.collect = gosterge(2)
+
+    def render(self):
+        satirlar = []
+        for kayit in self.kayitlar:
+            satirlar.extend(kayit.render())
+        return '\n'.join(satirlar) + '\n'
+
+    # --- İstek ---
+
+    def _istek_basladi(self):
+        self._istek.durum = {
+            'baslangic': time.perf_counter(), 'sql': 0, 'sql_sure': 0.0,
+            'sorgular': [] if self.slow_request_ms else None,
+        }
+
+    def _istek_bitti(self, response):
+        durum = getattr(self._istek, 'durum', None)
+        if durum is None:
+            return response
+        self._istek.durum = None
+        sure = time.perf_counter() - durum['baslangic']
+        endpoint = request.endpoint or 'bulunamadi'
+
+        self.request_seconds.observe(sure, endpoint, request.method, str(response.status_code))
+        self.request_queries.observe(durum['sql'], endpoint)
+        self.request_sql_seconds.observe(durum['sql_sure'], endpoint)
+        # Akış yanıtlarında (NDJSON) uzunluk bilinmez
+        if response.content_length is not None:
+            self.response_bytes.observe(response.content_length, endpoint)
+
+        if self.slow_request_ms and sure * 1000 >= self.slow_request_ms:
+            self.slow_requests.inc(1, endpoint)
+            print(f"🐢 Yavaş istek: {request.method} {request.full_path.rstrip('?')} "
+                  f"{sure * 1000:.0f} ms, {durum['sql']} SQL ({durum['sql_sure'] * 1000:.0f} ms)")
+            for sorgu_suresi, sorgu in sorted(durum['sorgular'], reverse=True)[:YAVAS_SORGU_SAYISI]:
+                print(f"   {sorgu_suresi * 1000:8.1f} ms  {sorgu}")
+        return response
+
+    def _istek_temizle(self, exc=None):
+        # after_request çalışmadıysa (işlenmemiş hata) sayaçlar sonraki isteğe taşmasın
+        self._istek.durum = None
+
+    # --- SQL ---
+
+    def _sorgu_basladi(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_metrik_baslangic', []).append(time.perf_counter())
+
+    def _sorgu_bitti(self, conn, cursor, statement, parameters, context, executemany):
+        baslangiclar = conn.info.get('_metrik_baslangic')
+        if not baslangiclar:
+            return
+        sure = time.perf_counter() - baslangiclar.pop()
+        self.sql_queries.inc()
+        self.sql_seconds.inc(sure)
+
+        durum = getattr(self._istek, 'durum', None)
+        if durum is not None:
+            durum['sql'] += 1
+            durum['sql_sure'] += sure
+            if durum['sorgular'] is not None:
+                durum['sorgular'].append((sure, ' '.join(statement.split())[:SORGU_METNI_UZUNLUGU]))
+
+
+class TimedQueuePool(QueuePool):
+    """Bağlantı alma (boş bağlantı beklemesi dahil) süresini ölçen QueuePool
+
+    SQLALCHEMY_ENGINE_OPTIONS['poolclass'] olarak verilir; pool_size /
+    max_overflow dolduğunda isteklerin ne kadar beklediği
+    sigorta_db_pool_wait_seconds'ta görünür. Etiket pool_logging_name'dir.
+    """
+
+    def _do_get(self):
+        baslangic = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.pool_wait.observe(time.perf_counter() - baslangic, self.logging_name or 'primary')
+
+
+# Aşama ölçümlerinin reset_peak ile sildiği en yüksek değer (bayt)
+_silinen_tepe = 0
+
+
+def start_memory_peak():
+    """Toplam tepe bellek ölçümünü sıfırdan başlat (tracemalloc açık olmalı)"""
+    global _silinen_tepe
+    _silinen_tepe = 0
+    tracemalloc.reset_peak()
+
+
+def reset_memory_peak():
+    """Aşama tepesi için tracemalloc tepesini sıfırla; toplam tepe korunur"""
+    global _silinen_tepe
+    _silinen_tepe = max(_silinen_tepe, tracemalloc.get_traced_memory()[1])
+    tracemalloc.reset_peak()
+
+
+def memory_peak():
+    """start_memory_peak'ten beri en yüksek izlenen bellek (bayt)"""
+    return max(_silinen_tepe, tracemalloc.get_traced_memory()[1])
+
+
+class IngestTimer:
+    """Import aşamalarının toplam süreleri
+
+    Aynı aşama batch'ler boyunca tekrar tekrar ölçülebilir; süreler toplanır
+    ve finish() ile import başına bir kez histograma yazılır. tracemalloc
+    açıksa (profilleme) aşama başına en yüksek bellek de tutulur (MB).
+    """
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.sureler = {}
+        self.bellek = {}
+
+    @contextmanager
+    def stage(self, name):
+        bellek = tracemalloc.is_tracing()
+        if bellek:
+            reset_memory_peak()
+        baslangic = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sureler[name] = self.sureler.get(name, 0.0) + time.perf_counter() - baslangic
+            if bellek:
+                tepe = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+                self.bellek[name] = round(max(self.bellek.get(name, 0.0), tepe), 2)
+
+    def timed(self, name, iterable):
+        """Yineleyiciden her öğe alma süresini aşamaya ekle (okuma / temizleme akışları)"""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    oge = next(iterator)
+                except StopIteration:
+                    return
+            yield oge
+
+    def finish(self, rows=0):
+        for ad, sure in self.sureler.items():
+            self.metrics.ingest_stage_seconds.observe(sure, ad)
+        if rows:
+            self.metrics.ingest_rows.inc(rows)
+        return {ad: round(sure, 3) for ad, sure in self.sureler.items()}
+
+
+metrics = Metrics()
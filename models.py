@@ -1,7 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from db_routing import RoutingSession
 
-db = SQLAlchemy()
+# Okuma uçları DATABASE_REPLICA_URL varsa replikaya gider (db_routing)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class Vehicle(db.Model):
     __tablename__ = 'vehicles'
@@ -16,9 +18,11 @@ class Vehicle(db.Model):
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    # Birleşik index - Hızlı arama için
+    # Birleşik tekil index - Hızlı arama ve upsert için
     __table_args__ = (
-        db.Index('idx_vehicle_lookup', 'marka', 'model', 'yil'),
+        db.Index('idx_vehicle_lookup', 'marka', 'model', 'yil', unique=True),
+        # Keyset sayfalama (created_at, id) için
+        db.Index('idx_vehicle_created', 'created_at', 'id'),
     )
     
     def to_dict(self):
@@ -34,6 +38,89 @@ class Vehicle(db.Model):
     def __repr__(self):
         return f'<Vehicle {self.marka} {self.model} {self.yil}>'
 
+class Insurer(db.Model):
+    __tablename__ = 'insurers'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Excel'deki sütun adı
+    name = db.Column(db.String(100), nullable=False, unique=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+        }
+
+    def __repr__(self):
+        return f'<Insurer {self.name}>'
+
+class VehiclePrice(db.Model):
+    """Araç x sigorta şirketi fiyatı - Vehicle.sigortalar'ın index'li kopyası
+
+    upsert / sync import'larında değişen araçlar için, replace / temizleme /
+    geri dönüşte tamamen vehicles tablosundan üretilir (bkz. prices.py).
+    vehicles tablosu replace modunda yeniden adlandırıldığı için foreign key yok.
+    """
+    __tablename__ = 'vehicle_prices'
+
+    vehicle_id = db.Column(db.Integer, primary_key=True)
+    insurer_id = db.Column(db.Integer, primary_key=True)
+    price = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        # "Y şirketinde X TL altı araçlar", şirketteki en ucuz araçlar
+        db.Index('idx_price_insurer_price', 'insurer_id', 'price', 'vehicle_id'),
+        # "Bu araç için en ucuz şirket"
+        db.Index('idx_price_vehicle_price', 'vehicle_id', 'price'),
+    )
+
+    def __repr__(self):
+        return f'<VehiclePrice {self.vehicle_id}/{self.insurer_id} {self.price}>'
+
+class CatalogStats(db.Model):
+    """Ana sayfa özeti - tek satır (id=1)
+
+    Import, temizleme ve geri dönüşten sonra yeniden hesaplanır (bkz.
+    catalog_stats.py); sayfa açılışında vehicles taranmaz.
+    """
+    __tablename__ = 'catalog_stats'
+
+    id = db.Column(db.Integer, primary_key=True)
+    total_records = db.Column(db.Integer, default=0)
+    unique_brands = db.Column(db.Integer, default=0)
+    # [{'name': 'AXA', 'vehicles': 1234}, ...] Excel sütun sırasıyla
+    insurers = db.Column(db.JSON, nullable=False, default=list)
+    last_import_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'total_records': self.total_records,
+            'unique_brands': self.unique_brands,
+            'insurers': self.insurers,
+            'last_import_at': self.last_import_at.isoformat() if self.last_import_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<CatalogStats {self.total_records}>'
+
+class DataGeneration(db.Model):
+    """Veri nesli damgası - asıl kaynak (bkz. generation.py)
+
+    CATALOG_FOLDER'ı paylaşmayan sunucular / konteynerler değişikliği
+    buradan görür; dosya damgası yalnız aynı makinedeki hızlı yoldur.
+    """
+    __tablename__ = 'data_generations'
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.String(32), nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<DataGeneration {self.name}={self.value}>'
+
 class User(db.Model):
     __tablename__ = 'users'
     
@@ -156,4 +243,64 @@ class CancelRequest(db.Model):
         }
     
     def __repr__(self):
-        return f'<CancelRequest {self.name} - {self.plate}>'
\ No newline at end of file
+        return f'<CancelRequest {self.name} - {self.plate}>'
+
+# YENİ - EXCEL YÜKLEME İŞLERİ (KUYRUK)
+class ImportJob(db.Model):
+    __tablename__ = 'import_jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    filepath = db.Column(db.String(500), nullable=False)  # uploads/ altındaki dosya
+    filename = db.Column(db.String(255))  # Kullanıcının yüklediği ad
+    mode = db.Column(db.String(20), default='upsert')  # upsert, sync, replace
+    status = db.Column(db.String(20), default='beklemede', index=True)  # beklemede, isleniyor, tamamlandi, hata, iptal
+    
+    # İlerleme
+    progress = db.Column(db.Integer, default=0)
+    total = db.Column(db.Integer, default=0)
+    saved = db.Column(db.Integer, default=0)
+    inserted = db.Column(db.Integer, default=0)
+    updated = db.Column(db.Integer, default=0)
+    unchanged = db.Column(db.Integer, default=0)
+    deleted = db.Column(db.Integer, default=0)
+    rows_per_second = db.Column(db.Integer, default=0)
+    error = db.Column(db.Text)
+    
+    # Kuyruk yönetimi
+    attempts = db.Column(db.Integer, default=0)
+    max_attempts = db.Column(db.Integer, default=3)
+    cancel_requested = db.Column(db.Boolean, default=False)
+    worker_id = db.Column(db.String(100))  # host:pid
+    heartbeat_at = db.Column(db.DateTime)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'filename': self.filename,
+            'mode': self.mode,
+            'status': self.status,
+            'is_processing': self.status == 'isleniyor',
+            'progress': self.progress,
+            'total': self.total,
+            'saved': self.saved,
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'deleted': self.deleted,
+            'rows_per_second': self.rows_per_second,
+            'error': self.error,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'cancel_requested': self.cancel_requested,
+            'worker_id': self.worker_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+    
+    def __repr__(self):
+        return f'<ImportJob {self.id} {self.status}>'
@@ -0,0 +1,113 @@
+"""Araç listesi için keyset (imleç) sayfalama ve NDJSON akışı
+
+OFFSET yerine son görülen (created_at, id) çiftinden devam edilir; derin
+sayfalar da idx_vehicle_created üzerinde tek bir aralık taramasıdır.
+İmleç istemciye opak bir metin olarak verilir.
+"""
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import select, tuple_
+
+from models import db, Vehicle
+
+VEHICLE_FIELDS = ('id', 'marka', 'model', 'yil', 'sigortalar', 'created_at')
+
+
+def parse_fields(deger):
+    """'marka,model,yil' -> ('marka', 'model', 'yil'); boşsa tüm alanlar"""
+    if not deger:
+        return VEHICLE_FIELDS
+    alanlar = tuple(dict.fromkeys(a.strip() for a in deger.split(',') if a.strip()))
+    bilinmeyen = [a for a in alanlar if a not in VEHICLE_FIELDS]
+    if bilinmeyen:
+        raise ValueError(f"Bilinmeyen alan: {', '.join(bilinmeyen)} (geçerli: {', '.join(VEHICLE_FIELDS)})")
+    return alanlar or VEHICLE_FIELDS
+
+
+def encode_cursor(created_at, vehicle_id):
+    ham = json.dumps([created_at.isoformat(), vehicle_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(ham.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """encode_cursor'ın tersi; bozuk imleçte ValueError"""
+    try:
+        ham = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, vehicle_id = json.loads(ham)
+        return datetime.fromisoformat(created_at), int(vehicle_id)
+    except Exception:
+        raise ValueError('Geçersiz imleç')
+
+
+def _sorgu(alanlar, cursor=None, geri=False):
+    """created_at, id azalan sırada; imleçten sonrası (geri=True ise öncesi)"""
+    # İmleç için created_at ve id her zaman seçilir
+    sutunlar = [Vehicle.created_at, Vehicle.id] + [
+        getattr(Vehicle, a) for a in alanlar if a not in ('created_at', 'id')
+    ]
+    sorgu = select(*sutunlar)
+    anahtar = tuple_(Vehicle.created_at, Vehicle.id)
+
+    if cursor:
+        deger = tuple_(*decode_cursor(cursor))
+        sorgu = sorgu.where(anahtar > deger if geri else anahtar < deger)
+
+    if geri:
+        return sorgu.order_by(Vehicle.created_at.asc(), Vehicle.id.asc())
+    return sorgu.order_by(Vehicle.created_at.desc(), Vehicle.id.desc())
+
+
+def _satir(row, alanlar):
+    satir = row._mapping
+    sonuc = {}
+    for alan in alanlar:
+        deger = satir[alan]
+        if alan == 'created_at':
+            deger = deger.isoformat() if deger else None
+        sonuc[alan] = deger
+    return sonuc
+
+
+def fetch_page(limit, cursor=None, before=None, fields=VEHICLE_FIELDS):
+    """Bir sayfa araç; next_cursor / prev_cursor ile
+
+    cursor: bu imleçten sonraki (daha eski) kayıtlar
+    before: bu imleçten önceki (daha yeni) kayıtlar - "Önceki" sayfa
+    """
+    geri = bool(before) and not cursor
+    # Bir fazla satır çekilir; gelirse bir sonraki sayfa vardır
+    rows = db.session.execute(
+        _sorgu(fields, before if geri else cursor, geri=geri).limit(limit + 1)
+    ).all()
+
+    devami_var = len(rows) > limit
+    rows = rows[:limit]
+    if geri:
+        rows.reverse()
+
+    def imlec(row):
+        return encode_cursor(row.created_at, row.id) if row is not None else None
+
+    ilk = rows[0] if rows else None
+    son = rows[-1] if rows else None
+    if geri:
+        next_cursor = imlec(son)
+        prev_cursor = imlec(ilk) if devami_var else None
+    else:
+        next_cursor = imlec(son) if devami_var else None
+        prev_cursor = imlec(ilk) if cursor else None
+
+    return {
+        'items': [_satir(r, fields) for r in rows],
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor,
+    }
+
+
+def stream_rows(fields=VEHICLE_FIELDS, cursor=None, batch_size=1000):
+    """Tüm araçları (imleçten itibaren) sunucu tarafı imleçle satır satır ver"""
+    sorgu = _sorgu(fields, cursor).execution_options(yield_per=batch_size)
+    for row in db.session.execute(sorgu):
+        yield _satir(row, fields)
@@ -0,0 +1,198 @@
+"""Yüklenen dosyaların SHA-256'sına göre ayrıştırma önbelleği ve tekrar tespiti
+
+Aynı Excel tekrar yüklendiğinde (başarısız deneme sonrası, çift tıklama)
+dosya yeniden okunup temizlenmez: ilk import'un temiz kayıtları
+UPLOAD_FOLDER/parsed-<anahtar>.parquet dosyasında batch batch (row group)
+saklanır ve oradan okunur. pyarrow kurulu değilse önbellek kapalıdır;
+yükleme klasöründen pickle gibi kod çalıştırabilen bir biçim okunmaz.
+Satırlar geniş tablo olarak tutulur: MARKA, MODEL, YIL ve şirket
+başına bir fiyat sütunu (fiyat yoksa NaN). En yeni PARSE_CACHE_KEEP dosya
+tutulur. Anahtar dosyanın SHA-256'sıdır; tüm sayfaları okuyan 'parallel'
+okuyucuda '-all' eki alır (diğerleri yalnız ilk sayfayı okur).
+
+Ayrıca CATALOG_FOLDER/catalog.source dosyasına son başarılı import'un
+anahtarı, modu ve ürettiği katalog nesli yazılır. Aynı dosya, katalog o
+nesildeyken (arada temizleme / geri dönüş / başka import olmadan) tekrar
+gelirse import hiç çalışmaz.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # opsiyonel - yoksa ayrıştırma önbelleği kapalı
+    pa = pq = None
+
+CACHE_PREFIX = 'parsed-'
+SOURCE_FILE = 'catalog.source'
+
+
+def records_to_frame(kayitlar, sigorta_sutunlari):
+    """clean_price_frame kayıtları -> geniş DataFrame (şema batch'ler arasında aynı)"""
+    fiyatlar = np.full((len(kayitlar), len(sigorta_sutunlari)), np.nan)
+    sira = {ad: i for i, ad in enumerate(sigorta_sutunlari)}
+    for satir, kayit in enumerate(kayitlar):
+        for sirket, fiyat in kayit['sigortalar'].items():
+            fiyatlar[satir, sira[sirket]] = fiyat
+    df = pd.DataFrame({
+        'MARKA': pd.Series([k['marka'] for k in kayitlar], dtype=object),
+        'MODEL': pd.Series([k['model'] for k in kayitlar], dtype=object),
+        'YIL': pd.Series([k['yil'] for k in kayitlar], dtype=object),
+    })
+    for i, ad in enumerate(sigorta_sutunlari):
+        df[ad] = fiyatlar[:, i]
+    return df
+
+
+def frame_to_records(df, sigorta_sutunlari):
+    """records_to_frame'in tersi"""
+    fiyatlar = df[sigorta_sutunlari].to_numpy(dtype='float64') if sigorta_sutunlari \
+        else np.empty((len(df), 0))
+    gecerli = ~np.isnan(fiyatlar)
+    tam_fiyatlar = np.where(gecerli, fiyatlar, 0).astype('int64')
+    return [
+        {
+            'marka': marka,
+            'model': model,
+            'yil': yil,
+            'sigortalar': {
+                sirket: fiyat
+                for sirket, fiyat, ok in zip(sigorta_sutunlari, fiyat_satiri, gecerli_satiri)
+                if ok
+            },
+        }
+        for marka, model, yil, fiyat_satiri, gecerli_satiri in zip(
+            df['MARKA'].tolist(), df['MODEL'].tolist(), df['YIL'].tolist(),
+            tam_fiyatlar.tolist(), gecerli.tolist(),
+        )
+    ]
+
+
+class CacheWriter:
+    """Import sırasında temiz batch'leri geçici dosyaya yazar; commit() ile yayına alır"""
+
+    def __init__(self, cache, key, sigorta_sutunlari):
+        self.cache = cache
+        self.key = key
+        self.sigorta_sutunlari = list(sigorta_sutunlari)
+        self.yol = cache.path(key)
+        self.gecici = f'{self.yol}.{os.getpid()}.tmp'
+        self.rows = 0
+        self.skipped = 0
+        self._parquet = None
+
+    def add(self, kayitlar, atlanan=0):
+        self.skipped += atlanan
+        if not kayitlar:
+            return
+        df = records_to_frame(kayitlar, self.sigorta_sutunlari)
+        self.rows += len(df)
+        tablo = pa.Table.from_pandas(df, preserve_index=False)
+        if self._parquet is None:
+            self._parquet = pq.ParquetWriter(self.gecici, tablo.schema)
+        self._parquet.write_table(tablo)
+
+    def _kapat(self):
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+
+    def commit(self):
+        self._kapat()
+        if not self.rows:
+            self.discard()
+            return
+        os.replace(self.gecici, self.yol)
+        meta = {'sigorta_sutunlari': self.sigorta_sutunlari, 'rows': self.rows, 'skipped': self.skipped}
+        with open(self.cache.meta_path(self.key), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        self.cache.prune()
+
+    def discard(self):
+        self._kapat()
+        try:
+            os.remove(self.gecici)
+        except FileNotFoundError:
+            pass
+
+
+class ParseCache:
+    def __init__(self, folder, keep=5):
+        self.folder = folder
+        self.keep = keep if pq is not None else 0
+
+    def path(self, key):
+        return os.path.join(self.folder, f'{CACHE_PREFIX}{key}.parquet')
+
+    def meta_path(self, key):
+        return os.path.join(self.folder, f'{CACHE_PREFIX}{key}.json')
+
+    def get(self, key):
+        """Önbellek özeti {sigorta_sutunlari, rows, skipped}; yoksa None"""
+        if self.keep <= 0 or not os.path.exists(self.path(key)):
+            return None
+        try:
+            with open(self.meta_path(key), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def writer(self, key, sigorta_sutunlari):
+        if self.keep <= 0:
+            return None
+        return CacheWriter(self, key, sigorta_sutunlari)
+
+    def read(self, key, meta):
+        """(kayıtlar, atlanan) batch'leri - clean_price_frame çıktısıyla aynı biçim"""
+        yol = self.path(key)
+        os.utime(yol)  # en son kullanılan en son silinir
+        sutunlar = meta['sigorta_sutunlari']
+        atlanan = meta.get('skipped', 0)
+        for batch in pq.ParquetFile(yol).iter_batches():
+            yield frame_to_records(batch.to_pandas(), sutunlar), atlanan
+            atlanan = 0
+
+    def prune(self):
+        dosyalar = sorted(
+            (e for e in os.scandir(self.folder)
+             if e.name.startswith(CACHE_PREFIX) and e.name.endswith('.parquet')),
+            key=lambda e: e.stat().st_mtime, reverse=True,
+        )
+        for eski in dosyalar[self.keep:]:
+            key = eski.name[len(CACHE_PREFIX):].rsplit('.', 1)[0]
+            for yol in (eski.path, self.meta_path(key)):
+                try:
+                    os.remove(yol)
+                except FileNotFoundError:
+                    pass
+
+
+def mark_loaded(folder, key, mode, generation, rows):
+    """Bu dosyanın import'u katalogu bu nesle getirdi"""
+    yol = os.path.join(folder, SOURCE_FILE)
+    with open(yol + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'key': key, 'mode': mode, 'generation': generation, 'rows': rows}, f)
+    os.replace(yol + '.tmp', yol)
+
+
+def already_loaded(folder, key, mode, generation):
+    """Aynı dosya bu modla katalogda bir şey değiştirmeyecekse kaynak bilgisi, yoksa None
+
+    Katalog hâlâ o import'un neslindeyse: upsert her zaman etkisizdir;
+    sync / replace ise ancak önceki import da listeyi tamamen dosyaya
+    eşitlediyse (sync / replace) etkisizdir.
+    """
+    try:
+        with open(os.path.join(folder, SOURCE_FILE), encoding='utf-8') as f:
+            kaynak = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if kaynak.get('key') != key or kaynak.get('generation') != generation:
+        return None
+    if mode != 'upsert' and kaynak.get('mode') not in ('sync', 'replace'):
+        return None
+    return kaynak
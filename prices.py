@@ -0,0 +1,246 @@
+"""Araç x sigorta şirketi fiyat tablosu (insurers, vehicle_prices)
+
+Fiyatların asıl kaynağı Vehicle.sigortalar JSON kolonudur. upsert / sync
+import'larında VehicleWriter yalnız eklenen, güncellenen ve silinen
+araçların fiyatlarını batch'le aynı transaction'da yazar
+(update_vehicle_prices). replace ve geri dönüşte vehicle_prices tablo
+takasıyla aynı transaction'da, temizlemeden sonra ayrı bir transaction'da
+vehicles'tan yeniden üretilir (refill / rebuild_vehicle_prices). İkisi de veritabanında json_each ile yapılır,
+satırlar Python'a taşınmaz. Fiyat sorguları JSON açmadan index'lerden
+cevaplanır.
+"""
+import json
+
+from sqlalchemy import and_, bindparam, exists, func, select, text, tuple_
+
+from models import db, Insurer, Vehicle, VehiclePrice
+
+# Import'ta kaydedilmemiş şirketler (eski veriler) ilk görüldükleri sırayla eklenir
+_YENI_SIRKETLER = {
+    'postgresql': """
+        INSERT INTO insurers (name, created_at)
+        SELECT e.key, CURRENT_TIMESTAMP
+        FROM vehicles v
+        CROSS JOIN LATERAL json_each(v.sigortalar::json) WITH ORDINALITY AS e(key, value, sira)
+        WHERE NOT EXISTS (SELECT 1 FROM insurers i WHERE i.name = e.key)
+        GROUP BY e.key
+        ORDER BY MIN(v.id), MIN(e.sira)
+    """,
+    'sqlite': """
+        INSERT INTO insurers (name, created_at)
+        SELECT e.key, CURRENT_TIMESTAMP
+        FROM vehicles v, json_each(v.sigortalar) e
+        WHERE NOT EXISTS (SELECT 1 FROM insurers i WHERE i.name = e.key)
+        GROUP BY e.key
+        ORDER BY MIN(v.id), MIN(e.id)
+    """,
+}
+
+_FIYATLAR = {
+    'postgresql': """
+        INSERT INTO vehicle_prices (vehicle_id, insurer_id, price)
+        SELECT v.id, i.id, round((e.value::text)::numeric)::integer
+        FROM vehicles v
+        CROSS JOIN LATERAL json_each(v.sigortalar::json) AS e
+        JOIN insurers i ON i.name = e.key
+        WHERE json_typeof(e.value) = 'number'
+    """,
+    'sqlite': """
+        INSERT INTO vehicle_prices (vehicle_id, insurer_id, price)
+        SELECT v.id, i.id, CAST(round(e.value) AS INTEGER)
+        FROM vehicles v, json_each(v.sigortalar) e
+        JOIN insurers i ON i.name = e.key
+        WHERE e.type IN ('integer', 'real')
+    """,
+}
+
+
+def register_insurers(engine, names):
+    """Excel'deki şirket sütunlarını sütun sırasıyla kaydet (eksik olanları)"""
+    t = Insurer.__table__
+    with engine.begin() as conn:
+        mevcut = set(conn.execute(select(t.c.name)).scalars())
+        yeni = [{'name': ad} for ad in dict.fromkeys(names) if ad not in mevcut]
+        if yeni:
+            conn.execute(t.insert(), yeni)
+    return len(yeni)
+
+
+def rebuild_vehicle_prices(engine):
+    """vehicle_prices'ı vehicles'tan yeniden üret, yazılan satır sayısını döndür"""
+    with engine.begin() as conn:
+        return refill_vehicle_prices(conn)
+
+
+def refill_vehicle_prices(conn):
+    """rebuild_vehicle_prices, çağıranın transaction'ında
+
+    Tablo takasında (replace / geri dönüş) takasla aynı transaction'da
+    çalışır: okuyanlar yeni vehicles'ı eski kimliklerin fiyatlarıyla görmez.
+    """
+    dialect = conn.dialect.name
+    if dialect not in _FIYATLAR:
+        # json_each olmayan veritabanı: satır satır Python'da aç
+        conn.execute(VehiclePrice.__table__.delete())
+        return _write_python(conn, select(Vehicle.id, Vehicle.sigortalar).order_by(Vehicle.id))
+
+    conn.execute(text(_YENI_SIRKETLER[dialect]))
+    # DELETE (TRUNCATE değil): okuyanlar commit'e kadar eski fiyatları görür
+    conn.execute(VehiclePrice.__table__.delete())
+    return conn.execute(text(_FIYATLAR[dialect])).rowcount
+
+
+def update_vehicle_prices(session, vehicle_ids):
+    """Yalnız verilen araçların fiyatlarını vehicles'tan yeniden yaz
+
+    Çağıranın transaction'ında çalışır (import batch'iyle birlikte commit
+    edilir). vehicles'ta artık olmayan araçların fiyatları yalnız silinir.
+    """
+    vehicle_ids = list(vehicle_ids)
+    if not vehicle_ids:
+        return 0
+    t_fiyat = VehiclePrice.__table__
+    session.execute(t_fiyat.delete().where(t_fiyat.c.vehicle_id.in_(vehicle_ids)))
+
+    dialect = session.get_bind().dialect.name
+    if dialect not in _FIYATLAR:
+        return _write_python(session, select(Vehicle.id, Vehicle.sigortalar).where(Vehicle.id.in_(vehicle_ids)))
+    sorgu = text(_FIYATLAR[dialect] + " AND v.id IN :ids").bindparams(bindparam('ids', expanding=True))
+    return session.execute(sorgu, {'ids': vehicle_ids}).rowcount
+
+
+def _write_python(conn, sorgu, batch_size=5000):
+    """sorgu'nun (id, sigortalar) satırlarının fiyatlarını ekle"""
+    t_sirket = Insurer.__table__
+    t_fiyat = VehiclePrice.__table__
+    sirketler = dict(conn.execute(select(t_sirket.c.name, t_sirket.c.id)).all())
+    yazilan = 0
+    satirlar = conn.execute(sorgu)
+    while True:
+        parca = satirlar.fetchmany(batch_size)
+        if not parca:
+            break
+        kayitlar = []
+        for vehicle_id, sigortalar in parca:
+            for ad, fiyat in (sigortalar or {}).items():
+                if not isinstance(fiyat, (int, float)):
+                    continue
+                if ad not in sirketler:
+                    sirketler[ad] = conn.execute(
+                        t_sirket.insert().values(name=ad)
+                    ).inserted_primary_key[0]
+                kayitlar.append({'vehicle_id': vehicle_id, 'insurer_id': sirketler[ad], 'price': round(fiyat)})
+        if kayitlar:
+            conn.execute(t_fiyat.insert(), kayitlar)
+            yazilan += len(kayitlar)
+    return yazilan
+
+
+def prices_missing():
+    """Araç var ama fiyat tablosu boş mu (ilk kurulum / eski veritabanı)"""
+    return (
+        db.session.query(Vehicle.id).limit(1).first() is not None
+        and db.session.query(VehiclePrice.vehicle_id).limit(1).first() is None
+    )
+
+
+def active_insurers():
+    """En az bir fiyatı olan şirket adları, Excel sütun sırasıyla"""
+    return db.session.execute(
+        select(Insurer.name)
+        .where(exists().where(VehiclePrice.insurer_id == Insurer.id))
+        .order_by(Insurer.id)
+    ).scalars().all()
+
+
+def vehicle_quotes(vehicle_id, limit=None):
+    """Aracın şirket fiyatları, en ucuz önce"""
+    sorgu = (
+        select(Insurer.name, VehiclePrice.price)
+        .join(Insurer, Insurer.id == VehiclePrice.insurer_id)
+        .where(VehiclePrice.vehicle_id == vehicle_id)
+        .order_by(VehiclePrice.price, Insurer.id)
+    )
+    if limit:
+        sorgu = sorgu.limit(limit)
+    return [{'sigorta': ad, 'fiyat': fiyat} for ad, fiyat in db.session.execute(sorgu)]
+
+
+def vehicles_in_price_range(insurer, min_price=None, max_price=None, marka=None, limit=100):
+    """Şirketin fiyatı aralıkta olan araçlar, ucuzdan pahalıya
+
+    Şirket bulunamazsa None döner.
+    """
+    insurer_id = db.session.execute(
+        select(Insurer.id).where(Insurer.name == insurer)
+    ).scalar()
+    if insurer_id is None:
+        return None
+
+    sorgu = (
+        select(Vehicle.id, Vehicle.marka, Vehicle.model, Vehicle.yil, VehiclePrice.price)
+        .join(Vehicle, Vehicle.id == VehiclePrice.vehicle_id)
+        .where(VehiclePrice.insurer_id == insurer_id)
+    )
+    if min_price is not None:
+        sorgu = sorgu.where(VehiclePrice.price >= min_price)
+    if max_price is not None:
+        sorgu = sorgu.where(VehiclePrice.price <= max_price)
+    if marka:
+        sorgu = sorgu.where(Vehicle.marka == marka)
+    sorgu = sorgu.order_by(VehiclePrice.price, VehiclePrice.vehicle_id).limit(limit)
+
+    return [
+        {'id': vehicle_id, 'marka': m, 'model': model, 'yil': yil, 'fiyat': fiyat}
+        for vehicle_id, m, model, yil, fiyat in db.session.execute(sorgu)
+    ]
+
+
+def batch_vehicle_quotes(anahtarlar, sigortalar=None):
+    """Birden çok aracın fiyatları tek sorguda
+
+    anahtarlar: (marka, model, yil) listesi. Araçlar bileşik idx_vehicle_lookup
+    üzerinden bulunur (PostgreSQL: (marka, model, yil) IN (...), SQLite:
+    json_each ile join), fiyatlar aynı sorguda vehicle_prices'tan gelir.
+    sigortalar verilirse yalnız o şirketler döner.
+    Dönen: {(marka, model, yil): (vehicle_id, [(şirket, fiyat), ...] ucuzdan pahalıya)}
+    """
+    anahtarlar = list(dict.fromkeys(anahtarlar))
+    if not anahtarlar:
+        return {}
+
+    fiyat_kosulu = VehiclePrice.vehicle_id == Vehicle.id
+    if sigortalar:
+        fiyat_kosulu &= VehiclePrice.insurer_id.in_(
+            select(Insurer.id).where(Insurer.name.in_(sigortalar)).scalar_subquery().correlate(None)
+        )
+    sorgu = select(Vehicle.id, Vehicle.marka, Vehicle.model, Vehicle.yil, Insurer.name, VehiclePrice.price)
+
+    # @read_only uçta sorgu replikaya gider; SQL onun diyalektine göre seçilmeli
+    if db.session.get_bind().dialect.name == 'sqlite':
+        # SQLite satır değeri IN listesinde index kullanmıyor (tam tarama); anahtarlar
+        # json_each tablosu olarak verilir, her biri idx_vehicle_lookup'ta aranır
+        anahtar = func.json_each(json.dumps(anahtarlar)).table_valued('value').alias('anahtar')
+        sorgu = sorgu.select_from(anahtar).join(Vehicle, and_(
+            Vehicle.marka == func.json_extract(anahtar.c.value, '$[0]'),
+            Vehicle.model == func.json_extract(anahtar.c.value, '$[1]'),
+            Vehicle.yil == func.json_extract(anahtar.c.value, '$[2]'),
+        ))
+    else:
+        sorgu = sorgu.select_from(Vehicle).where(
+            tuple_(Vehicle.marka, Vehicle.model, Vehicle.yil).in_(anahtarlar)
+        )
+
+    sorgu = (
+        sorgu
+        .outerjoin(VehiclePrice, fiyat_kosulu)
+        .outerjoin(Insurer, Insurer.id == VehiclePrice.insurer_id)
+        .order_by(Vehicle.id, VehiclePrice.price, Insurer.id)
+    )
+
+    sonuc = {}
+    for vehicle_id, marka, model, yil, ad, fiyat in db.session.execute(sorgu):
+        _, teklifler = sonuc.setdefault((marka, model, yil), (vehicle_id, []))
+        if ad is not None:
+            teklifler.append((ad, fiyat))
+    return sonuc
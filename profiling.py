@@ -0,0 +1,216 @@
+"""İsteğe bağlı profilleme: Excel import'ları ve tek tek istekler
+
+PROFILE_IMPORTS açıkken her import cProfile altında çalışır ve tracemalloc
+ile aşama başına (read, clean, write, ...) en yüksek bellek kaydedilir.
+PROFILE_REQUESTS açıkken PROFILE_HEADER başlığı ile gelen istekler
+profillenir; yanıtta X-Profile-Id döner.
+
+Her profil PROFILE_FOLDER altında iki dosyadır: <id>.prof (pstats; snakeviz
+vb. ile açılır) ve <id>.json (özet: süre, en pahalı fonksiyonlar, aşamalar).
+En yeni PROFILE_KEEP profil tutulur. cProfile yalnız çağıran iş
+parçacığını ölçer; parallel okuyucunun işçi süreçleri profile girmez.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+from flask import g, request
+
+from metrics import memory_peak, start_memory_peak
+
+# Özette gösterilecek en pahalı fonksiyon sayısı
+OZET_FONKSIYON_SAYISI = 30
+
+_GECERLI_ID = re.compile(r'^[A-Za-z0-9_.-]+$')
+
+
+def valid_profile_id(profile_id):
+    return bool(_GECERLI_ID.match(profile_id or '')) and '..' not in profile_id
+
+
+def _fonksiyon_adi(fonksiyon):
+    dosya, satir, ad = fonksiyon
+    if dosya == '~':
+        return ad
+    return f'{os.path.basename(dosya)}:{satir}({ad})'
+
+
+def top_functions(stats, limit=OZET_FONKSIYON_SAYISI):
+    """pstats.Stats -> kümülatif süreye göre en pahalı fonksiyonlar"""
+    satirlar = []
+    for fonksiyon, (cc, nc, tt, ct, _) in stats.stats.items():
+        satirlar.append({
+            'function': _fonksiyon_adi(fonksiyon),
+            'calls': nc,
+            'tottime': round(tt, 4),
+            'cumtime': round(ct, 4),
+        })
+    satirlar.sort(key=lambda s: s['cumtime'], reverse=True)
+    return satirlar[:limit]
+
+
+class Profiler:
+    def __init__(self, folder='profiles', keep=50):
+        self.folder = folder
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.folder = app.config['PROFILE_FOLDER']
+        self.keep = app.config['PROFILE_KEEP']
+        self.header = app.config['PROFILE_HEADER']
+        self.requests_enabled = app.config['PROFILE_REQUESTS']
+        if self.requests_enabled:
+            app.before_request(self._istek_basladi)
+            app.after_request(self._istek_bitti)
+            app.teardown_request(self._istek_temizle)
+
+    def path(self, profile_id, ext):
+        return os.path.join(self.folder, f'{profile_id}.{ext}')
+
+    @contextmanager
+    def profile(self, profile_id, kind, name, memory=False):
+        """Blok cProfile altında çalışır; yield edilen sözlüğe özet bilgisi eklenebilir
+
+        memory=True: tracemalloc açılır (zaten açık değilse), toplam tepe
+        bellek özete yazılır. Aşama tepe değerlerini IngestTimer toplar;
+        aşamaların tepe sıfırlaması toplam tepeyi düşürmez.
+
+        Python 3.12+ süreçte aynı anda tek profilleyiciye izin verir; başka
+        bir profil (ör. import sürerken istek) açıksa blok profilsiz çalışır,
+        meta['skipped'] True olur ve dosya yazılmaz.
+        """
+        meta = {
+            'id': profile_id, 'kind': kind, 'name': name,
+            'started_at': datetime.utcnow().isoformat(),
+        }
+        bellek_acildi = memory and not tracemalloc.is_tracing()
+        if bellek_acildi:
+            tracemalloc.start()
+        if memory:
+            start_memory_peak()
+
+        profil = cProfile.Profile()
+        baslangic = time.perf_counter()
+        try:
+            profil.enable()
+        except ValueError as e:
+            print(f"⚠️ Profil atlandı ({profile_id}): {str(e)}")
+            profil = None
+            meta['skipped'] = True
+        try:
+            yield meta
+        finally:
+            if profil is not None:
+                profil.disable()
+            meta['duration'] = round(time.perf_counter() - baslangic, 4)
+            if memory:
+                meta['peak_memory_mb'] = round(memory_peak() / 1024 / 1024, 2)
+            if bellek_acildi:
+                tracemalloc.stop()
+            if profil is not None:
+                try:
+                    self._kaydet(profil, meta)
+                except Exception as e:
+                    print(f"⚠️ Profil kaydedilemedi ({profile_id}): {str(e)}")
+
+    def _kaydet(self, profil, meta):
+        os.makedirs(self.folder, exist_ok=True)
+        stats = pstats.Stats(profil)
+        meta['top'] = top_functions(stats)
+
+        profile_id = meta['id']
+        stats.dump_stats(self.path(profile_id, 'prof'))
+        gecici = self.path(profile_id, 'json.tmp')
+        with open(gecici, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(gecici, self.path(profile_id, 'json'))
+        print(f"🔬 Profil kaydedildi: {profile_id} ({meta['duration']} sn)")
+        self._eskileri_sil()
+
+    def _eskileri_sil(self):
+        with self._lock:
+            ozetler = sorted(
+                (e for e in os.scandir(self.folder) if e.name.endswith('.json')),
+                key=lambda e: e.stat().st_mtime, reverse=True,
+            )
+            for eski in ozetler[self.keep:]:
+                for ext in ('json', 'prof'):
+                    try:
+                        os.remove(self.path(eski.name[:-len('.json')], ext))
+                    except FileNotFoundError:
+                        pass
+
+    def recent(self):
+        """Kayıtlı profil özetleri (en pahalı fonksiyonlar hariç), en yeni önce"""
+        if not os.path.isdir(self.folder):
+            return []
+        ozetler = []
+        for e in os.scandir(self.folder):
+            if not e.name.endswith('.json'):
+                continue
+            try:
+                with open(e.path, encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            meta.pop('top', None)
+            ozetler.append(meta)
+        ozetler.sort(key=lambda m: m.get('started_at') or '', reverse=True)
+        return ozetler
+
+    def get(self, profile_id):
+        """Profil özeti; yoksa None"""
+        if not valid_profile_id(profile_id):
+            return None
+        try:
+            with open(self.path(profile_id, 'json'), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def text_report(self, profile_id, sort='cumulative', limit=60):
+        """pstats metin raporu; profil yoksa None"""
+        yol = self.path(profile_id, 'prof')
+        if not valid_profile_id(profile_id) or not os.path.exists(yol):
+            return None
+        cikti = io.StringIO()
+        pstats.Stats(yol, stream=cikti).sort_stats(sort).print_stats(limit)
+        return cikti.getvalue()
+
+    # --- İstek profilleme ---
+
+    def _istek_basladi(self):
+        if not request.headers.get(self.header):
+            return
+        profile_id = f"req-{datetime.utcnow():%Y%m%d%H%M%S%f}-{request.endpoint or 'bulunamadi'}"
+        baglam = self.profile(profile_id, 'request', f'{request.method} {request.full_path.rstrip("?")}')
+        g._profil = (baglam, baglam.__enter__())
+
+    def _istek_bitti(self, response):
+        profil = g.pop('_profil', None)
+        if profil is None:
+            return response
+        baglam, meta = profil
+        meta['status'] = response.status_code
+        baglam.__exit__(None, None, None)
+        if not meta.get('skipped'):
+            response.headers['X-Profile-Id'] = meta['id']
+        return response
+
+    def _istek_temizle(self, exc=None):
+        # after_request çalışmadıysa profilleyici iş parçacığında açık kalmasın
+        profil = g.pop('_profil', None)
+        if profil is not None:
+            profil[0].__exit__(None, None, None)
+
+
+profiler = Profiler()
@@ -0,0 +1,437 @@
+"""Sütunlu bellek içi teklif motoru (QUOTE_ENGINE=columnar)
+
+Katalog her nesilde bir kez NumPy dizilerine yüklenir:
+
+- marka / model / yıl: metin tablosu + satır başına int32 kod
+- satırlar (marka, model, yil) veritabanı sıralamasıyla dizilir; böylece
+  her marka ardışık bir dilimdir ve marka_sinir ile bulunur
+- fiyatlar: satır x şirket yoğun int32 matris (0 = fiyat yok)
+
+CatalogCache ile aynı arayüzü sunar (brands, years, models, vehicle, ...)
+ve ek olarak quotes(); dropdown ve teklif endpoint'leri veritabanına hiç
+gitmeden mikrosaniyelerde cevaplanır. Nesil değişince yeniden yüklenir.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+
+from db_routing import primary
+from generation import get_generation
+from lookup_cache import LRUCache
+from models import db, Insurer, Vehicle, VehiclePrice
+from prices import active_insurers
+
+_EPOCH = datetime(1970, 1, 1)
+_NAT = np.iinfo('int64').min
+
+
+def _ham_sorgu(sorgu, sutunlar):
+    """Parametresiz sorguyu DBAPI imleciyle çalıştır (satır başına Row nesnesi yok)"""
+    conn = db.session.connection()
+    imlec = conn.connection.dbapi_connection.cursor()
+    try:
+        imlec.execute(str(sorgu.compile(conn)))
+        return pd.DataFrame.from_records(imlec.fetchall(), columns=sutunlar)
+    finally:
+        imlec.close()
+
+
+class StringTable:
+    """Metin tablosu: UTF-8 blob + ofsetler, arama için sıralı sabit genişlikli dizi
+
+    Kod -> metin blob diliminden, metin -> kod sıralı 'S' dizisinde
+    np.searchsorted ile bulunur. Python dict'i kurulmadığından mmap ile
+    açılan tablo süreç başına ek bellek istemez.
+    """
+
+    PARTS = ('blob', 'ofset', 'anahtar', 'sira')
+
+    def __init__(self, blob, ofset, anahtar, sira):
+        self.blob = blob
+        self.ofset = ofset
+        # anahtar[i] = sira[i] kodlu metnin baytları (sıralı)
+        self.anahtar = anahtar
+        self.sira = sira
+
+    @classmethod
+    def from_strings(cls, metinler):
+        kodlanmis = [str(m).encode('utf-8') for m in metinler]
+        ofset = np.zeros(len(kodlanmis) + 1, dtype='int64')
+        ofset[1:] = np.cumsum([len(k) for k in kodlanmis], dtype='int64')
+        blob = np.frombuffer(b''.join(kodlanmis), dtype='uint8').copy()
+        sira = np.array(sorted(range(len(kodlanmis)), key=kodlanmis.__getitem__), dtype='int32')
+        genislik = max((len(k) for k in kodlanmis), default=1) or 1
+        anahtar = np.array([kodlanmis[i] for i in sira], dtype=f'S{genislik}')
+        return cls(blob, ofset, anahtar, sira)
+
+    def __len__(self):
+        return len(self.ofset) - 1
+
+    def _bayt(self, i):
+        return self.blob[self.ofset[i]:self.ofset[i + 1]].tobytes()
+
+    def __getitem__(self, i):
+        return self._bayt(int(i)).decode('utf-8')
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def get(self, metin):
+        """Metnin kodu veya None"""
+        aranan = str(metin).encode('utf-8')
+        if not aranan or len(aranan) > self.anahtar.dtype.itemsize:
+            return None
+        i = int(np.searchsorted(self.anahtar, aranan))
+        if i < len(self.anahtar) and self.anahtar[i] == aranan:
+            return int(self.sira[i])
+        return None
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, parca).nbytes for parca in self.PARTS)
+
+
+class CatalogArrays:
+    """Tek nesillik katalog dizileri"""
+
+    # Dosyaya yazılan diziler ve metin tabloları (save / load)
+    ARRAYS = ('ids', 'marka_kod', 'model_kod', 'yil_kod', 'created_at', 'fiyatlar', 'marka_sinir')
+    TABLES = ('markalar', 'modeller', 'yillar')
+    FORMAT_VERSION = 1
+
+    def __init__(self, ids, marka_kod, model_kod, yil_kod, created_at, fiyatlar,
+                 markalar, modeller, yillar, sigortalar, marka_sinir=None):
+        self.ids = ids
+        self.marka_kod = marka_kod
+        self.model_kod = model_kod
+        self.yil_kod = yil_kod
+        self.created_at = created_at
+        self.fiyatlar = fiyatlar
+        self.markalar = markalar
+        self.modeller = modeller
+        self.yillar = yillar
+        self.sigortalar = sigortalar
+
+        # marka_kod sıralı: i. markanın satırları [sinir[i], sinir[i+1])
+        if marka_sinir is None:
+            marka_sinir = np.searchsorted(marka_kod, np.arange(len(markalar) + 1))
+        self.marka_sinir = marka_sinir
+
+    @classmethod
+    def from_database(cls):
+        df = _ham_sorgu(
+            select(Vehicle.id, Vehicle.marka, Vehicle.model, Vehicle.yil, Vehicle.created_at)
+            .order_by(Vehicle.marka, Vehicle.model, Vehicle.yil),
+            ['id', 'marka', 'model', 'yil', 'created_at'],
+        )
+
+        # factorize ilk görülme sırasını korur = veritabanı sıralaması
+        marka_kod, markalar = pd.factorize(df['marka'])
+        model_kod, modeller = pd.factorize(df['model'])
+        yil_kod, yillar = pd.factorize(df['yil'])
+        ids = df['id'].to_numpy('int64')
+        created_at = (
+            pd.to_datetime(df['created_at']).to_numpy('datetime64[us]').astype('int64')
+            if len(df) else np.empty(0, dtype='int64')
+        )
+
+        sigortalar = active_insurers()
+        sutun = {
+            insurer_id: i
+            for i, (insurer_id,) in enumerate(db.session.execute(
+                select(Insurer.id).where(Insurer.name.in_(sigortalar)).order_by(Insurer.id)
+            ))
+        }
+        fiyatlar = np.zeros((len(df), len(sigortalar)), dtype='int32')
+        if len(df) and sigortalar:
+            p = _ham_sorgu(
+                select(VehiclePrice.vehicle_id, VehiclePrice.insurer_id, VehiclePrice.price),
+                ['vehicle_id', 'insurer_id', 'price'],
+            )
+            satir = pd.Index(ids).get_indexer(p['vehicle_id'])
+            kolon = p['insurer_id'].map(sutun).fillna(-1).to_numpy('int64')
+            gecerli = (satir >= 0) & (kolon >= 0)
+            fiyatlar[satir[gecerli], kolon[gecerli]] = p['price'].to_numpy()[gecerli]
+
+        return cls(
+            ids, marka_kod.astype('int32'), model_kod.astype('int32'), yil_kod.astype('int32'),
+            created_at, fiyatlar,
+            StringTable.from_strings(markalar), StringTable.from_strings(modeller),
+            StringTable.from_strings(yillar), sigortalar,
+        )
+
+    def save(self, hedef):
+        """Dizileri hedef klasöre .npy olarak yaz (klasör yeni olmalı)"""
+        os.makedirs(hedef)
+        for ad in self.ARRAYS:
+            np.save(os.path.join(hedef, f'{ad}.npy'), getattr(self, ad))
+        for ad in self.TABLES:
+            tablo = getattr(self, ad)
+            for parca in StringTable.PARTS:
+                np.save(os.path.join(hedef, f'{ad}_{parca}.npy'), getattr(tablo, parca))
+        # meta.json en son yazılır: varsa dosya takımı tamamdır
+        with open(os.path.join(hedef, 'meta.json'), 'w') as f:
+            json.dump({
+                'format': self.FORMAT_VERSION,
+                'rows': len(self),
+                'sigortalar': self.sigortalar,
+            }, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, kaynak, mmap_mode='r'):
+        """save() çıktısını aç; mmap_mode='r' ile diziler sayfa önbelleğinden paylaşılır"""
+        with open(os.path.join(kaynak, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta.get('format') != cls.FORMAT_VERSION:
+            raise ValueError(f"Desteklenmeyen katalog biçimi: {meta.get('format')}")
+
+        def oku(ad):
+            dizi = np.load(os.path.join(kaynak, f'{ad}.npy'), mmap_mode=mmap_mode)
+            # np.memmap alt sınıfı her dilimde ek iş yapar; aynı tampona düz ndarray görünümü
+            return dizi.view(np.ndarray) if isinstance(dizi, np.memmap) else dizi
+
+        diziler = {ad: oku(ad) for ad in cls.ARRAYS}
+        tablolar = {
+            ad: StringTable(*(oku(f'{ad}_{parca}') for parca in StringTable.PARTS))
+            for ad in cls.TABLES
+        }
+        return cls(sigortalar=meta['sigortalar'], **diziler, **tablolar)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self):
+        return (
+            sum(getattr(self, ad).nbytes for ad in self.ARRAYS)
+            + sum(getattr(self, ad).nbytes for ad in self.TABLES)
+        )
+
+    def brand_slice(self, marka):
+        kod = self.markalar.get(marka)
+        if kod is None:
+            return None
+        return int(self.marka_sinir[kod]), int(self.marka_sinir[kod + 1])
+
+    def row(self, marka, model, yil):
+        """(marka, model, yil) satır numarası veya None"""
+        dilim = self.brand_slice(marka)
+        if dilim is None:
+            return None
+        model_kod = self.modeller.get(model)
+        yil_kod = self.yillar.get(yil)
+        if model_kod is None or yil_kod is None:
+            return None
+        s, e = dilim
+        bulunan = np.flatnonzero((self.model_kod[s:e] == model_kod) & (self.yil_kod[s:e] == yil_kod))
+        return s + int(bulunan[0]) if len(bulunan) else None
+
+    def row_dict(self, i):
+        """Satırı Vehicle.to_dict() biçiminde ver"""
+        fiyat_satiri = self.fiyatlar[i]
+        created_at = int(self.created_at[i])
+        return {
+            'id': int(self.ids[i]),
+            'marka': self.markalar[self.marka_kod[i]],
+            'model': self.modeller[self.model_kod[i]],
+            'yil': self.yillar[self.yil_kod[i]],
+            'sigortalar': {
+                ad: int(fiyat) for ad, fiyat in zip(self.sigortalar, fiyat_satiri.tolist()) if fiyat
+            },
+            'created_at': (
+                (_EPOCH + timedelta(microseconds=created_at)).isoformat() if created_at != _NAT else None
+            ),
+        }
+
+    def row_quotes(self, i, limit=None):
+        fiyat_satiri = self.fiyatlar[i]
+        dolu = np.flatnonzero(fiyat_satiri)
+        # Eşit fiyatta şirket sırası korunur (stable)
+        sira = dolu[np.argsort(fiyat_satiri[dolu], kind='stable')]
+        if limit:
+            sira = sira[:limit]
+        return [{'sigorta': self.sigortalar[j], 'fiyat': int(fiyat_satiri[j])} for j in sira]
+
+
+ARRAYS_PREFIX = 'arrays-'
+
+
+def arrays_path(folder, generation):
+    return os.path.join(folder, f'{ARRAYS_PREFIX}{generation}')
+
+
+def export_catalog_arrays(folder, generation, veri=None):
+    """Neslin dizilerini folder altına yaz (zaten varsa dokunma), yolu döndür
+
+    Önce geçici klasöre yazılır, sonra tek rename ile yerine konur; aynı
+    anda yazan başka bir süreç önce bitirdiyse bizimki atılır.
+    """
+    hedef = arrays_path(folder, generation)
+    if os.path.exists(os.path.join(hedef, 'meta.json')):
+        return hedef
+
+    os.makedirs(folder, exist_ok=True)
+    gecici = f'{hedef}.{os.getpid()}.{threading.get_ident()}.tmp'
+    shutil.rmtree(gecici, ignore_errors=True)
+    (veri if veri is not None else CatalogArrays.from_database()).save(gecici)
+    try:
+        os.rename(gecici, hedef)
+    except OSError:
+        shutil.rmtree(gecici, ignore_errors=True)
+
+    _eski_dizileri_sil(folder, generation)
+    return hedef
+
+
+def _eski_dizileri_sil(folder, generation):
+    """Diğer nesillerin klasörlerini sil
+
+    Açık mmap'ler etkilenmez: dosya silinse de eşlenmiş sayfalar süreç
+    onları bırakana kadar geçerli kalır. Yazılmakta olan .tmp klasörlere
+    dokunulmaz.
+    """
+    guncel = os.path.basename(arrays_path(folder, generation))
+    for ad in os.listdir(folder):
+        if ad.startswith(ARRAYS_PREFIX) and ad != guncel and not ad.endswith('.tmp'):
+            shutil.rmtree(os.path.join(folder, ad), ignore_errors=True)
+
+
+class QuoteEngine:
+    """CatalogCache yerine geçen sütunlu motor
+
+    folder verilirse diziler orada nesil başına .npy dosyası olarak tutulur
+    ve salt okunur mmap ile açılır: tüm gunicorn işçileri aynı sayfa
+    önbelleğini paylaşır, işçi sayısı arttıkça bellek artmaz. Dosya yoksa
+    ilk işçi veritabanından üretip yazar.
+    """
+
+    def __init__(self, memo_size=10000, folder=None):
+        self.memo_size = memo_size
+        self.folder = folder
+        # (nesil, diziler, dropdown sonuçları) tek seferde değişir; eski nesille
+        # hesaplanan sonuç yeni neslin önbelleğine yazılamaz
+        self._durum = (None, None, None)
+        self._lock = threading.Lock()
+        self.reloads = 0
+        self.load_seconds = 0.0
+
+    def _guncel(self):
+        nesil = get_generation('catalog')
+        durum = self._durum
+        if durum[0] == nesil:
+            return durum
+
+        with self._lock, primary():
+            if self._durum[0] != nesil:
+                baslangic = time.perf_counter()
+                # Dropdown önbelleği bilinmeyen markalarla şişmesin diye sınırlı
+                self._durum = (nesil, self._yukle(nesil), LRUCache(self.memo_size))
+                self.reloads += 1
+                self.load_seconds = time.perf_counter() - baslangic
+        return self._durum
+
+    def _yukle(self, nesil):
+        if not self.folder:
+            return CatalogArrays.from_database()
+
+        yol = arrays_path(self.folder, nesil)
+        try:
+            return CatalogArrays.load(yol)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Katalog dizileri açılamadı, veritabanından yükleniyor: {str(e)}")
+
+        veri = CatalogArrays.from_database()
+        try:
+            return CatalogArrays.load(export_catalog_arrays(self.folder, nesil, veri))
+        except Exception as e:
+            print(f"⚠️ Katalog dizileri yazılamadı, bellekte tutuluyor: {str(e)}")
+            return veri
+
+    def _veri(self):
+        return self._guncel()[1]
+
+    def _hatirla(self, key, hesapla):
+        _, veri, memo = self._guncel()
+        sonuc = memo.get(key)
+        if sonuc is None:
+            sonuc = hesapla(veri)
+            memo.put(key, sonuc)
+        return sonuc
+
+    def count(self):
+        return len(self._veri())
+
+    def brands(self):
+        return self._hatirla(('brands',), lambda v: list(v.markalar))
+
+    def models(self, brand):
+        def hesapla(v):
+            dilim = v.brand_slice(brand)
+            if dilim is None:
+                return []
+            return [v.modeller[k] for k in pd.unique(v.model_kod[dilim[0]:dilim[1]])]
+        return self._hatirla(('models', brand), hesapla)
+
+    def years(self, brand):
+        def hesapla(v):
+            dilim = v.brand_slice(brand)
+            if dilim is None:
+                return []
+            return sorted({v.yillar[k] for k in np.unique(v.yil_kod[dilim[0]:dilim[1]])}, reverse=True)
+        return self._hatirla(('years', brand), hesapla)
+
+    def models_by_year(self, brand, yil):
+        def hesapla(v):
+            dilim = v.brand_slice(brand)
+            yil_kod = v.yillar.get(yil)
+            if dilim is None or yil_kod is None:
+                return []
+            s, e = dilim
+            satirlar = s + np.flatnonzero(v.yil_kod[s:e] == yil_kod)
+            return [v.modeller[k] for k in v.model_kod[satirlar]]
+        return self._hatirla(('models_by_year', brand, yil), hesapla)
+
+    def years_by_model(self, brand, model):
+        def hesapla(v):
+            dilim = v.brand_slice(brand)
+            model_kod = v.modeller.get(model)
+            if dilim is None or model_kod is None:
+                return []
+            s, e = dilim
+            satirlar = s + np.flatnonzero(v.model_kod[s:e] == model_kod)
+            return sorted({v.yillar[k] for k in v.yil_kod[satirlar]}, reverse=True)
+        return self._hatirla(('years_by_model', brand, model), hesapla)
+
+    def vehicle(self, marka, model, yil):
+        """Araç kaydı (to_dict) veya yoksa None"""
+        veri = self._veri()
+        i = veri.row(marka, model, yil)
+        return veri.row_dict(i) if i is not None else None
+
+    def quotes(self, marka, model, yil, limit=None):
+        """Aracın şirket fiyatları, en ucuz önce; araç yoksa None"""
+        veri = self._veri()
+        i = veri.row(marka, model, yil)
+        return veri.row_quotes(i, limit) if i is not None else None
+
+    def stats(self):
+        nesil, veri, memo = self._durum
+        return {
+            'engine': 'columnar',
+            'generation': nesil,
+            'reloads': self.reloads,
+            'load_seconds': round(self.load_seconds, 3),
+            'rows': len(veri) if veri is not None else 0,
+            'array_bytes': veri.nbytes if veri is not None else 0,
+            'mmap': bool(self.folder),
+            'memo_entries': len(memo) if memo is not None else 0,
+        }
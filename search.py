@@ -0,0 +1,346 @@
+"""Araç arama: PostgreSQL'de pg_trgm, SQLite'ta FTS5, bellekte önek ağacı
+
+Arama metni "marka model yil" birleşimidir ve Türkçe harfler katlanarak
+karşılaştırılır (İ/I/ı/i -> i, Ş/ş -> s, ...). Böylece "FIAT", "fiat",
+"ŞAHİN" ve "sahin" aynı şekilde eşleşir; Python ve SQL tarafı aynı
+katlamayı kullanır.
+
+- PostgreSQL: ifade üzerinde gin_trgm_ops index'i, similarity() ile sıralama
+- SQLite: vehicles_fts (FTS5, trigram) tablosu, bm25 ile sıralama; her
+  import / temizlemeden sonra, replace / geri dönüşte tablo takasıyla aynı
+  transaction'da yeniden doldurulur
+- Veritabanı desteği yoksa ya da sorgunun hiçbir kelimesi trigram için
+  yeterince uzun değilse (3 harf) nesil başına kurulan önek ağacı
+
+Eşleşme kuralı her arka uçta aynıdır: her sorgu kelimesi metindeki bir
+kelimenin başıdır ("bmw 3" 320i'yi bulur, "mw" BMW'yi bulmaz). Trigram
+index'leri yalnız adayları daraltır, kelime başı koşulu LIKE ile aranır.
+"""
+import re
+import threading
+import time
+
+from sqlalchemy import inspect, select, text
+
+from db_routing import primary
+from generation import get_generation
+from models import db, Vehicle
+
+TR_HARFLER = 'İIıŞşĞğÜüÖöÇç'
+TR_KARSILIK = 'iiissgguuoocc'
+_TR_TABLO = str.maketrans(TR_HARFLER, TR_KARSILIK)
+
+FTS_TABLE = 'vehicles_fts'
+TRGM_INDEX = 'idx_vehicle_search_trgm'
+
+# Trigram index'in kullanabildiği en kısa kelime
+MIN_TRIGRAM = 3
+
+# PostgreSQL'de index ifadesi ile sorgu ifadesi birebir aynı olmalı
+_PG_IFADE = (
+    f"lower(translate(marka || ' ' || model || ' ' || yil, "
+    f"'{TR_HARFLER}', '{TR_KARSILIK}'))"
+)
+
+
+def fold_turkish(metin):
+    """Türkçe harfleri ASCII karşılığına katla, küçük harfe çevir"""
+    return str(metin).translate(_TR_TABLO).lower()
+
+
+def _kelimeler(metin):
+    return [k for k in re.split(r'\s+', fold_turkish(metin)) if k]
+
+
+def _like_kacir(kelime):
+    return kelime.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+# ==========================================
+# VERİTABANI INDEX'LERİ
+# ==========================================
+
+def _fts5_var(conn):
+    try:
+        conn.exec_driver_sql("CREATE VIRTUAL TABLE temp._fts5_deneme USING fts5(a, tokenize='trigram')")
+        conn.exec_driver_sql("DROP TABLE temp._fts5_deneme")
+        return True
+    except Exception:
+        return False
+
+
+def _pg_trgm_index(engine, tablo):
+    with engine.begin() as conn:
+        try:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        except Exception as e:
+            print(f"⚠️ pg_trgm kurulamadı, önek ağacı kullanılacak: {str(e)}")
+            return False
+
+    with engine.begin() as conn:
+        mevcut = conn.execute(text(
+            "SELECT 1 FROM pg_indexes WHERE tablename = :t AND indexdef LIKE '%gin_trgm_ops%'"
+        ), {'t': tablo}).first()
+        if mevcut:
+            return True
+        # Index adları şema genelinde tekil - önceki nesillerle çakışmasın
+        ad = TRGM_INDEX if tablo == 'vehicles' else f"{TRGM_INDEX}__{tablo}"
+        ad = f"{ad}_{format(time.time_ns() // 1000, 'x')}"
+        conn.execute(text(f'CREATE INDEX "{ad}" ON {tablo} USING gin (({_PG_IFADE}) gin_trgm_ops)'))
+        print(f"🔎 Trigram index oluşturuldu: {ad}")
+    return True
+
+
+def _fts_doldur(conn, batch_size=5000):
+    if not _fts5_var(conn):
+        print("⚠️ SQLite FTS5 (trigram) yok, önek ağacı kullanılacak")
+        return False
+    conn.exec_driver_sql(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(metin, tokenize='trigram')"
+    )
+    conn.exec_driver_sql(f"DELETE FROM {FTS_TABLE}")
+
+    satirlar = conn.execute(select(Vehicle.id, Vehicle.marka, Vehicle.model, Vehicle.yil))
+    while True:
+        parca = satirlar.fetchmany(batch_size)
+        if not parca:
+            break
+        conn.exec_driver_sql(
+            f"INSERT INTO {FTS_TABLE}(rowid, metin) VALUES (?, ?)",
+            [(r.id, fold_turkish(f"{r.marka} {r.model} {r.yil}")) for r in parca],
+        )
+    return True
+
+
+def sync_search_index(engine, table='vehicles', only_if_missing=False):
+    """Arama index'ini tablo ile eşitle; kullanılabilirse True
+
+    PostgreSQL'de ifade index'i veriyi kendisi takip eder, yalnızca yoksa
+    oluşturulur (replace modunda yeni tabloya takas öncesi). SQLite'ta FTS
+    tablosu vehicles'tan yeniden doldurulur.
+    """
+    dialect = engine.dialect.name
+    if dialect == 'postgresql':
+        return _pg_trgm_index(engine, table)
+    if dialect == 'sqlite':
+        # FTS kimlikleri vehicles'a bağlı; takas sonrası yeniden doldurulur
+        if table != 'vehicles':
+            return False
+        if only_if_missing and inspect(engine).has_table(FTS_TABLE):
+            return True
+        with engine.begin() as conn:
+            return _fts_doldur(conn)
+    return False
+
+
+def refill_search_index(conn):
+    """SQLite FTS tablosunu çağıranın transaction'ında vehicles'tan doldur
+
+    Tablo takasıyla aynı transaction'da çalışır: FTS rowid'leri hiçbir an
+    başka bir vehicles neslinin kimliklerini göstermez. PostgreSQL'de
+    ifade index'i tabloyla birlikte taşındığı için bir şey yapılmaz.
+    """
+    if conn.dialect.name != 'sqlite':
+        return False
+    return _fts_doldur(conn)
+
+
+# ==========================================
+# ÖNEK AĞACI
+# ==========================================
+
+class PrefixTrie:
+    """Kelime önekinden araç kimliklerine
+
+    Düğümler iç içe dict; None anahtarı o kelimeyle biten kayıtları tutar.
+    Her kelime bir kez eklenir, kayıtlar kelime listesinde toplanır.
+    """
+
+    def __init__(self):
+        self.kok = {}
+        self.kelime_sayisi = 0
+
+    def add(self, kelime, vehicle_id):
+        dugum = self.kok
+        for harf in kelime:
+            dugum = dugum.setdefault(harf, {})
+        if None not in dugum:
+            dugum[None] = []
+            self.kelime_sayisi += 1
+        dugum[None].append(vehicle_id)
+
+    def ids(self, onek):
+        """Öneki taşıyan kelimelere sahip tüm kayıtlar"""
+        dugum = self.kok
+        for harf in onek:
+            dugum = dugum.get(harf)
+            if dugum is None:
+                return set()
+
+        sonuc = set()
+        yigin = [dugum]
+        while yigin:
+            d = yigin.pop()
+            for harf, alt in d.items():
+                if harf is None:
+                    sonuc.update(alt)
+                else:
+                    yigin.append(alt)
+        return sonuc
+
+
+class _TrieIndex:
+    """Tek nesillik önek ağacı
+
+    Ağaç (marka, model) grupları üzerine kurulur - aynı modelin yılları tek
+    kayıt olarak girer, yıllar gruba eklenen kelimelerdir. Sıralama için
+    grup kelimeleri ve model adı uzunluğu tutulur.
+    """
+
+    def __init__(self, satirlar):
+        self.trie = PrefixTrie()
+        gruplar = {}
+        self.gruplar = []
+        for vehicle_id, marka, model, yil in satirlar:
+            gid = gruplar.get((marka, model))
+            if gid is None:
+                gid = gruplar[(marka, model)] = len(self.gruplar)
+                marka_k = _kelimeler(marka)
+                tum = frozenset(marka_k + _kelimeler(model))
+                self.gruplar.append((frozenset(marka_k), tum, len(model), []))
+                for kelime in tum:
+                    self.trie.add(kelime, gid)
+            yil_k = fold_turkish(yil)
+            grup_yillari = self.gruplar[gid][3]
+            if all(y != yil_k for _, y in grup_yillari):
+                self.trie.add(yil_k, gid)
+            grup_yillari.append((vehicle_id, yil_k))
+
+    def search(self, kelimeler, limit):
+        adaylar = None
+        for kelime in sorted(kelimeler, key=len, reverse=True):
+            gidler = self.trie.ids(kelime)
+            adaylar = gidler if adaylar is None else adaylar & gidler
+            if not adaylar:
+                return []
+
+        sonuclar = []
+        for gid in adaylar:
+            marka_k, tum, model_uzunluk, yillar = self.gruplar[gid]
+            # Marka/model kelimesiyle eşleşmeyenler yılla eşleşmeli
+            yil_kelimeleri = [k for k in kelimeler if not any(w.startswith(k) for w in tum)]
+            tam = sum(1 for k in kelimeler if k in tum)
+            markada = sum(1 for k in kelimeler if any(m.startswith(k) for m in marka_k))
+            for vehicle_id, yil in yillar:
+                if all(yil.startswith(k) for k in yil_kelimeleri):
+                    # Tam kelime eşleşmesi > markada eşleşme > kısa model adı > yeni yıl
+                    sonuclar.append((-tam - (yil in kelimeler), -markada, model_uzunluk, yil, vehicle_id))
+
+        sonuclar.sort(key=lambda p: (p[0], p[1], p[2], _ters(p[3]), p[4]))
+        return [p[4] for p in sonuclar[:limit]]
+
+
+def _ters(yil):
+    """Yeni yıllar önce gelsin diye sıralama anahtarı"""
+    return tuple(-ord(h) for h in yil)
+
+
+# ==========================================
+# ARAMA
+# ==========================================
+
+class VehicleSearch:
+    """Arama arka ucunu seçer, sonuç kimliklerini sıralı döndürür
+
+    backend: 'auto' (veritabanı index'i varsa o, yoksa önek ağacı) veya 'trie'
+    """
+
+    def __init__(self, backend='auto'):
+        self.backend = backend
+        self._db_backend = None
+        self._nesil = None
+        self._index = None
+        self._lock = threading.Lock()
+
+    def _veritabani_arka_ucu(self):
+        if self._db_backend is None:
+            dialect = db.engine.dialect.name
+            sonuc = False
+            try:
+                if dialect == 'postgresql':
+                    sonuc = db.session.execute(text(
+                        "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"
+                    )).first() is not None and 'trgm'
+                elif dialect == 'sqlite':
+                    sonuc = inspect(db.engine).has_table(FTS_TABLE) and 'fts5'
+            except Exception as e:
+                db.session.rollback()
+                print(f"⚠️ Arama index'i kontrol edilemedi: {str(e)}")
+            self._db_backend = sonuc or ''
+        return self._db_backend
+
+    def _trie(self):
+        nesil = get_generation('catalog')
+        if nesil == self._nesil:
+            return self._index
+        with self._lock, primary():
+            if nesil != self._nesil:
+                satirlar = db.session.execute(
+                    select(Vehicle.id, Vehicle.marka, Vehicle.model, Vehicle.yil)
+                ).all()
+                self._index = _TrieIndex(satirlar)
+                self._nesil = nesil
+        return self._index
+
+    def backend_for(self, kelimeler):
+        """Bu sorguyu hangi arka ucun cevaplayacağı (sonuç kümesi aynı, hız farklı)"""
+        if self.backend == 'trie' or max(len(k) for k in kelimeler) < MIN_TRIGRAM:
+            return 'trie'
+        return self._veritabani_arka_ucu() or 'trie'
+
+    def search_ids(self, q, limit=100):
+        """Sorguya uyan araç kimlikleri, en iyi eşleşme önce"""
+        kelimeler = _kelimeler(q)
+        if not kelimeler:
+            return []
+
+        arka_uc = self.backend_for(kelimeler)
+        # Kelime başı: metnin başında ya da boşluktan sonra
+        onekler = {f'k{i}': f'% {_like_kacir(k)}%' for i, k in enumerate(kelimeler)}
+
+        if arka_uc == 'trgm':
+            kosullar = ' AND '.join(
+                f"({_PG_IFADE} LIKE :b{i} OR {_PG_IFADE} LIKE :k{i})" for i in range(len(kelimeler))
+            )
+            params = dict(onekler)
+            params.update({f'b{i}': f'{_like_kacir(k)}%' for i, k in enumerate(kelimeler)})
+            params.update(q=' '.join(kelimeler), limit=limit)
+            sorgu = text(
+                f"SELECT id FROM vehicles WHERE {kosullar} "
+                f"ORDER BY similarity({_PG_IFADE}, :q) DESC, id LIMIT :limit"
+            )
+            return list(db.session.execute(sorgu, params).scalars())
+
+        if arka_uc == 'fts5':
+            # MATCH yalnız trigram'a yetecek kelimelerle adayları bulur
+            eslesme = ' AND '.join(
+                '"{}"'.format(k.replace('"', '""')) for k in kelimeler if len(k) >= MIN_TRIGRAM
+            )
+            kosullar = ' AND '.join(
+                f"(' ' || metin) LIKE :k{i} ESCAPE '\\'" for i in range(len(kelimeler))
+            )
+            sorgu = text(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :m AND {kosullar} "
+                f"ORDER BY rank LIMIT :limit"
+            )
+            return list(db.session.execute(sorgu, {'m': eslesme, 'limit': limit, **onekler}).scalars())
+
+        return self._trie().search(kelimeler, limit)
+
+    def search(self, q, limit=100):
+        """Sorguya uyan araçlar (to_dict), en iyi eşleşme önce"""
+        ids = self.search_ids(q, limit)
+        if not ids:
+            return []
+        araclar = {v.id: v for v in Vehicle.query.filter(Vehicle.id.in_(ids))}
+        return [araclar[i].to_dict() for i in ids if i in araclar]
@@ -0,0 +1,83 @@
+"""Testler geçici SQLite veritabanı ve klasörlerle çalışır
+
+app modül seviyesinde yapılandırıldığı için ortam değişkenleri içe
+aktarmadan önce ayarlanır; her test boş katalogla başlar.
+"""
+import json
+import os
+import sys
+import tempfile
+
+import pandas as pd
+import pytest
+from sqlalchemy import inspect, text
+
+KLASOR = tempfile.mkdtemp(prefix='sigorta-test-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(KLASOR, 'test.db')}"
+os.environ['CATALOG_FOLDER'] = os.path.join(KLASOR, 'catalog')
+os.environ['JOB_WORKER'] = 'off'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module  # noqa: E402
+from ingest import PREVIOUS_TABLE, STAGING_TABLE  # noqa: E402
+from models import db  # noqa: E402
+from parse_cache import SOURCE_FILE  # noqa: E402
+
+SIRKETLER = ['AXA', 'HDI']
+
+
+@pytest.fixture
+def uygulama(tmp_path):
+    app_module.parse_cache.folder = str(tmp_path)
+    with app_module.app.app_context():
+        for tablo in (PREVIOUS_TABLE, STAGING_TABLE):
+            if inspect(db.engine).has_table(tablo):
+                db.session.execute(text(f"DROP TABLE {tablo}"))
+        db.session.execute(text("DELETE FROM vehicles"))
+        db.session.execute(text("DELETE FROM vehicle_prices"))
+        db.session.commit()
+        try:
+            os.remove(os.path.join(app_module.app.config['CATALOG_FOLDER'], SOURCE_FILE))
+        except FileNotFoundError:
+            pass
+        yield app_module
+
+
+@pytest.fixture
+def yukle(uygulama, tmp_path):
+    """satirlar: (marka, model, yil, axa, hdi) listesi -> import durumu"""
+    sayac = iter(range(1000))
+
+    def _yukle(satirlar, mode='upsert', reader='pandas'):
+        df = pd.DataFrame(satirlar, columns=['MARKA', 'MODEL', 'YIL'] + SIRKETLER)
+        yol = tmp_path / f'liste-{next(sayac)}.xlsx'
+        df.to_excel(yol, index=False)
+        status = {}
+        uygulama.process_excel_sigorta(str(yol), reader=reader, mode=mode, status=status)
+        return status
+
+    return _yukle
+
+
+def araclar():
+    return {
+        (marka, model, yil): json.loads(sigortalar)
+        for marka, model, yil, sigortalar in db.session.execute(
+            text("SELECT marka, model, yil, sigortalar FROM vehicles")
+        )
+    }
+
+
+def fiyatlar():
+    """(marka, model, yil, şirket) -> fiyat, vehicle_prices'tan"""
+    return {
+        (marka, model, yil, sirket): fiyat
+        for marka, model, yil, sirket, fiyat in db.session.execute(text(
+            "SELECT v.marka, v.model, v.yil, i.name, p.price FROM vehicle_prices p "
+            "JOIN vehicles v ON v.id = p.vehicle_id JOIN insurers i ON i.id = p.insurer_id"
+        ))
+    }
+
+
+def fiyat_sayisi():
+    return db.session.execute(text("SELECT COUNT(*) FROM vehicle_prices")).scalar()
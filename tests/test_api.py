@@ -0,0 +1,21 @@
+"""API giriş doğrulaması"""
+import pytest
+
+
+@pytest.mark.parametrize('sigortalar', [[{}], ['AXA', 1], 'AXA'])
+def test_quotes_batch_gecersiz_sigortalar_400(uygulama, sigortalar):
+    yanit = uygulama.app.test_client().post('/api/quotes/batch', json={
+        'vehicles': [['FIAT', 'EGEA', '2020']],
+        'sigortalar': sigortalar,
+    })
+    assert yanit.status_code == 400
+
+
+def test_quotes_batch_sigorta_filtresi(uygulama, yukle):
+    yukle([('FIAT', 'EGEA', 2020, 500000, 520000)])
+    yanit = uygulama.app.test_client().post('/api/quotes/batch', json={
+        'vehicles': [{'marka': 'FIAT', 'model': 'EGEA', 'yil': 2020}],
+        'sigortalar': ['HDI'],
+    })
+    assert yanit.status_code == 200
+    assert yanit.get_json()['results'][0]['sigortalar'] == {'HDI': 520000}
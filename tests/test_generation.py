@@ -0,0 +1,31 @@
+"""Nesil damgası veritabanında: CATALOG_FOLDER'ı paylaşmayan süreçler de görür"""
+from sqlalchemy import text
+
+import generation
+from generation import bump_generation, get_generation
+from models import db
+
+
+def test_baska_sunucunun_yeniledigi_nesil_gorulur(uygulama, monkeypatch):
+    once = get_generation('catalog')
+    # Başka bir makine: veritabanı değişti, bu makinenin damga dosyası değişmedi
+    with db.engine.begin() as conn:
+        conn.execute(text("UPDATE data_generations SET value = 'baskasunucu' WHERE name = 'catalog'"))
+    assert get_generation('catalog') == once
+
+    # Kontrol aralığı dolunca veritabanından okunur
+    monkeypatch.setitem(uygulama.app.config, 'GENERATION_CHECK_SECONDS', 0)
+    assert get_generation('catalog') == 'baskasunucu'
+
+
+def test_ayni_makinede_hemen_gorulur(uygulama):
+    once = get_generation('catalog')
+    yeni = bump_generation('catalog')
+    assert yeni != once
+    assert get_generation('catalog') == yeni
+
+
+def test_eski_dosya_damgasi_tasinir(uygulama):
+    with open(generation._damga_yolu('eski'), 'w') as f:
+        f.write('dosyadaki')
+    assert get_generation('eski') == 'dosyadaki'
@@ -0,0 +1,117 @@
+"""upsert / sync / replace yazma sonuçları, tablo takası ve geri dönüş"""
+import pytest
+from sqlalchemy import text
+
+from conftest import araclar, fiyat_sayisi, fiyatlar
+from generation import get_generation
+from models import db
+
+LISTE = [
+    ('FIAT', 'EGEA', 2020, 500000, 520000),
+    ('FIAT', 'EGEA', 2021, 550000, None),
+    ('RENAULT', 'CLIO', 2020, 450000, 460000),
+]
+
+
+def test_upsert_sayilari(yukle):
+    status = yukle(LISTE)
+    assert (status['inserted'], status['updated'], status['unchanged'], status['deleted']) == (3, 0, 0, 0)
+
+    ikinci = [
+        ('FIAT', 'EGEA', 2020, 505000, 520000),  # fiyat değişti
+        ('FIAT', 'EGEA', 2021, 550000, None),
+        ('RENAULT', 'CLIO', 2020, 450000, 460000),
+        ('TOFAS', 'SAHIN', 1995, 90000, 95000),  # yeni
+    ]
+    status = yukle(ikinci)
+    assert (status['inserted'], status['updated'], status['unchanged'], status['deleted']) == (1, 1, 2, 0)
+    assert araclar()[('FIAT', 'EGEA', '2020')] == {'AXA': 505000, 'HDI': 520000}
+    # Fiyatlar batch'lerle yazıldı: tam yeniden üretimle aynı
+    assert fiyatlar()[('FIAT', 'EGEA', '2020', 'AXA')] == 505000
+    assert fiyat_sayisi() == 7
+
+
+def test_upsert_dosyadaki_tekrarda_son_satir(yukle):
+    status = yukle(LISTE + [('FIAT', 'EGEA', 2020, 1, 2)])
+    assert status['inserted'] == 3
+    assert araclar()[('FIAT', 'EGEA', '2020')] == {'AXA': 1, 'HDI': 2}
+
+
+def test_sync_eksikleri_siler(yukle):
+    yukle(LISTE)
+    status = yukle(LISTE[:2], mode='sync')
+    assert (status['inserted'], status['updated'], status['unchanged'], status['deleted']) == (0, 0, 2, 1)
+    assert set(araclar()) == {('FIAT', 'EGEA', '2020'), ('FIAT', 'EGEA', '2021')}
+    assert not any(anahtar[0] == 'RENAULT' for anahtar in fiyatlar())
+    assert fiyat_sayisi() == 3
+
+
+def test_replace_ve_geri_donus(uygulama, yukle):
+    yukle(LISTE, mode='replace')
+    status = yukle([('TOFAS', 'SAHIN', 1995, 90000, 95000)], mode='replace')
+    assert status['inserted'] == 1
+    assert set(araclar()) == {('TOFAS', 'SAHIN', '1995')}
+    # Fiyatlar yeni tablonun kimlikleriyle, eski listenin fiyatı kalmadı
+    assert fiyatlar() == {('TOFAS', 'SAHIN', '1995', 'AXA'): 90000, ('TOFAS', 'SAHIN', '1995', 'HDI'): 95000}
+
+    yanit = uygulama.app.test_client().post('/admin/rollback-import')
+    assert yanit.status_code == 302
+    db.session.expire_all()
+    assert set(araclar()) == {(m, mo, str(y)) for m, mo, y, *_ in LISTE}
+    assert fiyat_sayisi() == 5
+    assert fiyatlar()[('RENAULT', 'CLIO', '2020', 'HDI')] == 460000
+
+
+def test_replace_arama_index_yeni_tabloyla(uygulama, yukle):
+    yukle(LISTE, mode='replace')
+    yukle([('TOFAS', 'SAHIN', 1995, 90000, 95000)], mode='replace')
+    if not db.session.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE name = 'vehicles_fts'"
+    )).first():
+        pytest.skip('SQLite FTS5 yok')
+    sonuc = db.session.execute(text(
+        "SELECT v.marka FROM vehicles_fts f JOIN vehicles v ON v.id = f.rowid"
+    )).scalars().all()
+    assert sonuc == ['TOFAS']
+
+
+def test_eksik_sutun_nesli_degistirmez(uygulama, tmp_path):
+    import pandas as pd
+    yol = tmp_path / 'eksik.xlsx'
+    pd.DataFrame({'MARKA': ['FIAT'], 'YIL': [2020], 'AXA': [1]}).to_excel(yol, index=False)
+    once = get_generation('catalog')
+    adet, hata = uygulama.process_excel_sigorta(str(yol), reader='pandas', mode='upsert', status={})
+    assert adet == 0 and 'MODEL' in hata
+    assert get_generation('catalog') == once
+
+
+@pytest.mark.parametrize('reader', ['pandas', 'stream'])
+def test_okuyucular_ayni_sonuc(yukle, reader):
+    status = yukle(LISTE, reader=reader)
+    assert status['inserted'] == 3
+    assert fiyat_sayisi() == 5
+
+
+def test_sondaki_bos_basliklar_sirket_sayilmaz(uygulama, tmp_path):
+    from openpyxl import Workbook
+    from openpyxl.styles import Font
+
+    import pandas as pd
+    from ingest import ExcelStream
+
+    kitap = Workbook()
+    sayfa = kitap.active
+    sayfa.append(['MARKA', 'MODEL', 'YIL', 'AXA', None, None])
+    sayfa.append(['FIAT', 'EGEA', 2020, 500000, None, None])
+    # Biçimli boş hücreler sayfa boyutunu genişletir (openpyxl onları None olarak okur)
+    sayfa['F1'].font = sayfa['F2'].font = Font(bold=True)
+    yol = tmp_path / 'bos-sutunlu.xlsx'
+    kitap.save(yol)
+
+    akis = ExcelStream(str(yol), 100)
+    assert akis.sutunlar == list(pd.read_excel(yol).columns) == ['MARKA', 'MODEL', 'YIL', 'AXA']
+    assert list(next(iter(akis)).columns) == akis.sutunlar
+
+    uygulama.process_excel_sigorta(str(yol), reader='stream', mode='upsert', status={})
+    sirketler = db.session.execute(text("SELECT name FROM insurers")).scalars().all()
+    assert not any(ad.startswith('Unnamed') for ad in sirketler)
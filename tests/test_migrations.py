@@ -0,0 +1,37 @@
+"""ensure_vehicle_key_unique: eski veritabanında tekrarları silip tekil index kurar"""
+from sqlalchemy import create_engine, text
+
+from ingest import ensure_vehicle_key_unique, vehicle_key_unique
+
+
+def _eski_veritabani(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'eski.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE vehicles (id INTEGER PRIMARY KEY, marka TEXT, model TEXT, yil TEXT, sigortalar TEXT)"
+        ))
+        conn.execute(text("CREATE INDEX idx_vehicle_lookup ON vehicles (marka, model, yil)"))
+        conn.execute(text(
+            "INSERT INTO vehicles (id, marka, model, yil, sigortalar) VALUES "
+            "(1, 'FIAT', 'EGEA', '2020', '{\"AXA\": 1}'), "
+            "(2, 'FIAT', 'EGEA', '2020', '{\"AXA\": 2}'), "
+            "(3, 'RENAULT', 'CLIO', '2020', '{\"AXA\": 3}'), "
+            "(4, 'FIAT', 'EGEA', '2020', '{\"AXA\": 4}')"
+        ))
+    return engine
+
+
+def test_tekrarlar_silinir_en_yenisi_kalir(tmp_path):
+    engine = _eski_veritabani(tmp_path)
+    assert not vehicle_key_unique(engine)
+
+    assert ensure_vehicle_key_unique(engine) == 2
+    assert vehicle_key_unique(engine)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT id FROM vehicles ORDER BY id")).scalars().all() == [3, 4]
+
+
+def test_tekil_index_varsa_dokunmaz(tmp_path):
+    engine = _eski_veritabani(tmp_path)
+    ensure_vehicle_key_unique(engine)
+    assert ensure_vehicle_key_unique(engine) is None
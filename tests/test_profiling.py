@@ -0,0 +1,31 @@
+"""Profilleyici başka bir profil açıkken isteği / import'u bozmaz"""
+import cProfile
+import os
+
+import profiling
+from profiling import Profiler
+
+
+class _MesgulProfil(cProfile.Profile):
+    """Python 3.12+: başka bir profilleyici açıkken enable() hata verir"""
+
+    def enable(self, *args, **kwargs):
+        raise ValueError('Another profiling tool is already active')
+
+
+def test_baska_profil_aciksa_atlanir(tmp_path, monkeypatch):
+    profiler = Profiler(folder=str(tmp_path))
+    monkeypatch.setattr(profiling.cProfile, 'Profile', _MesgulProfil)
+    with profiler.profile('deneme', 'request', 'GET /') as meta:
+        sonuc = sum(range(10))
+    assert sonuc == 45
+    assert meta['skipped']
+    assert os.listdir(tmp_path) == []
+
+
+def test_profil_kaydedilir(tmp_path):
+    profiler = Profiler(folder=str(tmp_path))
+    with profiler.profile('deneme', 'request', 'GET /') as meta:
+        sum(range(10))
+    assert 'skipped' not in meta
+    assert sorted(os.listdir(tmp_path)) == ['deneme.json', 'deneme.prof']
@@ -0,0 +1,46 @@
+"""Arama: veritabanı index'i ve önek ağacı aynı kuralla eşleşir (kelime başı)"""
+import pytest
+from sqlalchemy import text
+
+from models import db
+from search import VehicleSearch
+
+LISTE = [
+    ('BMW', '320I', 2020, 1, 2),
+    ('BMW', '520D', 2021, 1, 2),
+    ('FIAT', 'EGEA CROSS', 2020, 1, 2),
+    ('ŞAHİN', 'TOFAŞ', 1995, 1, 2),
+]
+
+
+@pytest.fixture
+def aramalar(uygulama, yukle):
+    yukle(LISTE)
+    veritabani = VehicleSearch('auto')
+    if veritabani.backend_for(['bmw']) == 'trie':
+        pytest.skip('Arama index\'i (FTS5 / pg_trgm) yok')
+    return veritabani, VehicleSearch('trie')
+
+
+def _markalar_modeller(ids):
+    return sorted(
+        f"{marka} {model} {yil}"
+        for marka, model, yil in db.session.execute(
+            text("SELECT marka, model, yil FROM vehicles WHERE id IN (%s)" % ','.join(map(str, ids)))
+        )
+    ) if ids else []
+
+
+@pytest.mark.parametrize('q, beklenen', [
+    ('bmw 3', ['BMW 320I 2020']),
+    ('bmw 320', ['BMW 320I 2020']),
+    ('egea cro', ['FIAT EGEA CROSS 2020']),
+    ('sahin tofas', ['ŞAHİN TOFAŞ 1995']),
+    ('fiat 20', ['FIAT EGEA CROSS 2020']),
+    ('mw 320', []),      # kelimenin ortası eşleşmez
+    ('bmw 20i', []),
+])
+def test_arka_uclar_ayni_sonuc(aramalar, q, beklenen):
+    veritabani, agac = aramalar
+    assert _markalar_modeller(veritabani.search_ids(q)) == beklenen
+    assert _markalar_modeller(agac.search_ids(q)) == beklenen